@@ -0,0 +1,195 @@
+#
+# Licensed to the Apache Software Foundation (ASF) under one
+# or more contributor license agreements.  See the NOTICE file
+# distributed with this work for additional information
+# regarding copyright ownership.  The ASF licenses this file
+# to you under the Apache License, Version 2.0 (the
+# "License"); you may not use this file except in compliance
+# with the License.  You may obtain a copy of the License at
+#
+#   http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing,
+# software distributed under the License is distributed on an
+# "AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY
+# KIND, either express or implied.  See the License for the
+# specific language governing permissions and limitations
+# under the License.
+#
+import asyncio
+import functools
+import json
+import threading
+import time
+
+from network_runner import exceptions
+
+from network_runner.api import NetworkRunner
+from network_runner.api import Batch
+from network_runner.api import GET_PORT_CONF
+
+from network_runner.executors.runner import AnsibleRunnerExecutor
+
+from network_runner.models.playbook import Playbook
+
+from network_runner.results import Result
+
+# seconds between checks for a finished runner thread
+POLL_INTERVAL = 0.1
+
+
+class AsyncNetworkRunner(NetworkRunner):
+    """Asyncio interface to Ansible Networking
+
+    Every operation provided by ```NetworkRunner``` is a coroutine on
+    this class.  Playbooks are started with ansible_runner.run_async
+    and awaited without blocking the event loop, so many operations
+    can be in flight at once from a single thread.
+
+    Cancelling the awaiting task, or exceeding the timeout, cancels the
+    underlying ansible-runner process.  Other executors are run in the
+    default executor of the event loop.
+    """
+
+    def __init__(self, inventory=None, forks=None, connections=None,
+                 executor=None, timing_callback=None, event_handler=None,
+                 retain_stdout=True, timeout=None,
+                 poll_interval=POLL_INTERVAL):
+        super(AsyncNetworkRunner, self).__init__(inventory, forks,
+                                                 connections, executor,
+                                                 timing_callback,
+                                                 event_handler,
+                                                 retain_stdout)
+        self.timeout = timeout
+        self.poll_interval = poll_interval
+
+    async def run(self, playbook, timeout=None):
+        """Run a playbook without blocking the event loop
+
+        :param playbook: the playbook to run
+        :type playbook: network_runner.models.playbook.Playbook
+
+        :param timeout: seconds to wait before the run is cancelled,
+                        defaults to the timeout of the runner
+        :type timeout: float
+
+        :returns: the results of the playbook run
+        :rtype: network_runner.results.Result
+        """
+        assert isinstance(playbook, Playbook)
+
+        if timeout is None:
+            timeout = self.timeout
+
+        if not isinstance(self.executor, AnsibleRunnerExecutor):
+            return await self._run_executor(playbook, timeout)
+
+        started = time.time()
+        kwargs = self._runner_kwargs(playbook)
+        executed = time.time()
+
+        cancelled = threading.Event()
+        thread, runner = self.executor.run_async(
+            cancel_callback=cancelled.is_set, **kwargs)
+
+        try:
+            await asyncio.wait_for(self._wait(thread), timeout)
+        except asyncio.TimeoutError:
+            cancelled.set()
+            raise exceptions.NetworkRunnerException(
+                'run timed out after {} seconds'.format(timeout),
+                Result(runner))
+        except asyncio.CancelledError:
+            cancelled.set()
+            raise
+
+        return self._complete(Result(runner), started, executed)
+
+    async def _run_executor(self, playbook, timeout):
+        # executors cannot be interrupted, a run that times out or is
+        # cancelled is left to finish in its worker thread
+        loop = asyncio.get_event_loop()
+        started = time.time()
+        kwargs = self._runner_kwargs(playbook)
+        executed = time.time()
+        future = loop.run_in_executor(
+            None, functools.partial(self.executor.run, **kwargs))
+        try:
+            result = await asyncio.wait_for(future, timeout)
+        except asyncio.TimeoutError:
+            raise exceptions.NetworkRunnerException(
+                'run timed out after {} seconds'.format(timeout))
+        return self._complete(Result(result), started, executed)
+
+    async def _wait(self, thread):
+        while thread.is_alive():
+            await asyncio.sleep(self.poll_interval)
+
+    def batch(self):
+        """Queue operations and run them as a single playbook
+
+        The returned batch must be used as an async context manager::
+
+            async with runner.batch() as b:
+                b.create_vlan('leaf1', 37)
+
+        :returns: a new batch bound to this runner
+        :rtype: AsyncBatch
+        """
+        return AsyncBatch(self)
+
+    async def get_port_conf(self, hostname, port, format=False, **kwargs):
+        """Get port configuration.
+
+        :param hostname: The name or ansible host of a single host in
+                         Ansible inventory.
+        :param port: The port to get configuration.
+        :param format: Also print the port configuration as json
+
+        :returns: dict with the mode, vlan and trunked_vlans of the port,
+                  or the stdout_lines returned by the provider if there
+                  is no parser for the network os of the host
+        """
+        hostname = self._port_config_host(hostname)
+        variables = {'port_name': port}
+        variables.update(kwargs)
+
+        result = await self.play(GET_PORT_CONF, hostname, variables)
+        port_config = self._port_config(result.events, hostname)
+        if format:
+            print(json.dumps(port_config))
+        return port_config
+
+
+class AsyncBatch(Batch):
+    """Batch of operations for an ```AsyncNetworkRunner```"""
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, exc_type, exc_value, traceback):
+        if exc_type is None:
+            await self.flush()
+
+    def __enter__(self):
+        raise TypeError("use 'async with' with an asynchronous batch")
+
+    async def flush(self):
+        """Run all queued operations
+
+        :returns: the results of the playbook run or None if there
+                  was nothing to run
+        :rtype: network_runner.results.Result
+        """
+        if not self.operations:
+            return None
+
+        playbook, operations = self._take()
+        try:
+            result = await self.runner.run(playbook)
+        except exceptions.NetworkRunnerException as exc:
+            self._update(operations, exc.result)
+            raise
+
+        self._update(operations, result)
+        return result
@@ -16,23 +16,39 @@
 # specific language governing permissions and limitations
 # under the License.
 #
-import ansible_runner
-import sys
+import json
+import time
 
 from network_runner import exceptions
 from network_runner import helpers
 
+from network_runner.results import Result
+from network_runner.results import Timing
+from network_runner.results import group_by_task
+from network_runner.results import summarize
+from network_runner.results import task_results
+from network_runner.results import HOST_FAILED
+from network_runner.results import HOST_UNREACHABLE
+
+from network_runner.connections import ConnectionPool
+from network_runner.executors import Executor
+from network_runner.executors.runner import AnsibleRunnerExecutor
+
 from network_runner.models.playbook import Playbook
 
 from network_runner.models.inventory import Inventory
 from network_runner.models.inventory import Host
 
+from network_runner.providers import PROVIDERS
+
 ALL = 'all'
 IMPORT_ROLE = 'import_role'
+INCLUDE_ROLE = 'include_role'
 NETWORK_RUNNER = 'network-runner'
 CREATE_VLAN = 'create_vlan'
 DELETE_VLAN = 'delete_vlan'
 LIST_VLANS = 'list_vlans'
+CONNECT = 'connect'
 CONF_ACCESS_PORT = 'conf_access_port'
 CONF_TRUNK_PORT = 'conf_trunk_port'
 ADD_TRUNK_VLAN = 'add_trunk_vlan'
@@ -40,17 +56,55 @@ DELETE_TRUNK_VLAN = 'delete_trunk_vlan'
 DELETE_PORT = 'delete_port'
 GET_PORT_CONF = 'get_port_conf'
 
+# role task file that includes the files of the providers resolved by
+# NetworkRunner, used for the operations below
+PROVIDER_TASKS = 'provider'
+PROVIDER_ACTIONS = frozenset([
+    CREATE_VLAN, DELETE_VLAN, LIST_VLANS, CONNECT, CONF_ACCESS_PORT,
+    CONF_TRUNK_PORT, ADD_TRUNK_VLAN, DELETE_TRUNK_VLAN, DELETE_PORT,
+    GET_PORT_CONF,
+])
+
+# variables the task files of the operations check for
+REQUIRED_FACTS = {
+    CONF_ACCESS_PORT: ('port_name', 'port_description'),
+    CONF_TRUNK_PORT: ('port_name', 'port_description'),
+    DELETE_PORT: ('port_name',),
+}
+
 
 class NetworkRunner(object):
     """Object to invoke ansible_runner to call Ansible Networking
     Hold inventory and provide an interface for calling
     roles in Ansible Networking to manipulate switch configuration
+
+    Every run returns a ```Result``` with a ```Timing``` breakdown of
+    the run.  ``timing_callback`` is called with the timing of every
+    run, including runs that fail.
+
+    ``event_handler`` is called with every runner event as it happens,
+    from the thread running the playbook, so callers can follow a run
+    host by host.  With ``retain_stdout`` set to False the output of
+    runs is neither printed nor kept, ``Result.stdout`` is empty and
+    errors are reported from the events of the failed tasks.
     """
 
-    def __init__(self, inventory=None):
+    def __init__(self, inventory=None, forks=None, connections=None,
+                 executor=None, timing_callback=None, event_handler=None,
+                 retain_stdout=True):
         if inventory is not None:
             assert isinstance(inventory, Inventory)
+        if connections is not None:
+            assert isinstance(connections, ConnectionPool)
+        if executor is not None:
+            assert isinstance(executor, Executor)
         self.inventory = inventory or Inventory()
+        self.forks = forks
+        self.connections = connections
+        self.executor = executor or AnsibleRunnerExecutor()
+        self.timing_callback = timing_callback
+        self.event_handler = event_handler
+        self.retain_stdout = retain_stdout
 
     def has_host(self, host):
         """Check if given host is in the inventory
@@ -60,10 +114,21 @@ class NetworkRunner(object):
 
         :returns: Boolean
         """
-        for n, h in self.inventory.hosts.items():
-            if h.ansible_host == host or n == host:
-                return True
-        return False
+        return self.get_host(host) is not None
+
+    def get_host(self, host):
+        """Get a host from the inventory
+
+        :param host: Name or ansible host of ```Host```
+        :type host: String
+
+        :returns: the matching ```Host``` or None
+        """
+        hosts = self.inventory.hosts
+        if host in hosts:
+            return hosts[host]
+        found = hosts.find('ansible_host', host)
+        return found[0] if found else None
 
     def add_host(self, host):
         """Add host to inventory
@@ -82,48 +147,186 @@ class NetworkRunner(object):
     def run(self, playbook):
         assert isinstance(playbook, Playbook)
 
-        # invoke ansible networking via ansible runner
-        result = ansible_runner.run(playbook=playbook.serialize(),
-                                    inventory=self.inventory.serialize(),
-                                    verbosity=True,
-                                    settings={'pexpect_use_poll': False})
+        started = time.time()
+        kwargs = self._runner_kwargs(playbook)
+        executed = time.time()
+
+        # invoke ansible networking via the executor
+        result = self.executor.run(**kwargs)
+        return self._complete(Result(result), started, executed)
+
+    def _runner_kwargs(self, playbook):
+        # only the hosts targeted by the plays are passed to Ansible
+        pattern = ','.join(play.hosts for play in playbook)
+        settings = {'pexpect_use_poll': False}
+        if not self.retain_stdout:
+            # ansible-runner only reads this from the settings
+            settings['suppress_output_file'] = True
+        kwargs = dict(playbook=playbook.serialize(),
+                      inventory=self.inventory.select(pattern),
+                      verbosity=True,
+                      forks=self.forks,
+                      settings=settings)
+        if self.connections is not None:
+            kwargs['envvars'] = self.connections.envvars
+            if self.executor.persistent_connections:
+                kwargs['keep_connections'] = True
+        if self.event_handler is not None:
+            kwargs['event_handler'] = self._handle_event
+        if not self.retain_stdout:
+            kwargs['quiet'] = True
+        return kwargs
+
+    def _handle_event(self, event):
+        self.event_handler(event)
+        # ansible-runner only saves the events for which this is true
+        return True
+
+    def _complete(self, result, started, executed):
+        result.timing = Timing.from_events(result.events, started, executed,
+                                           time.time())
+        if self.timing_callback is not None:
+            self.timing_callback(result.timing)
+
+        if self.connections is not None:
+            self.connections.touch(n for n, s in result.hosts.items()
+                                   if s != HOST_UNREACHABLE)
 
         # check for failure
         if result.status == 'failed' or \
                 (result.stats and result.stats.get('failures', [])):
-            raise exceptions.NetworkRunnerException(' '.join(result.stdout))
+            output = result.stdout if self.retain_stdout else \
+                result.failure_output()
+            raise exceptions.NetworkRunnerException(' '.join(output), result)
 
         return result
 
+    def warm(self, hostname=None):
+        """Open connections to hosts ahead of the operations on them
+
+        Connections are kept open for the idle timeout of the runner's
+        ```ConnectionPool```.  Only executors that run every playbook
+        in the same process, such as ```InProcessExecutor```, reuse
+        them in later runs.
+
+        :param hostname: The name of the host in Ansible inventory or a
+                         list of names, defaults to all hosts.
+
+        :returns: the results of the playbook run
+        :rtype: network_runner.results.Result
+        """
+        if self.connections is None:
+            raise exceptions.NetworkRunnerException(
+                'runner has no connection pool')
+        if not self.executor.persistent_connections:
+            raise exceptions.NetworkRunnerException(
+                'connections opened by {} are not reused by later runs'.format(
+                    type(self.executor).__name__))
+        return self.play(CONNECT, hostname)
+
+    def close(self):
+        """Close the connections held by the runner
+
+        :returns: None
+        """
+        if self.connections is not None:
+            self.connections.close()
+
+    def batch(self):
+        """Queue operations and run them as a single playbook
+
+        Operations called on the returned ```Batch``` are not run
+        immediately.  Each one is added as a task to a shared playbook
+        which is run once when the context manager exits::
+
+            with runner.batch() as b:
+                b.create_vlan('leaf1', 37)
+                b.conf_trunk_port('leaf1', 'Ethernet1', 37, [73])
+
+        :returns: a new batch bound to this runner
+        :rtype: Batch
+        """
+        return Batch(self)
+
     def play(self, tasks_from, hosts=None, variables=None):
         """Play a set of tasks from the role
 
         :param tasks_from: the task to play
         :type tasks_from: str
 
-        :param hosts: the hosts to execute against
-        :type hosts: str
+        :param hosts: the hosts to execute against.  A list of hosts
+                      is run as a single play against all of them
+        :type hosts: str or list
 
         :param variables: values to be passed into the play
         :type variables: dict
 
         :returns: the results of the playbook run
-        :rtype: AnsibleRunner
+        :rtype: network_runner.results.Result
         """
+        if isinstance(hosts, (list, tuple, set, frozenset)):
+            hosts = ','.join(hosts)
+
         pb = Playbook()
         play = pb.new(hosts=(hosts or ALL), gather_facts=False)
-
-        task = play.tasks.new(action=IMPORT_ROLE)
-        task.args = {'name': NETWORK_RUNNER, 'tasks_from': tasks_from}
-        if variables:
-            task.vars = variables
+        self._role_task(play, tasks_from, variables)
 
         return self.run(pb)
 
+    def _role_task(self, play, tasks_from, variables, name=None):
+        # when the provider of every targeted host is known, its files
+        # are included directly rather than looked for on every run by
+        # run.yaml, and the facts the operation requires are checked
+        # here rather than by a task run for every host
+        if name is None:
+            task = play.tasks.new(action=IMPORT_ROLE)
+        else:
+            # Ansible drops the name of imports, the name of an include
+            # is in the events of the run
+            task = play.tasks.new(name=name, action=INCLUDE_ROLE)
+        providers = None
+        if tasks_from in PROVIDER_ACTIONS and \
+                all(variables and variables.get(n)
+                    for n in REQUIRED_FACTS.get(tasks_from, ())):
+            providers = self._providers(play.hosts, tasks_from)
+
+        if providers:
+            task.args = {'name': NETWORK_RUNNER,
+                         'tasks_from': PROVIDER_TASKS}
+            task.vars = dict(variables or {}, network_action=tasks_from,
+                             network_runner_providers=providers)
+        else:
+            task.args = {'name': NETWORK_RUNNER, 'tasks_from': tasks_from}
+            if variables:
+                task.vars = variables
+        return task
+
+    def _providers(self, pattern, tasks_from):
+        # provider files of the network os of each host targeted by the
+        # pattern, or None if any of them is not known
+        targets = self.inventory.targets(pattern)
+        if not targets:
+            return None
+
+        found = {}
+        for name in targets:
+            host = self.inventory.hosts.get(name)
+            network_os = host.ansible_network_os if host else None
+            if network_os in found:
+                continue
+            files = PROVIDERS.files(network_os)
+            provider = {'vars': files.get('defaults.yaml'),
+                        'tasks': files.get('{}.yaml'.format(tasks_from))}
+            if not all(provider.values()):
+                return None
+            found[network_os] = provider
+        return found
+
     def create_vlan(self, hostname, vlan_id, vlan_name=None, **kwargs):
         """Create VLAN.
 
-        :param hostname: The name of the host in Ansible inventory.
+        :param hostname: The name of the host in Ansible inventory or a
+                         list of names to run against in parallel.
         :param vlan_id: The VLAN's ID to create.
         :param vlan_name: The VLAN's name/description.
         """
@@ -134,7 +337,8 @@ class NetworkRunner(object):
     def list_vlans(self, hostname, **kwargs):
         """List VLANs.
 
-        :param hostname: The name of the host in Ansible inventory.
+        :param hostname: The name of the host in Ansible inventory or a
+                         list of names to run against in parallel.
         """
         variables = kwargs
         return self.play(LIST_VLANS, hostname, variables)
@@ -142,7 +346,8 @@ class NetworkRunner(object):
     def delete_vlan(self, hostname, vlan_id, **kwargs):
         """Delete VLAN.
 
-        :param hostname: The name of the host in Ansible inventory.
+        :param hostname: The name of the host in Ansible inventory or a
+                         list of names to run against in parallel.
         :param vlan_id: The VLAN's ID to delete.
         """
         variables = {'vlan_id': vlan_id}
@@ -152,7 +357,8 @@ class NetworkRunner(object):
     def conf_access_port(self, hostname, port, vlan_id, **kwargs):
         """Configure access port on a vlan.
 
-        :param hostname: The name of the host in Ansible inventory.
+        :param hostname: The name of the host in Ansible inventory or a
+                         list of names to run against in parallel.
         :param port: The port to configure.
         :param vlan_id: The vlan_id to assign to the port.
                         An empty or None value will default to the
@@ -172,7 +378,8 @@ class NetworkRunner(object):
                         trunked_vlans, **kwargs):
         """Configure trunk port w/ default vlan and optional additional vlans
 
-        :param hostname: The name of the host in Ansible inventory.
+        :param hostname: The name of the host in Ansible inventory or a
+                         list of names to run against in parallel.
         :param port: The port to configure.
         :param vlan_id: the default VLAN ID to assign to the port
                         An empty or None value will default to the
@@ -193,7 +400,8 @@ class NetworkRunner(object):
     def add_trunk_vlan(self, hostname, port, vlan_id, **kwargs):
         """Add VLAN to trunk port.
 
-        :param hostname: The name of the host in Ansible inventory.
+        :param hostname: The name of the host in Ansible inventory or a
+                         list of names to run against in parallel.
         :param port: The port to configure.
         :param vlan_id: The VLAN's ID to delete.
         """
@@ -204,7 +412,8 @@ class NetworkRunner(object):
     def delete_trunk_vlan(self, hostname, port, vlan_id, **kwargs):
         """Delete VLAN.
 
-        :param hostname: The name of the host in Ansible inventory.
+        :param hostname: The name of the host in Ansible inventory or a
+                         list of names to run against in parallel.
         :param port: The port to configure.
         :param vlan_id: The VLAN's ID to delete.
         """
@@ -215,7 +424,8 @@ class NetworkRunner(object):
     def delete_port(self, hostname, port, **kwargs):
         """Delete port configuration.
 
-        :param hostname: The name of the host in Ansible inventory.
+        :param hostname: The name of the host in Ansible inventory or a
+                         list of names to run against in parallel.
         :param port: The port to configure.
         """
         variables = {'port_name': port}
@@ -225,24 +435,196 @@ class NetworkRunner(object):
     def get_port_conf(self, hostname, port, format=False, **kwargs):
         """Get port configuration.
 
-        :param hostname: The name of the host in Ansible inventory.
+        The configuration is parsed from the result of the provider
+        task in the runner events, the output of the run is not read,
+        so calls can be made concurrently from several threads.
+
+        :param hostname: The name or ansible host of a single host in
+                         Ansible inventory.
         :param port: The port to get configuration.
-        :param format: Format the port configuration json
+        :param format: Also print the port configuration as json
+
+        :returns: dict with the mode, vlan and trunked_vlans of the port,
+                  or the stdout_lines returned by the provider if there
+                  is no parser for the network os of the host
         """
+        hostname = self._port_config_host(hostname)
         variables = {'port_name': port}
         variables.update(kwargs)
 
-        # output the original port configuration json
-        if not format:
-            self.play(GET_PORT_CONF, hostname, variables)
+        result = self.play(GET_PORT_CONF, hostname, variables)
+        port_config = self._port_config(result.events, hostname)
+        if format:
+            print(json.dumps(port_config))
+        return port_config
+
+    def _port_config_host(self, hostname):
+        # the configuration is returned for a single host, checked
+        # before running as it is looked up by its inventory name
+        host = None
+        if not isinstance(hostname, (list, tuple, set, frozenset)):
+            host = self.get_host(hostname)
+        if host is None:
+            raise exceptions.NetworkRunnerException(
+                'get_port_conf takes a single inventory host')
+        return host.name
+
+    def _port_config(self, events, hostname):
+        # the output of providers without a parser is returned as is
+        network_os = self.inventory.hosts[hostname].ansible_network_os
+        parsed = network_os in helpers.PORT_CONFIG_OS
+        for res in reversed(task_results(events, hostname)):
+            if 'stdout_lines' in res:
+                if not parsed:
+                    return res['stdout_lines']
+                return helpers.parse_port_config(res['stdout_lines'],
+                                                 network_os)
+        if not parsed:
+            return None
+        raise exceptions.NetworkRunnerException(
+            'no port configuration returned by {}'.format(hostname))
+
+
+class Operation(object):
+    """A single operation queued in a ```Batch```
+
+    Once the batch has been run, ``result`` holds the result of the
+    whole playbook and ``status`` holds the status of each host for
+    this operation alone.  Hosts that never ran the operation, for
+    instance because an earlier operation failed on them, are not
+    present in ``status``.  For get_port_conf operations that
+    succeeded ``port_config`` holds the port configuration, as returned
+    by ``NetworkRunner.get_port_conf``.
+    """
+
+    def __init__(self, name, tasks_from, hosts, variables):
+        self.name = name
+        self.tasks_from = tasks_from
+        self.hosts = hosts
+        self.variables = variables
+        self.result = None
+        self.status = {}
+        self.port_config = None
+
+    def failed(self):
+        """Check if the operation failed on any host
+
+        :returns: Boolean
+        """
+        return any(s in (HOST_FAILED, HOST_UNREACHABLE)
+                   for s in self.status.values())
+
+
+class Batch(object):
+    """Collect operations and run them as a single playbook
+
+    Offers the operations of ```NetworkRunner```, which are queued and
+    run by the runner the batch is bound to when it is flushed.
+
+    Consecutive operations on the same hosts are tasks of one play, so
+    they share the connections Ansible opens to the devices for the
+    play.  Every task is named after its operation so the result of
+    each one can be mapped back from the runner events.  Ansible
+    removes failed hosts from the remaining tasks and plays, so an
+    operation that fails on a host stops the operations queued after
+    it for that host.
+    """
+
+    def __init__(self, runner):
+        assert isinstance(runner, NetworkRunner)
+        self.runner = runner
+        self.playbook = Playbook()
+        self.operations = []
+        self._play = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        if exc_type is None:
+            self.flush()
+
+    # the operations of the runner, which call play below to queue
+    # their tasks
+    create_vlan = NetworkRunner.create_vlan
+    list_vlans = NetworkRunner.list_vlans
+    delete_vlan = NetworkRunner.delete_vlan
+    conf_access_port = NetworkRunner.conf_access_port
+    conf_trunk_port = NetworkRunner.conf_trunk_port
+    add_trunk_vlan = NetworkRunner.add_trunk_vlan
+    delete_trunk_vlan = NetworkRunner.delete_trunk_vlan
+    delete_port = NetworkRunner.delete_port
+
+    def play(self, tasks_from, hosts=None, variables=None):
+        """Queue a set of tasks from the role
+
+        Takes the same arguments as ```NetworkRunner.play```
+
+        :returns: the queued operation
+        :rtype: Operation
+        """
+        if isinstance(hosts, (list, tuple, set, frozenset)):
+            hosts = ','.join(hosts)
+        hosts = hosts or ALL
+
+        if self._play is None or self._play.hosts != hosts:
+            self._play = self.playbook.new(hosts=hosts, gather_facts=False)
+
+        name = '{}[{}]'.format(tasks_from, len(self.operations))
+        self.runner._role_task(self._play, tasks_from, variables, name)
+
+        operation = Operation(name, tasks_from, hosts, variables)
+        self.operations.append(operation)
+        return operation
+
+    def get_port_conf(self, hostname, port, format=False, **kwargs):
+        if format:
+            raise exceptions.NetworkRunnerException(
+                'formatted port configuration is not supported in a batch')
+        hostname = self.runner._port_config_host(hostname)
+        variables = {'port_name': port}
+        variables.update(kwargs)
+        return self.play(GET_PORT_CONF, hostname, variables)
+
+    def flush(self):
+        """Run all queued operations
+
+        :returns: the results of the playbook run or None if there
+                  was nothing to run
+        :rtype: network_runner.results.Result
+        """
+        if not self.operations:
+            return None
+
+        playbook, operations = self._take()
+        try:
+            result = self.runner.run(playbook)
+        except exceptions.NetworkRunnerException as exc:
+            self._update(operations, exc.result)
+            raise
+
+        self._update(operations, result)
+        return result
+
+    def _take(self):
+        playbook, operations = self.playbook, self.operations
+        self.playbook, self.operations = Playbook(), []
+        self._play = None
+        return playbook, operations
+
+    def _update(self, operations, result):
+        if result is None:
             return
-        # format the port configuration json
-        stdout_backup = sys.stdout
-        sys.stdout = helpers.FakeTextIO()
-        self.play(GET_PORT_CONF, hostname, variables)
-        formatter_stdout_data = helpers.format_port_config(
-            sys.stdout.buff(),
-            self.inventory.hosts[hostname].ansible_network_os
-        )
-        sys.stdout = stdout_backup
-        return print(formatter_stdout_data)
+        events = group_by_task(result.events,
+                               [o.name for o in operations])
+        for operation in operations:
+            operation.result = result
+            operation.status = summarize(events[operation.name])
+            if operation.tasks_from == GET_PORT_CONF and \
+                    operation.status and not operation.failed():
+                try:
+                    operation.port_config = self.runner._port_config(
+                        events[operation.name], operation.hosts)
+                except exceptions.NetworkRunnerException:
+                    # the provider returned no configuration to parse
+                    pass
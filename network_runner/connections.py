@@ -0,0 +1,147 @@
+#
+# Licensed to the Apache Software Foundation (ASF) under one
+# or more contributor license agreements.  See the NOTICE file
+# distributed with this work for additional information
+# regarding copyright ownership.  The ASF licenses this file
+# to you under the Apache License, Version 2.0 (the
+# "License"); you may not use this file except in compliance
+# with the License.  You may obtain a copy of the License at
+#
+#   http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing,
+# software distributed under the License is distributed on an
+# "AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY
+# KIND, either express or implied.  See the License for the
+# specific language governing permissions and limitations
+# under the License.
+#
+import os
+import shutil
+import tempfile
+import threading
+import time
+
+# seconds a connection may stay idle before Ansible closes it
+DEFAULT_IDLE_TIMEOUT = 30
+
+
+class ConnectionPool(object):
+    """Long lived connections to the hosts in an inventory
+
+    Holds the settings that keep Ansible connections open between
+    tasks: a private control path directory for the persistent
+    (network_cli) and ssh sockets and the idle timeout after which
+    Ansible closes them.  The settings are passed to every run made by
+    the ```NetworkRunner``` that owns the pool.
+
+    Ansible names network_cli sockets after the pid of the process
+    running the playbook, so they are only reused by runs sharing that
+    process, as with ```InProcessExecutor```.  Each run made by the
+    default executor starts ansible-playbook again and opens network_cli
+    connections of its own.  ssh sockets (ControlPersist) are reused by
+    any run.
+
+    :param idle_timeout: seconds an unused connection is kept open
+    :type idle_timeout: int
+
+    :param command_timeout: seconds to wait for a device command
+    :type command_timeout: int
+
+    :param control_path_dir: directory for the connection sockets,
+                             a private directory is created if not set
+    :type control_path_dir: str
+    """
+
+    def __init__(self, idle_timeout=DEFAULT_IDLE_TIMEOUT,
+                 command_timeout=None, control_path_dir=None):
+        self.idle_timeout = idle_timeout
+        self.command_timeout = command_timeout
+        self.control_path_dir = control_path_dir
+        self._private_dir = False
+        self._last_used = {}
+        self._lock = threading.Lock()
+
+    @property
+    def envvars(self):
+        """Environment for runs that use the pool
+
+        :returns: dict of Ansible configuration variables
+        """
+        # runs started from several threads must share one directory
+        with self._lock:
+            if self.control_path_dir is None:
+                self.control_path_dir = tempfile.mkdtemp(
+                    prefix='network-runner-')
+                self._private_dir = True
+
+        envvars = {
+            'ANSIBLE_PERSISTENT_CONTROL_PATH_DIR': self.control_path_dir,
+            'ANSIBLE_PERSISTENT_CONNECT_TIMEOUT': str(self.idle_timeout),
+            'ANSIBLE_SSH_CONTROL_PATH_DIR': self.control_path_dir,
+            'ANSIBLE_SSH_ARGS': '-C -o ControlMaster=auto '
+                                '-o ControlPersist={}s'.format(
+                                    self.idle_timeout),
+        }
+        if self.command_timeout is not None:
+            envvars['ANSIBLE_PERSISTENT_COMMAND_TIMEOUT'] = \
+                str(self.command_timeout)
+        return envvars
+
+    def touch(self, hosts):
+        """Record that the connections to hosts were just used
+
+        :param hosts: names of the hosts
+        :type hosts: iterable
+        """
+        now = time.time()
+        with self._lock:
+            for host in hosts:
+                self._last_used[host] = now
+
+    def active(self):
+        """Hosts with connections that have not yet idled out
+
+        :returns: list of host names
+        """
+        expires = time.time() - self.idle_timeout
+        with self._lock:
+            for host, used in list(self._last_used.items()):
+                if used < expires:
+                    del self._last_used[host]
+            return sorted(self._last_used)
+
+    def close(self):
+        """Close all open connections
+
+        Asks every persistent connection process found in the control
+        path directory to close its connection and removes the
+        directory if it was created by the pool.
+
+        :returns: None
+        """
+        with self._lock:
+            self._last_used.clear()
+
+        if self.control_path_dir is None:
+            return
+
+        if os.path.isdir(self.control_path_dir):
+            for name in os.listdir(self.control_path_dir):
+                _close_socket(os.path.join(self.control_path_dir, name))
+
+        if self._private_dir:
+            shutil.rmtree(self.control_path_dir, ignore_errors=True)
+            self.control_path_dir = None
+            self._private_dir = False
+
+
+def _close_socket(path):
+    # ssh control sockets are shut down by ssh itself once idle, only
+    # the persistent connection processes answer json-rpc requests
+    from ansible.module_utils.connection import Connection
+    from ansible.module_utils.connection import ConnectionError
+    try:
+        Connection(path).close()
+    except (ConnectionError, OSError):
+        pass
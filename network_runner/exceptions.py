@@ -19,5 +19,6 @@
 
 
 class NetworkRunnerException(Exception):
-    def __init__(self, message):
+    def __init__(self, message, result=None):
         super(NetworkRunnerException, self).__init__(message)
+        self.result = result
@@ -0,0 +1,91 @@
+#
+# Licensed to the Apache Software Foundation (ASF) under one
+# or more contributor license agreements.  See the NOTICE file
+# distributed with this work for additional information
+# regarding copyright ownership.  The ASF licenses this file
+# to you under the Apache License, Version 2.0 (the
+# "License"); you may not use this file except in compliance
+# with the License.  You may obtain a copy of the License at
+#
+#   http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing,
+# software distributed under the License is distributed on an
+# "AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY
+# KIND, either express or implied.  See the License for the
+# specific language governing permissions and limitations
+# under the License.
+#
+import datetime
+import uuid
+
+STATUS_SUCCESSFUL = 'successful'
+STATUS_FAILED = 'failed'
+
+
+class Executor(object):
+    """Backend used by ```NetworkRunner``` to run playbooks
+
+    Subclasses implement ``run`` which receives the serialized playbook
+    and inventory plus the keyword arguments NetworkRunner would pass to
+    ansible_runner.run.  Arguments a backend has no use for are ignored.
+    """
+
+    # whether connections opened by a run are reused by the runs that
+    # follow, which NetworkRunner.warm relies on.  Runs of a runner with
+    # a connection pool are then passed keep_connections=True
+    persistent_connections = False
+
+    def run(self, playbook, inventory, **kwargs):
+        """Run a playbook against an inventory
+
+        :param playbook: the serialized playbook
+        :type playbook: list
+
+        :param inventory: the serialized inventory
+        :type inventory: dict
+
+        :returns: an object providing ``status``, ``rc``, ``stats``,
+                  ``stdout`` and ``events`` like the runner object
+                  returned by ansible_runner.run
+        """
+        raise NotImplementedError
+
+
+class RunResult(object):
+    """Outcome of a run made by an ```Executor```
+
+    Mirrors the attributes of the runner object returned by
+    ansible_runner.run that NetworkRunner relies on.
+    """
+
+    def __init__(self, status, rc, stats=None, events=None, stdout=None):
+        self.status = status
+        self.rc = rc
+        self.stats = stats or {}
+        self.events = events or []
+        self.stdout = stdout or []
+
+
+def make_event(event, counter, stdout='', **event_data):
+    """Build a runner event in the format used by ansible-runner
+
+    :param event: the name of the event, for example runner_on_ok
+    :type event: str
+
+    :param counter: the position of the event in the run
+    :type counter: int
+
+    :param stdout: the line of output for the event
+    :type stdout: str
+
+    :returns: dict
+    """
+    return {
+        'uuid': str(uuid.uuid4()),
+        'counter': counter,
+        'created': datetime.datetime.utcnow().isoformat(),
+        'event': event,
+        'stdout': stdout,
+        'event_data': event_data,
+    }
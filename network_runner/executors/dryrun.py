@@ -0,0 +1,47 @@
+#
+# Licensed to the Apache Software Foundation (ASF) under one
+# or more contributor license agreements.  See the NOTICE file
+# distributed with this work for additional information
+# regarding copyright ownership.  The ASF licenses this file
+# to you under the Apache License, Version 2.0 (the
+# "License"); you may not use this file except in compliance
+# with the License.  You may obtain a copy of the License at
+#
+#   http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing,
+# software distributed under the License is distributed on an
+# "AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY
+# KIND, either express or implied.  See the License for the
+# specific language governing permissions and limitations
+# under the License.
+#
+from network_runner.executors import Executor
+from network_runner.executors import RunResult
+from network_runner.executors import STATUS_SUCCESSFUL
+
+
+class DryRunResult(RunResult):
+    """Result of a dry run, holding what would have been run"""
+
+    def __init__(self, playbook, inventory, kwargs):
+        super(DryRunResult, self).__init__(STATUS_SUCCESSFUL, 0)
+        self.playbook = playbook
+        self.inventory = inventory
+        self.kwargs = kwargs
+
+
+class DryRunExecutor(Executor):
+    """Render playbooks without running them
+
+    Every run succeeds and returns the serialized playbook and inventory
+    along with the remaining runner arguments.  The last result is kept
+    in ``last`` for inspection.
+    """
+
+    def __init__(self):
+        self.last = None
+
+    def run(self, playbook, inventory, **kwargs):
+        self.last = DryRunResult(playbook, inventory, kwargs)
+        return self.last
@@ -0,0 +1,197 @@
+#
+# Licensed to the Apache Software Foundation (ASF) under one
+# or more contributor license agreements.  See the NOTICE file
+# distributed with this work for additional information
+# regarding copyright ownership.  The ASF licenses this file
+# to you under the Apache License, Version 2.0 (the
+# "License"); you may not use this file except in compliance
+# with the License.  You may obtain a copy of the License at
+#
+#   http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing,
+# software distributed under the License is distributed on an
+# "AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY
+# KIND, either express or implied.  See the License for the
+# specific language governing permissions and limitations
+# under the License.
+#
+import random
+import re
+import threading
+import time
+
+from network_runner.executors import Executor
+from network_runner.executors import RunResult
+from network_runner.executors import STATUS_SUCCESSFUL
+from network_runner.executors import STATUS_FAILED
+from network_runner.executors import make_event
+
+RC_FAILED = 2
+RC_UNREACHABLE = 4
+
+
+class FakeExecutor(Executor):
+    """Pretend to run playbooks in memory
+
+    Every task of every play reports ok for the hosts the play targets,
+    after sleeping for ``latency`` seconds.  Failures are injected for
+    the hosts in ``fail_hosts`` and ``unreachable_hosts`` and at random
+    with probability ``failure_rate``.  Like Ansible, hosts that fail
+    are not run by the plays that follow.
+
+    Meant for load testing the Python layer without any device.
+
+    As with ansible-runner, runs accept an ``event_handler`` called
+    with every event and ``suppress_output_file`` in ``settings`` to
+    drop the stdout.
+
+    :param latency: seconds each task takes, all hosts run in parallel
+    :type latency: float
+
+    :param fail_hosts: hosts whose tasks always fail
+    :type fail_hosts: iterable
+
+    :param unreachable_hosts: hosts that can never be reached
+    :type unreachable_hosts: iterable
+
+    :param failure_rate: probability that a task fails on a host
+    :type failure_rate: float
+
+    :param seed: seed for the random failures
+    :type seed: int
+
+    :param results: module result returned by each task, keyed by
+                    the network_action, tasks_from or action of the
+                    task
+    :type results: dict
+    """
+
+    def __init__(self, latency=0.0, fail_hosts=None, unreachable_hosts=None,
+                 failure_rate=0.0, seed=None, results=None):
+        self.latency = latency
+        self.fail_hosts = frozenset(fail_hosts or ())
+        self.unreachable_hosts = frozenset(unreachable_hosts or ())
+        self.failure_rate = failure_rate
+        self.results = results or {}
+        self.runs = 0
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+
+    def run(self, playbook, inventory, event_handler=None, settings=None,
+            **kwargs):
+        suppress_output_file = (settings or {}).get('suppress_output_file',
+                                                    False)
+        with self._lock:
+            self.runs += 1
+
+        events = []
+        stdout = []
+        stats = dict((k, {}) for k in ('ok', 'failures', 'dark', 'changed',
+                                       'skipped', 'processed'))
+        removed = set()
+
+        def emit(event, line='', **event_data):
+            if line and not suppress_output_file:
+                stdout.append(line)
+            events.append(make_event(event, len(events) + 1, line,
+                                     **event_data))
+            if event_handler is not None:
+                event_handler(events[-1])
+
+        emit('playbook_on_start')
+        for play in playbook:
+            name = play.get('name') or play.get('hosts', '')
+            hosts = [h for h in _match(inventory, play.get('hosts', ''))
+                     if h not in removed]
+            emit('playbook_on_play_start', 'PLAY [{}]'.format(name),
+                 play=name)
+
+            for task in play.get('tasks', []):
+                key = task.get('vars', {}).get('network_action') or \
+                    task.get('args', {}).get('tasks_from') or \
+                    task.get('action')
+                task_name = task.get('name') or key
+                emit('playbook_on_task_start', 'TASK [{}]'.format(task_name),
+                     play=name, task=task_name)
+
+                start = time.time()
+                if self.latency:
+                    time.sleep(self.latency)
+                end = time.time()
+
+                for host in hosts:
+                    if host in removed:
+                        continue
+                    stats['processed'][host] = 1
+                    data = dict(play=name, task=task_name, host=host,
+                                task_action=task.get('action'),
+                                start=start, end=end, duration=end - start)
+
+                    if host in self.unreachable_hosts:
+                        res = {'unreachable': True,
+                               'msg': 'host is unreachable'}
+                        emit('runner_on_unreachable',
+                             'fatal: [{}]: UNREACHABLE!'.format(host),
+                             res=res, **data)
+                        _count(stats['dark'], host)
+                        removed.add(host)
+                    elif host in self.fail_hosts or self._fails():
+                        res = {'failed': True, 'msg': 'injected failure'}
+                        emit('runner_on_failed',
+                             'fatal: [{}]: FAILED! => {}'.format(
+                                 host, res['msg']),
+                             res=res, **data)
+                        _count(stats['failures'], host)
+                        removed.add(host)
+                    else:
+                        res = dict(self.results.get(key, {}))
+                        emit('runner_on_ok', 'ok: [{}]'.format(host),
+                             res=res, **data)
+                        _count(stats['ok'], host)
+                        if res.get('changed'):
+                            _count(stats['changed'], host)
+
+        emit('playbook_on_stats')
+
+        rc = 0
+        if stats['failures']:
+            rc |= RC_FAILED
+        if stats['dark']:
+            rc |= RC_UNREACHABLE
+        status = STATUS_FAILED if rc else STATUS_SUCCESSFUL
+        return RunResult(status, rc, stats, events, stdout)
+
+    def _fails(self):
+        if not self.failure_rate:
+            return False
+        with self._lock:
+            return self._random.random() < self.failure_rate
+
+
+def _count(counter, host):
+    counter[host] = counter.get(host, 0) + 1
+
+
+def _match(inventory, pattern):
+    # resolve a simple host pattern made of host and group names
+    inventory = inventory.get('all', inventory)
+    hosts = inventory.get('hosts') or {}
+    children = inventory.get('children') or {}
+
+    matched, seen = [], set()
+    for item in re.split(r'[,:]', pattern):
+        item = item.strip()
+        if item in ('all', '*'):
+            names = list(hosts)
+        elif item in children:
+            names = list((children[item] or {}).get('hosts') or {})
+        elif item in hosts:
+            names = [item]
+        else:
+            names = []
+        for name in names:
+            if name not in seen:
+                seen.add(name)
+                matched.append(name)
+    return matched
@@ -0,0 +1,277 @@
+#
+# Licensed to the Apache Software Foundation (ASF) under one
+# or more contributor license agreements.  See the NOTICE file
+# distributed with this work for additional information
+# regarding copyright ownership.  The ASF licenses this file
+# to you under the Apache License, Version 2.0 (the
+# "License"); you may not use this file except in compliance
+# with the License.  You may obtain a copy of the License at
+#
+#   http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing,
+# software distributed under the License is distributed on an
+# "AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY
+# KIND, either express or implied.  See the License for the
+# specific language governing permissions and limitations
+# under the License.
+#
+import json
+import os
+import shutil
+import tempfile
+import threading
+import time
+
+from ansible import constants
+from ansible import context
+from ansible.errors import AnsibleError
+from ansible.executor.task_queue_manager import TaskQueueManager
+from ansible.inventory.manager import InventoryManager
+from ansible.module_utils.common.collections import ImmutableDict
+from ansible.parsing.dataloader import DataLoader
+from ansible.playbook import Playbook
+from ansible.plugins.callback import CallbackBase
+from ansible.plugins.strategy import StrategyBase
+from ansible.utils.collection_loader import AnsibleCollectionConfig
+from ansible.vars.manager import VariableManager
+
+try:
+    from ansible.plugins.loader import init_plugin_loader
+except ImportError:
+    # older releases install the collection loader on import
+    init_plugin_loader = None
+
+from network_runner.executors import Executor
+from network_runner.executors import RunResult
+from network_runner.executors import STATUS_SUCCESSFUL
+from network_runner.executors import STATUS_FAILED
+from network_runner.executors import make_event
+
+# Ansible keeps global state while a playbook runs, its configuration,
+# ansible.context.CLIARGS and the plugin loaders, so runs made by every
+# executor of the process are serialized
+_LOCK = threading.Lock()
+
+# envvars of the run in progress, with the ident of the thread running
+# it, set in the worker processes Ansible forks for the run
+_run_environ = None
+
+
+def _set_run_environ():
+    # called in every child forked by the process: only the children
+    # forked by the thread running a playbook, the workers of the run,
+    # take its envvars, the environment of this process is unchanged
+    if _run_environ is not None:
+        ident, envvars = _run_environ
+        if threading.get_ident() == ident:
+            os.environ.update(envvars)
+
+
+os.register_at_fork(after_in_child=_set_run_environ)
+
+_update_active_connections = StrategyBase.update_active_connections
+
+
+def _ignore_connections(self, results):
+    pass
+
+
+class InProcessExecutor(Executor):
+    """Run playbooks with the Ansible Python API in this process
+
+    Avoids starting an interpreter and ansible-playbook for every run.
+    Ansible's plugin loaders stay populated between runs and the data
+    loader keeps its cache of parsed role files, so only the first run
+    pays for plugin discovery and YAML parsing.
+
+    Ansible keeps global state while a playbook runs, so runs made by
+    all executors of the process are serialized.  ``envvars`` are set
+    in the worker processes of the run, where tasks and connections
+    read them, and not in this process.
+
+    Ansible closes the persistent connections used by a play when the
+    play ends.  Runs made with ``keep_connections`` leave them open, to
+    be reused by the runs that follow until they idle out.
+
+    Like ansible-runner, ``event_handler`` is called with every event
+    as it is emitted and ``suppress_output_file`` in ``settings`` drops
+    the stdout of the run.
+    """
+
+    # Ansible names network_cli sockets after the pid of the process
+    # running the playbook, which is this process for every run
+    persistent_connections = True
+
+    def __init__(self):
+        if init_plugin_loader is not None and \
+                AnsibleCollectionConfig.collection_finder is None:
+            init_plugin_loader()
+        self._loader = DataLoader()
+
+    def run(self, playbook, inventory, forks=None, envvars=None,
+            verbosity=0, event_handler=None, settings=None,
+            keep_connections=False, **kwargs):
+        global _run_environ
+        settings = settings or {}
+        callback = EventCallback(
+            event_handler, not settings.get('suppress_output_file', False))
+        with _LOCK:
+            tmpdir = tempfile.mkdtemp(prefix='network-runner-')
+            if envvars:
+                _run_environ = (threading.get_ident(), dict(envvars))
+            if keep_connections:
+                # strategies close the connections they have recorded
+                # at the end of each play, none are recorded
+                StrategyBase.update_active_connections = _ignore_connections
+            try:
+                return self._run(tmpdir, playbook, inventory, forks,
+                                 int(verbosity), callback)
+            finally:
+                _run_environ = None
+                StrategyBase.update_active_connections = \
+                    _update_active_connections
+                shutil.rmtree(tmpdir, ignore_errors=True)
+
+    def _run(self, tmpdir, playbook, inventory, forks, verbosity, callback):
+        paths = []
+        for name, data in (('hosts.json', inventory),
+                           ('playbook.json', playbook)):
+            paths.append(os.path.join(tmpdir, name))
+            with open(paths[-1], 'w') as f:
+                json.dump(data, f)
+
+        # the defaults of the command line options of ansible-playbook
+        context.CLIARGS = ImmutableDict(
+            verbosity=verbosity, forks=forks,
+            connection=constants.DEFAULT_TRANSPORT,
+            remote_user=constants.DEFAULT_REMOTE_USER,
+            become=constants.DEFAULT_BECOME,
+            become_method=constants.DEFAULT_BECOME_METHOD,
+            check=False, diff=False, syntax=False, start_at_task=None)
+
+        self._loader.set_basedir(tmpdir)
+        hosts = InventoryManager(loader=self._loader, sources=paths[:1])
+        variables = VariableManager(loader=self._loader, inventory=hosts)
+
+        tqm = TaskQueueManager(inventory=hosts, variable_manager=variables,
+                               loader=self._loader, passwords={},
+                               run_additional_callbacks=False, forks=forks)
+
+        # install our callback as the stdout callback of the run
+        if hasattr(callback, '_init_callback_methods'):
+            callback._init_callback_methods()
+        callback.set_options()
+        tqm._callback_plugins.append(callback)
+
+        rc = 0
+        try:
+            callback.v2_playbook_on_start(None)
+            # loading the playbook from a file, as ansible-playbook does,
+            # marks the templates in it as trusted
+            book = Playbook.load(paths[1], variable_manager=variables,
+                                 loader=self._loader)
+            for play in book.get_plays():
+                rc = tqm.run(play) or rc
+            tqm.send_callback('v2_playbook_on_stats', tqm._stats)
+        except AnsibleError as exc:
+            callback.error(str(exc))
+            rc = TaskQueueManager.RUN_ERROR
+        finally:
+            tqm.cleanup()
+            self._loader.cleanup_all_tmp_files()
+            # files of a run are never read again, keep the cache bounded
+            for path in paths:
+                self._loader._FILE_CACHE.pop(path, None)
+
+        stats = {}
+        for key in ('ok', 'failures', 'dark', 'changed', 'skipped',
+                    'rescued', 'ignored', 'processed'):
+            stats[key] = dict(getattr(tqm._stats, key, {}))
+
+        status = STATUS_SUCCESSFUL if rc == 0 else STATUS_FAILED
+        return RunResult(status, rc, stats, callback.events, callback.stdout)
+
+
+class EventCallback(CallbackBase):
+    """Collect runner events in the format used by ansible-runner"""
+
+    CALLBACK_VERSION = 2.0
+    CALLBACK_TYPE = 'stdout'
+    CALLBACK_NAME = 'network_runner'
+
+    def __init__(self, event_handler=None, keep_stdout=True):
+        super(EventCallback, self).__init__()
+        self.event_handler = event_handler
+        self.keep_stdout = keep_stdout
+        self.events = []
+        self.stdout = []
+        self._play = None
+        self._task = None
+        self._started = {}
+
+    def _event(self, event, stdout='', **event_data):
+        if self._play is not None:
+            event_data.setdefault('play', self._play.get_name())
+        if self._task is not None:
+            event_data.setdefault('task', self._task.get_name())
+            event_data.setdefault('task_action', self._task.action)
+        if stdout and self.keep_stdout:
+            self.stdout.append(stdout)
+        self.events.append(make_event(event, len(self.events) + 1, stdout,
+                                      **event_data))
+        if self.event_handler is not None:
+            self.event_handler(self.events[-1])
+
+    def _runner_event(self, event, result, prefix, verbose=False,
+                      **event_data):
+        host = result._host.get_name()
+        end = time.time()
+        start = self._started.pop((host, result._task._uuid), end)
+        stdout = '{}: [{}]'.format(prefix, host)
+        if verbose:
+            stdout += ' => {}'.format(json.dumps(result._result, default=str))
+        self._event(event, stdout,
+                    host=host, res=result._result,
+                    task=result._task.get_name(),
+                    task_action=result._task.action,
+                    start=start, end=end, duration=end - start,
+                    **event_data)
+
+    def error(self, msg):
+        self._event('error', 'ERROR! {}'.format(msg))
+
+    def v2_playbook_on_start(self, playbook):
+        self._event('playbook_on_start')
+
+    def v2_playbook_on_play_start(self, play):
+        self._play = play
+        self._task = None
+        self._event('playbook_on_play_start',
+                    'PLAY [{}]'.format(play.get_name()))
+
+    def v2_playbook_on_task_start(self, task, is_conditional):
+        self._task = task
+        self._event('playbook_on_task_start',
+                    'TASK [{}]'.format(task.get_name()))
+
+    def v2_runner_on_start(self, host, task):
+        self._started[(host.get_name(), task._uuid)] = time.time()
+
+    def v2_runner_on_ok(self, result):
+        prefix = 'changed' if result._result.get('changed') else 'ok'
+        self._runner_event('runner_on_ok', result, prefix)
+
+    def v2_runner_on_failed(self, result, ignore_errors=False):
+        self._runner_event('runner_on_failed', result, 'fatal', True,
+                           ignore_errors=ignore_errors)
+
+    def v2_runner_on_unreachable(self, result):
+        self._runner_event('runner_on_unreachable', result, 'unreachable',
+                           True)
+
+    def v2_runner_on_skipped(self, result):
+        self._runner_event('runner_on_skipped', result, 'skipping')
+
+    def v2_playbook_on_stats(self, stats):
+        self._event('playbook_on_stats')
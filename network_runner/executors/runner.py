@@ -0,0 +1,149 @@
+#
+# Licensed to the Apache Software Foundation (ASF) under one
+# or more contributor license agreements.  See the NOTICE file
+# distributed with this work for additional information
+# regarding copyright ownership.  The ASF licenses this file
+# to you under the Apache License, Version 2.0 (the
+# "License"); you may not use this file except in compliance
+# with the License.  You may obtain a copy of the License at
+#
+#   http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing,
+# software distributed under the License is distributed on an
+# "AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY
+# KIND, either express or implied.  See the License for the
+# specific language governing permissions and limitations
+# under the License.
+#
+import hashlib
+import json
+import os
+import shutil
+import tempfile
+import threading
+import weakref
+
+from network_runner.executors import Executor
+from network_runner.helpers import LazyModule
+
+# imported on first run, most of the import time of network_runner
+ansible_runner = LazyModule('ansible_runner')
+
+# inventory files kept on disk once no run uses them, a file is never
+# removed before the runs it was written for have finished
+KEEP_INVENTORIES = 4
+
+
+class AnsibleRunnerExecutor(Executor):
+    """Run playbooks in a new ansible-playbook process per run
+
+    The default executor.  Arguments are passed straight through to
+    ansible_runner.run, except for inventory dicts which are written to
+    a file kept by the executor.  The file is only written again when
+    the content of the inventory changes, and not at all when the same
+    serialized inventory is passed again.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._inventory = None
+        self._inventory_path = None
+        self._paths = []
+        self._refs = {}
+        self._tmpdir = None
+
+    def run(self, playbook, inventory, **kwargs):
+        inventory, path = self._acquire(inventory)
+        try:
+            return ansible_runner.run(playbook=playbook, inventory=inventory,
+                                      **kwargs)
+        finally:
+            self._release(path)
+
+    def run_async(self, playbook, inventory, **kwargs):
+        """Start a run in a background thread
+
+        The inventory file of the run is kept until the run calls its
+        finished_callback.
+
+        :returns: the thread and the ansible_runner Runner object
+        :rtype: tuple
+        """
+        inventory, path = self._acquire(inventory)
+        if path is not None:
+            finished = kwargs.pop('finished_callback', None)
+
+            def finished_callback(runner):
+                self._release(path)
+                if finished is not None:
+                    finished(runner)
+
+            kwargs['finished_callback'] = finished_callback
+
+        try:
+            return ansible_runner.run_async(playbook=playbook,
+                                            inventory=inventory, **kwargs)
+        except Exception:
+            self._release(path)
+            raise
+
+    def _acquire(self, inventory):
+        # the inventory to pass to ansible_runner and the file written
+        # for it, if any, which is in use until released
+        if not inventory or not isinstance(inventory, dict):
+            return inventory, None
+
+        with self._lock:
+            path = self._inventory_file(inventory)
+            self._refs[path] = self._refs.get(path, 0) + 1
+            self._evict()
+            return path, path
+
+    def _release(self, path):
+        if path is None:
+            return
+        with self._lock:
+            self._refs[path] -= 1
+            if not self._refs[path]:
+                del self._refs[path]
+            self._evict()
+
+    def _inventory_file(self, inventory):
+        # serialized inventories are cached and shared, the same object
+        # means the same content
+        if inventory is self._inventory:
+            return self._inventory_path
+
+        data = json.dumps(inventory, sort_keys=True)
+        name = 'hosts-{}.json'.format(
+            hashlib.sha1(data.encode('utf-8')).hexdigest())
+
+        if self._tmpdir is None:
+            self._tmpdir = tempfile.mkdtemp(prefix='network-runner-')
+            weakref.finalize(self, shutil.rmtree, self._tmpdir, True)
+        path = os.path.join(self._tmpdir, name)
+
+        if path in self._paths:
+            self._paths.remove(path)
+        else:
+            fd, tmp = tempfile.mkstemp(dir=self._tmpdir)
+            with os.fdopen(fd, 'w') as f:
+                f.write(data)
+            os.rename(tmp, path)
+        self._paths.append(path)
+
+        self._inventory = inventory
+        self._inventory_path = path
+        return path
+
+    def _evict(self):
+        # remove the oldest files no run uses beyond KEEP_INVENTORIES
+        idle = [p for p in self._paths if p not in self._refs]
+        while len(self._paths) > KEEP_INVENTORIES and idle:
+            path = idle.pop(0)
+            self._paths.remove(path)
+            os.remove(path)
+            if path == self._inventory_path:
+                self._inventory = None
+                self._inventory_path = None
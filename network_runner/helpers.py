@@ -16,6 +16,7 @@
 # specific language governing permissions and limitations
 # under the License.
 #
+import importlib
 import json
 from network_runner import exceptions
 
@@ -29,18 +30,37 @@ PYTHON_RESERVED = frozenset([
 
 class FakeTextIO(object):
     def __init__(self):
-        self._buff = ""
+        self._buff = []
 
     def write(self, out_stream):
-        self._buff += out_stream
+        self._buff.append(out_stream)
 
     def buff(self):
-        return self._buff
+        return ''.join(self._buff)
 
     def flush(self):
         return
 
 
+class LazyModule(object):
+    """Module imported when one of its attributes is first used
+
+    Defers the cost of importing large dependencies, such as
+    ansible_runner, from the import of network_runner to the first
+    call that needs them.
+
+    :param name: the name of the module
+    :type name: str
+    """
+
+    def __init__(self, name):
+        self.__name__ = name
+
+    def __getattr__(self, attr):
+        module = importlib.import_module(self.__name__)
+        return getattr(module, attr)
+
+
 def isvalidattrname(v):
     if v in PYTHON_RESERVED:
         raise ValueError("value is a reserved word")
@@ -59,27 +79,44 @@ def format_port_config(data, os):
 
     :returns: String
     """
-    # find source port configuration json string
-    source_config_json = ''
-    count = 0
-    for char in data:
-        if char == '{':
-            count += 1
-            # begin of json string
-            if count == 1:
-                source_config_json = ''
-        elif char == '}':
-            count -= 1
-            # end of json string
-            if count == 0:
-                source_config_json = source_config_json + '}'
-        if count > 0:
-            source_config_json += char
-    if count != 0:
+    # find the last json object in the output holding the task result,
+    # raw_decode parses each object in place without copying the output
+    decoder = json.JSONDecoder(strict=False)
+    source_config = span = None
+    pos = data.find('{')
+    while pos != -1:
+        try:
+            obj, end = decoder.raw_decode(data, pos)
+        except ValueError:
+            pos = data.find('{', pos + 1)
+            continue
+        if isinstance(obj, dict) and 'stdout_lines' in obj:
+            source_config, span = obj, (pos, end)
+        pos = data.find('{', end)
+    if source_config is None:
         raise exceptions.NetworkRunnerException(
-            'invaild json format: '.join(source_config_json))
+            'invaild json format: no port configuration found')
     # transform source port configuration to target port configuration
-    source_config = json.loads(source_config_json.replace('\n', ' '))
+    target_config = parse_port_config(source_config['stdout_lines'], os)
+    # replace source port configuration json to target port configuration json
+    return ''.join([data[:span[0]], json.dumps(target_config),
+                    data[span[1]:]])
+
+
+# network os whose get_port_conf output parse_port_config understands
+PORT_CONFIG_OS = frozenset(['fos'])
+
+
+def parse_port_config(stdout_lines, os):
+    """Parse the output of the get_port_conf task of a provider
+
+    :param stdout_lines: The stdout_lines of the task result
+    :type stdout_lines: List
+    :param os: The system of the switch
+    :type os: String
+
+    :returns: Dict with the mode, vlan and trunked_vlans of the port
+    """
     target_config = {
         'mode': None,
         'vlan': None,
@@ -87,7 +124,7 @@ def format_port_config(data, os):
         'trunked_vlans': '',
     }
     if os == "fos":
-        lines = source_config['stdout_lines'][0]
+        lines = stdout_lines[0]
         for line in lines:
             # deal switchport mode
             if line.startswith('switchport mode '):
@@ -103,5 +140,4 @@ def format_port_config(data, os):
                     'switchport trunk allowed vlan ', '')
     else:
         raise exceptions.NetworkRunnerException('invaild os type')
-    # replace source port configuration json to target port configuration json
-    return data.replace(source_config_json, json.dumps(target_config))
+    return target_config
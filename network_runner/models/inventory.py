@@ -16,27 +16,33 @@
 # specific language governing permissions and limitations
 # under the License.
 #
+import json
+import re
+
+from network_runner.types.containers import deferred
 from network_runner.types.objects import Object
 from network_runner.types.attrs import String, Dict, TypedDict
 from network_runner.types.attrs import SERIALIZE_WHEN_PRESENT
 from network_runner.types.attrs import SERIALIZE_WHEN_NEVER
-from network_runner.types.validators import ChoiceValidator
+from network_runner.providers import PROVIDERS
+from network_runner.providers import ProviderValidator
+
+
+# the providers are only looked up when a network os is first validated
+NETWORK_OS_VALIDATOR = ProviderValidator(PROVIDERS)
+
+ALL = 'all'
 
+# extensions of the inventory files Inventory.load reads as YAML
+YAML_EXTENSIONS = ('.yaml', '.yml')
 
-# Build the list of platform modules in the role providers directory
-import os
-RP_DEFAULT = '/usr/share/ansible/roles:/etc/ansible/roles:etc/ansible/roles'
-ROLE_PATH = os.environ.get('ANSIBLE_ROLES_PATH', RP_DEFAULT).split(':')
-PROVIDERS = []
-for i in ROLE_PATH:
-    net_runner_path = os.path.sep.join([i, 'network-runner'])
-    if os.path.exists(net_runner_path):
-        provider_path = os.path.sep.join([net_runner_path, 'providers'])
-        PROVIDERS.extend(os.listdir(provider_path))
-        break  # assume one installation of network-runner
+# host patterns that Inventory.select leaves to Ansible to resolve
+UNSUPPORTED_PATTERN = re.compile(r'[*?\[\]~!&]')
 
-# Create a validator from the providers list
-NETWORK_OS_VALIDATOR = ChoiceValidator(choices=(PROVIDERS))
+
+def _pattern_names(pattern):
+    names = [n.strip() for n in re.split(r'[,:]', pattern or '')]
+    return [n for n in names if n]
 
 
 class Host(Object):
@@ -79,18 +85,27 @@ class Host(Object):
 
         super(Host, self).__init__(**kwargs)
 
-    def serialize(self):
-        obj = super(Host, self).serialize()
+    def _serialize(self):
+        obj = super(Host, self)._serialize()
         obj['name'] = self.name
         obj.update(self.vars)
         return obj
 
-    def deserialize(self, ds):
+    def _cache(self, state):
+        super(Host, self)._cache(state)
+        # the vars in the state are replaced with those of the copy
+        # saved with it, which does not change with the host
+        saved = self._serialized[1][self._mutable.index('vars')]
+        if saved:
+            state.update(saved)
+
+    def deserialize(self, ds, validate=True):
         assert isinstance(ds, dict)
+        ds = dict(ds)
         obj = {}
         for name in self._attributes:
             obj[name] = ds.pop(name, None)
-        super(Host, self).deserialize(obj)
+        super(Host, self).deserialize(obj, validate)
         self.vars.update(ds)
 
 
@@ -124,7 +139,8 @@ class Inventory(Object):
 
     hosts = TypedDict(
         item_class=Host,
-        item_key='name'
+        item_key='name',
+        indexes=('ansible_host',)
     )
 
     children = TypedDict(
@@ -134,9 +150,108 @@ class Inventory(Object):
 
     vars = Dict()
 
-    def serialize(self):
-        obj = super(Inventory, self).serialize()
+    def _serialize(self):
+        obj = super(Inventory, self)._serialize()
         return {'all': obj}
 
-    def deserialize(self, obj):
-        super(Inventory, self).deserialize(obj['all'])
+    def targets(self, pattern):
+        """Names of the hosts targeted by a host pattern
+
+        :param pattern: the host pattern of a play
+        :type pattern: str
+
+        :returns: set of host names, or None when the pattern selects
+                  the whole inventory as described in ``select``
+        """
+        names = _pattern_names(pattern)
+        if any(n in (ALL, '*') or UNSUPPORTED_PATTERN.search(n)
+               for n in names):
+            return None
+
+        targets = set()
+        for name in names:
+            if name in self.children:
+                targets.update(self.children[name].hosts)
+            elif name in self.hosts:
+                targets.add(name)
+            else:
+                # left to Ansible, such as the implicit ungrouped group
+                return None
+        return targets
+
+    def select(self, pattern):
+        """Serialize the part of the inventory targeted by a host pattern
+
+        The pattern is a list of host and group names separated by
+        commas or colons, as in the hosts of a play.  Only the hosts it
+        targets are serialized, together with the groups they belong
+        to and the vars of those groups.  Patterns using wildcards,
+        regular expressions, exclusions or intersections, the all group
+        and names that are neither a host nor a group of the inventory
+        select the whole inventory.
+
+        :param pattern: the host pattern of a play
+        :type pattern: str
+
+        :returns: dict in the format of ``serialize``
+        """
+        targets = self.targets(pattern)
+        if targets is None:
+            return self.serialize()
+
+        names = _pattern_names(pattern)
+        hosts = dict((n, self.hosts[n].serialize())
+                     for n in targets if n in self.hosts)
+
+        children = {}
+        for group, child in self.children.items():
+            members = targets.intersection(child.hosts)
+            if members or group in names:
+                children[group] = {
+                    'hosts': dict((n, child.hosts[n].serialize())
+                                  for n in members),
+                    'vars': child.vars,
+                }
+
+        return {'all': {'hosts': hosts, 'children': children,
+                        'vars': self.vars}}
+
+    def deserialize(self, obj, validate=True):
+        """Load the inventory from its serialized form
+
+        :param obj: the inventory, as returned by ``serialize``
+        :type obj: dict
+
+        :param validate: validate the values of the inventory, set to
+                         False for inventories validated before
+        :type validate: bool
+        """
+        super(Inventory, self).deserialize(obj['all'], validate)
+
+    @classmethod
+    def load(cls, path):
+        """Load an inventory file
+
+        The file is in the format of ``serialize``, as JSON or, for
+        files ending in .yaml or .yml, as YAML.  Hosts are kept as the
+        records read from the file and each one is only built, and
+        validated, when it is first accessed or serialized.
+
+        :param path: the path of the inventory file
+        :type path: str
+
+        :returns: the inventory
+        :rtype: Inventory
+        """
+        with open(path) as f:
+            if path.endswith(YAML_EXTENSIONS):
+                import yaml
+                loader = getattr(yaml, 'CSafeLoader', yaml.SafeLoader)
+                obj = yaml.load(f, Loader=loader)
+            else:
+                obj = json.load(f)
+
+        inventory = cls()
+        with deferred():
+            inventory.deserialize(obj)
+        return inventory
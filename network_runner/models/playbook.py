@@ -25,6 +25,8 @@ from network_runner.types.attrs import SERIALIZE_WHEN_PRESENT
 
 class Base(object):
 
+    __slots__ = ()
+
     connection = String(
         serialize_when=SERIALIZE_WHEN_PRESENT
     )
@@ -0,0 +1,236 @@
+#
+# Licensed to the Apache Software Foundation (ASF) under one
+# or more contributor license agreements.  See the NOTICE file
+# distributed with this work for additional information
+# regarding copyright ownership.  The ASF licenses this file
+# to you under the Apache License, Version 2.0 (the
+# "License"); you may not use this file except in compliance
+# with the License.  You may obtain a copy of the License at
+#
+#   http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing,
+# software distributed under the License is distributed on an
+# "AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY
+# KIND, either express or implied.  See the License for the
+# specific language governing permissions and limitations
+# under the License.
+#
+import json
+import os
+import threading
+import time
+
+from network_runner.types.validators import ChoiceValidator
+
+RP_DEFAULT = '/usr/share/ansible/roles:/etc/ansible/roles:etc/ansible/roles'
+
+ROLE_NAME = 'network-runner'
+
+# providers installed outside of the role, searched first by run.yaml
+SITE_PROVIDERS = '/etc/ansible/network_runner/providers'
+
+# environment variable naming a manifest of the providers
+MANIFEST_ENV = 'NETWORK_RUNNER_PROVIDERS'
+
+# seconds between checks of the providers directories for changes
+CHECK_INTERVAL = 1.0
+
+
+class ProviderRegistry(object):
+    """Providers of the network-runner role
+
+    The providers are found on first use, in the site providers
+    directory and in the providers directory of the first network-runner
+    role on the roles path, as Ansible would resolve the role.  Each
+    file of a provider is taken from the first of those directories
+    that has it, so the site providers may override some files only.
+    Providers are cached and only scanned again when the modification
+    time of one of those directories, or of a provider directory in
+    them, changes, which is checked at most every interval.
+
+    A manifest, a JSON file mapping the name of each provider to its
+    directory as returned by ``providers``, replaces the scan.  It is
+    read once and never checked for changes.
+
+    :param roles_path: directories searched for the role, defaults to
+                       ANSIBLE_ROLES_PATH when the providers are found
+    :type roles_path: list
+
+    :param manifest: path of a manifest, defaults to the file named by
+                     the NETWORK_RUNNER_PROVIDERS environment variable
+    :type manifest: str
+
+    :param interval: seconds between checks for changes
+    :type interval: float
+    """
+
+    def __init__(self, roles_path=None, manifest=None,
+                 interval=CHECK_INTERVAL):
+        self.roles_path = roles_path
+        self.manifest = manifest
+        self.interval = interval
+        self._providers = None
+        self._files = None
+        self._stamps = None
+        self._directories = None
+        self._checked = 0
+        self._lock = threading.Lock()
+
+    def __contains__(self, name):
+        return name in self.providers()
+
+    def __iter__(self):
+        return iter(self.providers())
+
+    def __len__(self):
+        return len(self.providers())
+
+    def providers(self):
+        """Directories of the providers
+
+        :returns: dict of provider names to directories, shared
+                  between calls and must not be modified
+        """
+        providers = self._providers
+        if providers is not None:
+            # providers read from a manifest never change
+            if self._stamps is None:
+                return providers
+            if time.time() - self._checked < self.interval:
+                return providers
+
+        with self._lock:
+            manifest = self.manifest or os.environ.get(MANIFEST_ENV)
+            if manifest:
+                if self._providers is None:
+                    with open(manifest) as f:
+                        providers = json.load(f)
+                    self._files = dict(
+                        (name, _files(directory, {}))
+                        for name, directory in providers.items())
+                    self._providers = providers
+                return self._providers
+
+            directories = self.directories()
+            if self._providers is None or \
+                    directories != self._directories or \
+                    not _current(self._stamps):
+                self._providers, self._files, self._stamps = \
+                    self._scan(directories)
+                self._directories = directories
+            self._checked = time.time()
+            return self._providers
+
+    def files(self, name):
+        """Files of a provider
+
+        :param name: the name of the provider, as in ansible_network_os
+        :type name: str
+
+        :returns: dict of file names to paths, empty if there is no
+                  such provider, shared between calls and must not be
+                  modified
+        """
+        self.providers()
+        return self._files.get(name, {})
+
+    def path(self, name):
+        """The directory of a provider
+
+        :param name: the name of the provider, as in ansible_network_os
+        :type name: str
+
+        :returns: the directory or None if there is no such provider
+        """
+        return self.providers().get(name)
+
+    def directories(self):
+        """Directories that may hold providers, in search order
+
+        :returns: list of the site providers directory and of the
+                  providers directory of the role in each roles path
+        """
+        roles_path = self.roles_path
+        if roles_path is None:
+            roles_path = os.environ.get(
+                'ANSIBLE_ROLES_PATH', RP_DEFAULT).split(':')
+        directories = [SITE_PROVIDERS]
+        for path in roles_path:
+            # ansible-playbook may run from another directory
+            directories.append(os.path.abspath(
+                os.path.join(path, ROLE_NAME, 'providers')))
+        return directories
+
+    def clear(self):
+        """Forget the providers, they are found again on next use"""
+        with self._lock:
+            self._providers = None
+            self._files = None
+            self._stamps = None
+
+    @staticmethod
+    def _scan(directories):
+        # the site providers come first, then those of the first role
+        # found on the roles path
+        stamps = dict((d, _mtime(d)) for d in directories)
+        found = [d for d in directories if stamps[d] is not None]
+        if directories[0] in found:
+            found = found[:2]
+        else:
+            found = found[:1]
+
+        providers = {}
+        files = {}
+        for directory in found:
+            for name in sorted(os.listdir(directory)):
+                path = os.path.join(directory, name)
+                providers.setdefault(name, path)
+                stamps[path] = _mtime(path)
+                _files(path, files.setdefault(name, {}))
+        return providers, files, stamps
+
+
+def _files(directory, files):
+    # add the files of a directory missing from files
+    try:
+        names = sorted(os.listdir(directory))
+    except OSError:
+        names = []
+    for name in names:
+        files.setdefault(name, os.path.join(directory, name))
+    return files
+
+
+def _current(stamps):
+    # check none of the directories scanned last has changed
+    return all(_mtime(path) == stamp for path, stamp in stamps.items())
+
+
+def _mtime(path):
+    try:
+        return os.stat(path).st_mtime
+    except OSError:
+        return None
+
+
+class ProviderValidator(ChoiceValidator):
+    """Validate a value is the name of a provider of a registry
+
+    The providers are looked up when a value is validated, so none are
+    found until the first value is.
+    """
+
+    def __init__(self, registry):
+        self.registry = registry
+
+    @property
+    def choices(self):
+        return frozenset(self.registry.providers())
+
+    def __call__(self, value):
+        if value is not None and value not in self.registry.providers():
+            super(ProviderValidator, self).__call__(value)
+
+
+PROVIDERS = ProviderRegistry()
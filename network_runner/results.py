@@ -0,0 +1,382 @@
+#
+# Licensed to the Apache Software Foundation (ASF) under one
+# or more contributor license agreements.  See the NOTICE file
+# distributed with this work for additional information
+# regarding copyright ownership.  The ASF licenses this file
+# to you under the Apache License, Version 2.0 (the
+# "License"); you may not use this file except in compliance
+# with the License.  You may obtain a copy of the License at
+#
+#   http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing,
+# software distributed under the License is distributed on an
+# "AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY
+# KIND, either express or implied.  See the License for the
+# specific language governing permissions and limitations
+# under the License.
+#
+import calendar
+import datetime
+
+HOST_OK = 'ok'
+HOST_CHANGED = 'changed'
+HOST_FAILED = 'failed'
+HOST_UNREACHABLE = 'unreachable'
+HOST_SKIPPED = 'skipped'
+
+# task actions that locate and load the provider of a host rather than
+# talking to the device
+RESOLVE_ACTIONS = frozenset([
+    'import_role', 'include_role', 'import_tasks', 'include_tasks',
+    'include_vars', 'ansible.builtin.import_role',
+    'ansible.builtin.include_role', 'ansible.builtin.import_tasks',
+    'ansible.builtin.include_tasks', 'ansible.builtin.include_vars',
+])
+
+RUNNER_EVENTS = frozenset([
+    'runner_on_ok', 'runner_on_failed', 'runner_on_unreachable',
+    'runner_on_skipped',
+])
+
+
+class Result(object):
+    """Result of a single run of a playbook
+
+    Wraps the object returned by ansible_runner and proxies attribute
+    access to it so existing callers can keep using ``status``,
+    ``stats``, ``stdout`` and friends.  Adds a per host view of the
+    run for playbooks that target more than one host.
+    """
+
+    def __init__(self, runner, timing=None):
+        self.runner = runner
+        self.timing = timing
+
+    def __getattr__(self, key):
+        return getattr(self.__dict__['runner'], key)
+
+    @property
+    def stdout(self):
+        """Output of the run
+
+        ansible-runner raises for the stdout of runs made with
+        ``suppress_output_file``, those have no output.
+
+        :returns: iterable of lines
+        """
+        config = getattr(self.runner, 'config', None)
+        if getattr(config, 'suppress_output_file', False) is True:
+            return []
+        return self.runner.stdout
+
+    @property
+    def hosts(self):
+        """Status of each host in the run
+
+        Built from the final play recap.  Hosts that failed or were
+        unreachable are reported as such, all others are reported as
+        changed, ok or skipped.
+
+        :returns: dict mapping host name to one of the HOST_* values
+        """
+        stats = self.runner.stats
+        if not isinstance(stats, dict):
+            return {}
+
+        hosts = {}
+        for status, key in ((HOST_SKIPPED, 'skipped'),
+                            (HOST_OK, 'ok'),
+                            (HOST_CHANGED, 'changed'),
+                            (HOST_FAILED, 'failures'),
+                            (HOST_UNREACHABLE, 'dark')):
+            for host in (stats.get(key) or {}):
+                hosts[host] = status
+        return hosts
+
+    def failed(self):
+        """Names of the hosts that failed or were unreachable
+
+        :returns: list of host names
+        """
+        return sorted(n for n, s in self.hosts.items()
+                      if s in (HOST_FAILED, HOST_UNREACHABLE))
+
+    def failure_output(self):
+        """Output of the tasks that failed or could not reach a host
+
+        Built from the runner events, so it is available when the
+        stdout of the run was not retained.
+
+        :returns: list of lines
+        """
+        lines = []
+        for event in _iterate(self.runner.events):
+            name = event.get('event')
+            data = event.get('event_data') or {}
+            if name not in ('runner_on_failed', 'runner_on_unreachable') \
+                    or data.get('ignore_errors'):
+                continue
+            stdout = event.get('stdout')
+            if not stdout:
+                res = data.get('res') or {}
+                stdout = 'fatal: [{}]: {}! => {}'.format(
+                    data.get('host'),
+                    'FAILED' if name == 'runner_on_failed'
+                    else 'UNREACHABLE', res.get('msg', ''))
+            lines.append(stdout)
+        return lines
+
+
+def summarize(events, play=None):
+    """Reduce runner events to a status for each host
+
+    :param events: iterable of runner event dicts
+    :type events: iterable
+
+    :param play: only consider events from the play with this name
+    :type play: str
+
+    :returns: dict mapping host name to one of the HOST_* values
+    """
+    precedence = (HOST_SKIPPED, HOST_OK, HOST_CHANGED, HOST_FAILED,
+                  HOST_UNREACHABLE)
+
+    hosts = {}
+    for event in events:
+        data = event.get('event_data') or {}
+        if play is not None and data.get('play') != play:
+            continue
+
+        name = event.get('event')
+        if name == 'runner_on_ok':
+            changed = (data.get('res') or {}).get('changed')
+            status = HOST_CHANGED if changed else HOST_OK
+        elif name == 'runner_on_failed':
+            status = HOST_OK if data.get('ignore_errors') else HOST_FAILED
+        elif name == 'runner_on_unreachable':
+            status = HOST_UNREACHABLE
+        elif name == 'runner_on_skipped':
+            status = HOST_SKIPPED
+        else:
+            continue
+
+        host = data.get('host')
+        current = hosts.get(host)
+        if current is None or \
+                precedence.index(status) > precedence.index(current):
+            hosts[host] = status
+
+    return hosts
+
+
+def group_by_task(events, names):
+    """Split runner events between the tasks that emitted them
+
+    The tasks of a play run one after the other.  The events that
+    follow the start of a task named in ``names`` belong to it, as do
+    those of the tasks it includes, until the next of those tasks
+    starts.
+
+    :param events: iterable of runner event dicts, in the order they
+                   were emitted
+    :type events: iterable
+
+    :param names: names of the tasks to split the events between
+    :type names: iterable
+
+    :returns: dict mapping each name to the list of its events
+    """
+    groups = dict((name, []) for name in names)
+    current = None
+    for event in _iterate(events):
+        if event.get('event') == 'playbook_on_task_start':
+            task = (event.get('event_data') or {}).get('task')
+            if task in groups:
+                current = groups[task]
+        if current is not None:
+            current.append(event)
+    return groups
+
+
+def task_results(events, host=None, play=None):
+    """Results of the tasks that ran successfully
+
+    :param events: iterable of runner event dicts
+    :type events: iterable
+
+    :param host: only return the results of this host
+    :type host: str
+
+    :param play: only return the results of the play with this name
+    :type play: str
+
+    :returns: list of module result dicts in the order they ran
+    """
+    res = []
+    for event in _iterate(events):
+        if event.get('event') != 'runner_on_ok':
+            continue
+        data = event.get('event_data') or {}
+        if host is not None and data.get('host') != host:
+            continue
+        if play is not None and data.get('play') != play:
+            continue
+        res.append(data.get('res') or {})
+    return res
+
+
+class Timing(object):
+    """Where the time of a playbook run was spent
+
+    All values are in seconds.
+
+    * ``serialize``: building the playbook and inventory in Python
+    * ``startup``: from starting the executor to the first event of the
+      playbook, for ansible-runner this is the process startup
+    * ``resolve``: tasks that locate and include the provider files of
+      the role (include_vars, include_tasks and friends)
+    * ``device``: all other tasks.  Opening device connections happens
+      inside the first task run on a host and is counted here.
+    * ``total``: the whole run, as seen by the caller
+
+    ``tasks`` holds one entry per task and host with the play, task,
+    action, host, event and duration of the result.  Task times are
+    wall clock times: hosts running a task in parallel are counted once.
+    """
+
+    def __init__(self, serialize=0.0, startup=0.0, resolve=0.0, device=0.0,
+                 total=0.0, tasks=None):
+        self.serialize = serialize
+        self.startup = startup
+        self.resolve = resolve
+        self.device = device
+        self.total = total
+        self.tasks = tasks or []
+
+    def __repr__(self):
+        return '<Timing {}>'.format(' '.join(
+            '{}={:.3f}'.format(k, v) for k, v in sorted(self.phases.items())))
+
+    @property
+    def other(self):
+        """Time not accounted for by any phase
+
+        Includes writing the runner artifacts, the playbook stats and
+        the process shutdown.
+        """
+        accounted = self.serialize + self.startup + self.resolve + \
+            self.device
+        return max(self.total - accounted, 0.0)
+
+    @property
+    def phases(self):
+        """Duration of every phase
+
+        :returns: dict mapping phase name to seconds
+        """
+        return {'serialize': self.serialize, 'startup': self.startup,
+                'resolve': self.resolve, 'device': self.device,
+                'other': self.other, 'total': self.total}
+
+    @classmethod
+    def from_events(cls, events, started, executed, finished):
+        """Build the timing of a run from its runner events
+
+        :param events: the runner events of the run
+        :type events: iterable
+
+        :param started: time the run was requested
+        :type started: float
+
+        :param executed: time the executor was started
+        :type executed: float
+
+        :param finished: time the executor returned
+        :type finished: float
+
+        :returns: Timing
+        """
+        timing = cls(serialize=executed - started, total=finished - started)
+
+        first = None
+        spans = {}
+        order = []
+        for event in _iterate(events):
+            created = _timestamp(event.get('created'))
+            if first is None and created is not None:
+                first = created
+
+            if event.get('event') not in RUNNER_EVENTS:
+                continue
+
+            data = event.get('event_data') or {}
+            end = _timestamp(data.get('end')) or created
+            duration = float(data.get('duration') or 0.0)
+            start = _timestamp(data.get('start'))
+            if start is None and end is not None:
+                start = end - duration
+
+            timing.tasks.append({
+                'play': data.get('play'),
+                'task': data.get('task'),
+                'action': data.get('task_action'),
+                'host': data.get('host'),
+                'event': event.get('event'),
+                'duration': duration,
+            })
+
+            key = data.get('task_uuid') or (data.get('play'),
+                                            data.get('task'))
+            if key not in spans:
+                order.append(key)
+                spans[key] = [data.get('task_action'), start, end, duration]
+            else:
+                span = spans[key]
+                span[1] = _min(span[1], start)
+                span[2] = _max(span[2], end)
+                span[3] = max(span[3], duration)
+
+        if first is not None:
+            timing.startup = max(first - executed, 0.0)
+
+        for key in order:
+            action, start, end, duration = spans[key]
+            if start is not None and end is not None:
+                duration = end - start
+            if action in RESOLVE_ACTIONS:
+                timing.resolve += duration
+            else:
+                timing.device += duration
+
+        return timing
+
+
+def _iterate(events):
+    # events may be a generator reading them from the runner artifacts
+    try:
+        return iter(events or ())
+    except TypeError:
+        return iter(())
+
+
+def _min(a, b):
+    return b if a is None else a if b is None else min(a, b)
+
+
+def _max(a, b):
+    return b if a is None else a if b is None else max(a, b)
+
+
+def _timestamp(value):
+    # event times are epoch seconds or ISO 8601 strings in UTC
+    if value is None or isinstance(value, (int, float)):
+        return value
+    text = value.replace('Z', '').split('+')[0]
+    fmt = '%Y-%m-%dT%H:%M:%S.%f' if '.' in text else '%Y-%m-%dT%H:%M:%S'
+    try:
+        created = datetime.datetime.strptime(text, fmt)
+    except ValueError:
+        return None
+    return calendar.timegm(created.timetuple()) + \
+        created.microsecond / 1000000.0
@@ -25,8 +25,11 @@ from network_runner.types.containers import Map
 from network_runner.types.containers import Index
 from network_runner.types.validators import TypeValidator
 from network_runner.types.validators import RequiredValueValidator
+from network_runner.types.validators import compile_validators
 
 
+IMMUTABLE_TYPES = frozenset([str, int, float, bool, type(None)])
+
 SERIALIZE_WHEN_ALWAYS = 0
 SERIALIZE_WHEN_PRESENT = 1
 SERIALIZE_WHEN_NEVER = 2
@@ -45,6 +48,7 @@ class Attribute(object):
         self.serialize_when = serialize_when or SERIALIZE_WHEN_ALWAYS
 
         try:
+            self.declared = tuple(self.validators)
             self.validators = set(self.validators)
         except Exception:
             raise AttributeError("validators must be iterable")
@@ -62,15 +66,35 @@ class Attribute(object):
                     "required attributes must always be serialized"
                 )
 
+        self.compile()
+
         if self.default is not None:
             for item in self.validators:
                 item(self.default)
 
     def __call__(self, value):
         value = value if value is not None else self.default
-        for item in self.validators:
-            item(value)
-        return deepcopy(value)
+        self.validate(value)
+        return _copy(value)
+
+    def compile(self):
+        """Fuse the validators of the attribute into ``validate``
+
+        Called again by ```BaseMeta``` when a class is created, so
+        validators added to the set after the attribute was created are
+        picked up.
+        """
+        self.validate = compile_validators(self.validators, self.declared)
+
+
+def _copy(value):
+    # values are copied so that objects never share them with the
+    # caller, immutable and empty values need no deepcopy
+    if type(value) in IMMUTABLE_TYPES:
+        return value
+    if not value and type(value) in (dict, list):
+        return type(value)()
+    return deepcopy(value)
 
 
 class String(Attribute):
@@ -123,19 +147,31 @@ class TypedObject(Attribute):
 
 class TypedDict(Attribute):
 
-    def __init__(self, item_class, item_key, **kwargs):
+    def __init__(self, item_class, item_key, indexes=None, **kwargs):
         self.item_class = item_class
         self.item_key = item_key
+        self.indexes = tuple(indexes or ())
         if kwargs.get('default') is None:
-            kwargs['default'] = Map(self.item_class, self.item_key)
+            kwargs['default'] = Map(self.item_class, self.item_key,
+                                    self.indexes)
         super(TypedDict, self).__init__(type=Map, **kwargs)
 
     def __call__(self, value):
+        # maps built here are owned by the object and are not copied
         if isinstance(value, dict):
-            obj = Map(self.item_class, self.item_key)
+            obj = Map(self.item_class, self.item_key, self.indexes)
             obj.deserialize(value)
             value = obj
-        return super(TypedDict, self).__call__(value)
+            self.validate(value)
+        elif value is None and not self.default:
+            value = Map(self.item_class, self.item_key, self.indexes)
+            self.validate(value)
+        else:
+            value = super(TypedDict, self).__call__(value)
+            # maps built elsewhere get the indexes of the attribute
+            for name in self.indexes:
+                value.add_index(name)
+        return value
 
 
 class TypedList(Attribute):
@@ -153,5 +189,10 @@ class TypedList(Attribute):
         if isinstance(value, list):
             obj = Index(self.item_class)
             obj.deserialize(value)
-            value = obj
+            self.validate(obj)
+            return obj
+        if value is None and not self.default:
+            obj = Index(self.item_class)
+            self.validate(obj)
+            return obj
         return super(TypedList, self).__call__(value)
@@ -16,18 +16,70 @@
 # specific language governing permissions and limitations
 # under the License.
 #
+import contextlib
 import json
+import threading
 
 from collections.abc import MutableMapping, MutableSequence
 
 from six import iteritems
 
+from network_runner.types.validators import trusted
+
+
+class _State(threading.local):
+    deferred = False
+
+
+_state = _State()
+
+# held while an object of a map is built from its record, so threads
+# first accessing the same object all get the one built
+_build_lock = threading.RLock()
+
+
+@contextlib.contextmanager
+def deferred():
+    """Keep the records given to maps in this thread as they are
+
+    Maps deserialized within ``deferred`` store the record of each
+    object and only build the object when it is first accessed, so
+    loading a large inventory costs little more than parsing it::
+
+        with deferred():
+            inventory.deserialize(obj)
+
+    Records are not copied and not validated until their object is
+    built, errors in a record are raised by the access that builds it.
+    """
+    previous = _state.deferred
+    _state.deferred = True
+    try:
+        yield
+    finally:
+        _state.deferred = previous
+
+
+def _current(value, obj):
+    # check that obj is the current serialization of a cached value,
+    # records shared from a serialization are their own
+    if value is obj:
+        return True
+    cached = getattr(value, '_cached', None)
+    return cached is not None and cached() is obj
+
 
 class Index(MutableSequence):
+    """Objects of a class in order
+
+    Copies of an index share the serialization of its objects and
+    build their own objects from it when they are accessed.
+    """
 
     def __init__(self, cls):
         self.items = list()
         self.cls = cls
+        self._serialized = None
 
     def __repr__(self):
         return json.dumps(self.serialize())
@@ -42,29 +94,42 @@ class Index(MutableSequence):
         return self.__eq__(other)
 
     def __getitem__(self, index):
-        return self.__dict__['items'][index]
+        items = self.__dict__['items']
+        if isinstance(index, slice):
+            return [self[i] for i in range(*index.indices(len(items)))]
+        value = items[index]
+        if type(value) is dict:
+            value = items[index] = self.cls(**value)
+        return value
 
     def __setitem__(self, index, value):
         if not isinstance(value, self.cls):
             raise TypeError('invalid type')
         self.__dict__['items'][index] = value
+        self._serialized = None
 
     def __delitem__(self, index):
         del self.__dict__['items'][index]
+        self._serialized = None
 
     def __len__(self):
         return len(self.__dict__['items'])
 
     def __deepcopy__(self, memo):
-        kwargs = self.serialize()
-        o = type(self)(self.cls)
-        o.deserialize(kwargs)
+        # the copy holds the serialization of the objects, which is
+        # shared and never modified, in place of the objects
+        obj = self.serialize()
+        o = type(self).__new__(type(self))
+        Index.__init__(o, self.cls)
+        o.items = list(obj)
+        o._serialized = obj
         return o
 
     def insert(self, index, value):
         if not isinstance(value, self.cls):
             raise TypeError('invalid type')
         self.items.insert(index, value)
+        self._serialized = None
 
     def add(self, obj):
         if not isinstance(obj, self.cls):
@@ -76,25 +141,72 @@ class Index(MutableSequence):
         self.add(obj)
         return obj
 
-    def __setstate__(self, ds):
+    def __setstate__(self, ds, validate=True):
         assert isinstance(ds, list)
+        if not validate:
+            with trusted():
+                return self.__setstate__(ds)
         for item in ds:
             self.new(**item)
 
     deserialize = __setstate__
 
     def __getstate__(self):
-        return [o.serialize() for o in self.items]
+        return [o if type(o) is dict else o.serialize() for o in self.items]
+
+    def serialize(self):
+        """Serialize the items of the index
+
+        Items are serialized through their own cache and the list is
+        only rebuilt when one of them changed.  The result is shared
+        between calls and must not be modified.
+
+        :returns: list
+        """
+        obj = self.__getstate__()
+        if self._serialized is not None and len(obj) == len(
+                self._serialized) and all(
+                    a is b for a, b in zip(obj, self._serialized)):
+            return self._serialized
+        self._serialized = obj
+        return obj
 
-    serialize = __getstate__
+    def _state(self):
+        """The cached serialization, current or not"""
+        return self._serialized
+
+    def _cached(self):
+        """The cached serialization if it is still current or None"""
+        cache = self._serialized
+        if cache is None or len(cache) != len(self.items):
+            return None
+        for item, obj in zip(self.items, cache):
+            if not _current(item, obj):
+                return None
+        return cache
 
 
 class Map(MutableMapping):
+    """Objects of a class keyed by one of their attributes
+
+    Attributes named in ``indexes`` are kept in secondary indexes which
+    ``find`` uses to look objects up by value.  The indexes follow
+    changes made to the attributes of the objects in the map.
 
-    def __init__(self, cls, key):
+    Maps deserialized within ``deferred`` hold the records of their
+    objects, as dicts, until the objects are accessed.  Copies of a
+    map hold the serialization of its objects in the same way, so
+    copying costs no more than copying a dict.
+    """
+
+    def __init__(self, cls, key, indexes=None):
         self.objects = {}
         self.cls = cls
         self.key = key
+        self.indexes = {}
+        self._serialized = None
+        for name in indexes or ():
+            self.add_index(name)
 
     def __repr__(self):
         return json.dumps(self.serialize())
@@ -109,15 +221,30 @@ class Map(MutableMapping):
         return self.__eq__(other)
 
     def __getitem__(self, key):
-        return self.__dict__['objects'][key]
+        value = self.__dict__['objects'][key]
+        if type(value) is dict:
+            value = self._build(key, value)
+        return value
+
+    def __contains__(self, key):
+        return key in self.__dict__['objects']
 
     def __setitem__(self, key, value):
         if not isinstance(value, self.cls):
             raise TypeError("invalid type")
-        self.__dict__['objects'][key] = value
+        objects = self.__dict__['objects']
+        if self.indexes and key in objects:
+            self._unindex(key, objects[key])
+        objects[key] = value
+        self._serialized = None
+        if self.indexes:
+            self._index(key, value)
 
     def __delitem__(self, key):
-        del self.__dict__['objects'][key]
+        value = self.__dict__['objects'].pop(key)
+        self._serialized = None
+        if self.indexes:
+            self._unindex(key, value)
 
     def __iter__(self):
         return iter(self.__dict__['objects'])
@@ -126,11 +253,124 @@ class Map(MutableMapping):
         return len(self.__dict__['objects'])
 
     def __deepcopy__(self, memo):
-        kwargs = self.serialize()
+        # the serialization is shared and never modified, objects of
+        # the copy are built from it when they are accessed
+        obj = self.serialize()
         o = type(self)(self.cls, self.key)
-        o.deserialize(kwargs)
+        o.objects = dict(obj)
+        for name, index in iteritems(self.indexes):
+            # only the keys of shared values are dicts of their own
+            index = o.indexes[name] = dict(index)
+            for value, keys in iteritems(index):
+                if isinstance(keys, dict):
+                    index[value] = dict(keys)
+        o._serialized = obj
         return o
 
+    def add_index(self, name):
+        """Keep a secondary index of the objects on an attribute
+
+        :param name: the name of the attribute to index
+        :type name: str
+        """
+        if name in self.indexes:
+            return
+        self.indexes[name] = {}
+        for key, value in iteritems(self.objects):
+            self._index(key, value)
+
+    def find(self, name, value):
+        """Objects with an attribute set to a value
+
+        :param name: the name of an indexed attribute
+        :type name: str
+
+        :param value: the value to look up
+
+        :returns: list of the matching objects in the order they
+                  were added
+        """
+        keys = self.indexes[name].get(value)
+        if keys is None:
+            return []
+        if not isinstance(keys, dict):
+            return [self[keys]]
+        return [self[k] for k in keys]
+
+    def _build(self, key, record):
+        # replace the record of an object with the object, the maps it
+        # holds keep their records in turn
+        with _build_lock:
+            # another thread may have built it while this one waited
+            record = self.objects[key]
+            if type(record) is not dict:
+                return record
+            kwargs = dict(record)
+            kwargs[self.key] = key
+            with deferred():
+                obj = self.cls(**kwargs)
+            if self.indexes:
+                self._unindex(key, record)
+            self.objects[key] = obj
+            if self.indexes:
+                self._index(key, obj)
+            return obj
+
+    def _value(self, obj, name):
+        # the value of an attribute of an object or of its record
+        if type(obj) is not dict:
+            return getattr(obj, name, None)
+        attr = self.cls._attributes[name]
+        for item in (name,) + attr.aliases:
+            if obj.get(item) is not None:
+                return obj[item]
+        return attr.default
+
+    def _index(self, key, obj):
+        for name, index in iteritems(self.indexes):
+            self._insert(index, self._value(obj, name), key)
+        if type(obj) is not dict:
+            obj._listeners = (getattr(obj, '_listeners', None) or ()) + \
+                ((self, key),)
+
+    def _unindex(self, key, obj):
+        for name, index in iteritems(self.indexes):
+            self._discard(index, self._value(obj, name), key)
+        listeners = getattr(obj, '_listeners', None)
+        if listeners:
+            obj._listeners = tuple(
+                i for i in listeners if i[0] is not self) or None
+
+    def _changed(self, key, obj, name, old, new):
+        index = self.indexes.get(name)
+        if index is not None:
+            self._discard(index, old, key)
+            self._insert(index, new, key)
+
+    @staticmethod
+    def _insert(index, value, key):
+        # most values belong to one object, their key is stored as is.
+        # dicts keep the keys of shared values in insertion order
+        if value is None:
+            return
+        keys = index.get(value)
+        if keys is None:
+            index[value] = key
+        elif isinstance(keys, dict):
+            keys[key] = None
+        elif keys != key:
+            index[value] = {keys: None, key: None}
+
+    @staticmethod
+    def _discard(index, value, key):
+        keys = index.get(value)
+        if isinstance(keys, dict):
+            keys.pop(key, None)
+            if len(keys) == 1:
+                index[value] = next(iter(keys))
+        elif keys is not None and keys == key:
+            del index[value]
+
     def add(self, obj):
         assert isinstance(obj, self.cls)
         key = getattr(obj, self.key)
@@ -149,23 +389,82 @@ class Map(MutableMapping):
 
         return obj
 
-    def __setstate__(self, ds):
+    def __setstate__(self, ds, validate=True):
         assert isinstance(ds, dict)
+        if not validate:
+            with trusted():
+                return self.__setstate__(ds)
+        if _state.deferred:
+            return self._defer(ds)
         for key, value in iteritems(ds):
-            if not value:
-                value = {}
+            value = dict(value or {})
             value[self.key] = key
             self.new(**value)
 
     deserialize = __setstate__
 
+    def _defer(self, ds):
+        objects = self.objects
+        for key, record in iteritems(ds):
+            if key in objects:
+                raise ValueError("item already exists")
+            if record is None:
+                record = {}
+            elif not isinstance(record, dict):
+                raise TypeError("invalid record for '{}'".format(key))
+            elif type(record) is not dict:
+                record = dict(record)
+            objects[key] = record
+            if self.indexes:
+                self._index(key, record)
+        self._serialized = None
+
     def __getstate__(self):
         obj = {}
-        for key, value in iteritems(self.objects):
+        for key in self.objects:
+            value = self[key]
             if hasattr(value, 'serialize'):
                 obj[key] = value.serialize()
             else:
                 obj[key] = value
         return obj
 
-    serialize = __getstate__
+    def serialize(self):
+        """Serialize the objects of the map
+
+        Objects are serialized through their own cache and the dict is
+        only rebuilt when one of them changed.  The result is shared
+        between calls and must not be modified.
+
+        :returns: dict
+        """
+        cache = self._serialized
+        if cache is not None and len(cache) == len(self.objects):
+            changed = [k for k, v in iteritems(self.objects)
+                       if not _current(v, cache.get(k))]
+            if not changed:
+                return cache
+            # only the objects that changed are serialized again
+            obj = dict(cache)
+            for key in changed:
+                value = self[key]
+                obj[key] = value.serialize() \
+                    if hasattr(value, 'serialize') else value
+        else:
+            obj = self.__getstate__()
+        self._serialized = obj
+        return obj
+
+    def _state(self):
+        """The cached serialization, current or not"""
+        return self._serialized
+
+    def _cached(self):
+        """The cached serialization if it is still current or None"""
+        cache = self._serialized
+        if cache is None or len(cache) != len(self.objects):
+            return None
+        for key, value in iteritems(self.objects):
+            if not _current(value, cache.get(key)):
+                return None
+        return cache
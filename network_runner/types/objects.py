@@ -18,11 +18,17 @@
 #
 import json
 
-from six import with_metaclass, iteritems
+from copy import deepcopy
+
+from six import PY2, with_metaclass, iteritems
 
 from network_runner.types.attrs import Attribute
+from network_runner.types.attrs import IMMUTABLE_TYPES
+from network_runner.types.attrs import String
+from network_runner.types.attrs import _copy
 from network_runner.types.attrs import SERIALIZE_WHEN_ALWAYS
 from network_runner.types.attrs import SERIALIZE_WHEN_NEVER
+from network_runner.types.validators import trusted
 from network_runner.helpers import isvalidattrname
 
 
@@ -36,6 +42,7 @@ class BaseMeta(type):
                 attr = attr_dct[attr_name]
                 if isinstance(attr, Attribute):
                     attr.name = attr_name
+                    attr.compile()
 
                     isvalidattrname(attr_name)
                     dct['_attributes'][attr_name] = attr
@@ -53,61 +60,203 @@ class BaseMeta(type):
 
         # process parents first to allow more specific overrides
         for parent in parents:
+            dct['_attributes'].update(parent.__dict__.get('_attributes', {}))
             _create_attrs(parent.__dict__)
 
         _create_attrs(dct)
 
-        return super(BaseMeta, cls).__new__(cls, name, parents, dct)
+        # attributes whose values can change without being set again
+        dct['_mutable'] = tuple(
+            n for n, a in iteritems(dct['_attributes'])
+            if n == a.name and a.type not in (str, int, bool))
 
+        # every attribute is stored once, in a slot, aliases read the
+        # slot of their attribute
+        inherited = set()
+        for parent in parents:
+            for klass in parent.__mro__:
+                inherited.update(klass.__dict__.get('__slots__', ()))
+
+        slots = []
+        if not any(isinstance(p, BaseMeta) for p in parents):
+            # __dict__ is only created for objects given private values
+            slots.extend(('_serialized', '_listeners', '__dict__'))
+
+        for key, attr in iteritems(dct['_attributes']):
+            if key != attr.name:
+                dct.setdefault(key, _alias(attr.name))
+            elif key not in inherited:
+                slots.append(key)
+                dct.pop(key, None)
+
+        dct.setdefault('__slots__', tuple(slots))
+
+        # the hot paths are generated for the attributes of each class
+        # so they do not have to inspect the attributes on every call,
+        # on first use so classes that are never used cost nothing
+        attributes = dct['_attributes']
+        dct['_setters'] = dict((key, _setter(attr))
+                               for key, attr in iteritems(attributes))
+        dct['_init'] = _generated('_init', _initializer, name, attributes)
+        if '__getstate__' not in dct:
+            dct['__getstate__'] = _generated(
+                '__getstate__', _serializer, name, attributes)
 
-class Object(with_metaclass(BaseMeta)):
+        return super(BaseMeta, cls).__new__(cls, name, parents, dct)
 
-    def __init__(self, **kwargs):
-        attrs = list(self._attributes)
 
-        for key, value in iteritems(kwargs):
-            attrs.remove(key)
-            attr = self._attributes[key]
+def _alias(name):
+    return property(lambda self: getattr(self, name),
+                    doc="alias of '{}'".format(name))
+
+
+def _generated(funcname, generator, classname, attributes):
+    # stands in for a generated method until its first call, which
+    # generates the method and puts it in place of the stub
+    def stub(self, *args):
+        func = generator(classname, attributes)
+        for klass in type(self).__mro__:
+            if klass.__dict__.get(funcname) is stub:
+                setattr(klass, funcname, func)
+        return func(self, *args)
+
+    return stub
+
+
+def _generate(source, funcname, namespace):
+    code = compile('\n'.join(source), '<{}>'.format(funcname), 'exec')
+    exec(code, namespace)
+    return namespace[funcname.rsplit('.', 1)[-1]]
+
+
+def _setter(attr):
+    # sets an attribute of an object that may be cached or indexed
+    name = attr.name
+    store = object.__setattr__
+
+    def setter(self, value):
+        value = attr(value)
+        store(self, '_serialized', None)
+
+        # containers indexing this object are told of the change
+        listeners = getattr(self, '_listeners', None)
+        if listeners:
+            old = getattr(self, name, None)
+            for container, item in listeners:
+                container._changed(item, self, name, old, value)
+
+        store(self, name, value)
+
+    return setter
+
+
+def _plain(attr):
+    # attributes whose call only validates and copies the value
+    call = type(attr).__call__
+    return call is Attribute.__call__ or \
+        call is String.__call__ and not PY2
+
+
+def _initializer(classname, attributes):
+    """Generate the function that sets the attributes of a new object
+
+    Every attribute is set once from its value, or the value of one of
+    its aliases, in kwargs or else from its default.  Attributes that
+    are not converted by their type are validated and copied inline.
+    """
+    namespace = {'store': object.__setattr__, 'copy': _copy,
+                 'known': frozenset(attributes)}
+    source = [
+        'def _init(self, kwargs):',
+        '    store(self, "_serialized", None)',
+        '    store(self, "_listeners", None)',
+        '    if not known.issuperset(kwargs):',
+        '        raise ValueError("unknown attributes: {}".format(',
+        '            ", ".join(sorted(set(kwargs).difference(known)))))',
+    ]
+    for index, (key, attr) in enumerate(iteritems(attributes)):
+        if key != attr.name:
+            continue
+        namespace['attr{}'.format(index)] = attr
+        source.append('    value = kwargs.get({!r})'.format(key))
+        for alias in attr.aliases:
+            source.append('    if value is None:')
+            source.append('        value = kwargs.get({!r})'.format(alias))
+        if _plain(attr):
+            namespace['default{}'.format(index)] = attr.default
+            source.append('    if value is None:')
+            source.append('        value = default{}'.format(index))
+            source.append('    attr{}.validate(value)'.format(index))
+            source.append('    store(self, {!r}, copy(value))'.format(key))
+        else:
+            source.append('    store(self, {!r}, attr{}(value))'.format(
+                key, index))
+    return _generate(source, '{}._init'.format(classname), namespace)
+
+
+def _serialize_value(value):
+    return value.serialize() if hasattr(value, 'serialize') else value
+
+
+def _serializer(classname, attributes):
+    """Generate ``__getstate__`` for the attributes of a class
+
+    The checks of the type and of ``serialize_when`` of each attribute
+    are made once here, leaving a single test per attribute.
+    """
+    namespace = {'serialize': _serialize_value}
+    source = ['def __getstate__(self):', '    obj = {}']
+    for key, attr in iteritems(attributes):
+        if attr.serialize_when == SERIALIZE_WHEN_NEVER:
+            continue
+
+        if attr.type in (dict, list):
+            test = 'value' \
+                if attr.serialize_when != SERIALIZE_WHEN_ALWAYS else None
+        else:
+            test = 'value is not None'
+
+        if attr.type in IMMUTABLE_TYPES or attr.type in (dict, list):
+            value = 'value'
+        elif callable(getattr(attr.type, 'serialize', None)):
+            value = 'value.serialize()'
+        else:
+            value = 'serialize(value)'
+
+        source.append('    value = self.{}'.format(attr.name))
+        if test is None:
+            source.append('    obj[{!r}] = {}'.format(key, value))
+        else:
+            source.append('    if {}:'.format(test))
+            source.append('        obj[{!r}] = {}'.format(key, value))
+    source.append('    return obj')
+    return _generate(source, '{}.__getstate__'.format(classname), namespace)
 
-            if key == attr.name:
-                setattr(self, key, value)
-            elif key in attr.aliases:
-                setattr(self, attr.name, value)
 
-        for key in attrs:
-            if not hasattr(self, key) or \
-               isinstance(getattr(self, key), Attribute):
-                setattr(self, key, self._attributes[key].default)
+class Object(with_metaclass(BaseMeta)):
+
+    def __init__(self, **kwargs):
+        self._init(kwargs)
 
     def __repr__(self):
         return json.dumps(self.serialize())
 
     def __setattr__(self, key, value):
-        if key in self._attributes:
-            attr = self._attributes[key]
-
-            value = attr(value)
+        setter = self._setters.get(key)
+        if setter is not None:
+            return setter(self, value)
 
-            if attr.name != key:
-                self.__dict__[attr.name] = value
+        if isinstance(getattr(type(self), key, None), Attribute):
+            raise AttributeError("attribute '{}' is read only".format(key))
 
-            for item in attr.aliases:
-                if item != key:
-                    self.__dict__[item] = value
-
-        elif key in dir(self):
-            attr = getattr(self, key)
-            if isinstance(attr, Attribute):
-                raise AttributeError("attribute '{}' is read only".format(key))
-
-        elif not key.startswith('_'):
+        elif not key.startswith('_') and not hasattr(type(self), key):
             raise AttributeError("'{}' object has no attribute '{}'".format(
                 self.__class__.__name__, key))
 
-        self.__dict__[key] = value
+        object.__setattr__(self, key, value)
 
     def __delattr__(self, key):
-        if key not in self._attributes and key in dir(self):
+        if key not in self._attributes and hasattr(type(self), key):
             raise AttributeError("cannot delete attribute '{}'".format(key))
         self.__setattr__(key, None)
 
@@ -121,42 +270,77 @@ class Object(with_metaclass(BaseMeta)):
         return self.__eq__(other)
 
     def __deepcopy__(self, memo):
-        kwargs = self.serialize()
+        # attributes copy their values, containers are copied without
+        # building their objects again
+        kwargs = dict((key, getattr(self, key))
+                      for key, attr in iteritems(self._attributes)
+                      if key == attr.name)
         return type(self)(**kwargs)
 
-    def __getstate__(self):
-        obj = {}
-        for item, attr in iteritems(self._attributes):
-            value = getattr(self, item)
-
-            if attr.type in (dict, list):
-                if value and attr.serialize_when != SERIALIZE_WHEN_NEVER or \
-                    attr.serialize_when == SERIALIZE_WHEN_ALWAYS:
-
-                    if hasattr(value, 'serialize'):
-                        obj[item] = value.serialize()
-                    else:
-                        obj[item] = value
-
-            elif value is not None and \
-                attr.serialize_when < SERIALIZE_WHEN_NEVER:
-
-                if hasattr(value, 'serialize'):
-                    obj[item] = value.serialize()
-                else:
-                    obj[item] = value
-
-        return obj
-
-    serialize = __getstate__
-
-    def __setstate__(self, ds):
+    def serialize(self):
+        """Serialize the object
+
+        The result is cached until an attribute of the object, or of
+        an object or container it holds, is changed.  It is shared
+        between calls and must not be modified.
+
+        :returns: dict
+        """
+        state = self._cached()
+        if state is None:
+            state = self._serialize()
+            self._cache(state)
+        return state
+
+    def _serialize(self):
+        return self.__getstate__()
+
+    def _cache(self, state):
+        # values that can change in place are saved with the state to
+        # compare against: a copy of dicts and lists, and the state of
+        # objects and containers which check themselves.  The state is
+        # shared, so it holds the copies rather than the dicts and
+        # lists of the object, which may still change
+        saved = []
+        for item in self._mutable:
+            value = getattr(self, item, None)
+            if hasattr(value, '_cached'):
+                # values in the state were serialized just now
+                obj = value._state()
+                saved.append(obj if obj is not None else value.serialize())
+                continue
+            obj = deepcopy(value) if value else None
+            saved.append(obj)
+            if type(state) is dict and state.get(item) is value:
+                state[item] = obj if obj is not None else type(value)()
+        object.__setattr__(self, '_serialized', (state, tuple(saved)))
+
+    def _cached(self):
+        """The cached serialization if it is still current or None"""
+        cache = getattr(self, '_serialized', None)
+        if cache is None:
+            return None
+        for item, saved in zip(self._mutable, cache[1]):
+            value = getattr(self, item, None)
+            if hasattr(value, '_cached'):
+                if value._cached() is not saved:
+                    return None
+            elif value != saved if saved is not None else value:
+                return None
+        return cache[0]
+
+    def _state(self):
+        """The cached serialization, current or not"""
+        cache = getattr(self, '_serialized', None)
+        return cache[0] if cache is not None else None
+
+    def __setstate__(self, ds, validate=True):
         assert isinstance(ds, dict), "argument must be of type 'dict'"
+        if not validate:
+            with trusted():
+                return self.__setstate__(ds)
+        setters = self._setters
         for key, value in iteritems(ds):
-            attr = self._attributes[key]
-            if hasattr(attr, 'deserialize'):
-                attr.deserialize(value)
-            else:
-                setattr(self, key, value)
+            setters[key](self, value)
 
     deserialize = __setstate__
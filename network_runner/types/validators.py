@@ -16,6 +16,85 @@
 # specific language governing permissions and limitations
 # under the License.
 #
+import contextlib
+import threading
+
+
+class _State(threading.local):
+    trusted = False
+
+
+_state = _State()
+
+
+@contextlib.contextmanager
+def trusted():
+    """Skip the validation of values set in this thread
+
+    For building objects from data that was validated before, for
+    example an inventory saved by a previous run::
+
+        with trusted():
+            inventory.deserialize(obj)
+    """
+    previous = _state.trusted
+    _state.trusted = True
+    try:
+        yield
+    finally:
+        _state.trusted = previous
+
+
+def compile_validators(validators, declared=()):
+    """Fuse a set of validators into a single function
+
+    Type checks run first, then the required value check and then the
+    other validators, in the order they were declared.  The function
+    does nothing for values set within ``trusted``.
+
+    :param validators: the validators of an attribute
+    :type validators: set
+
+    :param declared: the validators in the order they were declared
+    :type declared: tuple
+
+    :returns: a function called with the value to validate
+    """
+    types = tuple(v.type for v in validators if isinstance(v, TypeValidator))
+    required = any(isinstance(v, RequiredValueValidator) for v in validators)
+    others = [v for v in validators
+              if not isinstance(v, (TypeValidator, RequiredValueValidator))]
+    order = dict((id(v), i) for i, v in enumerate(declared))
+    others.sort(key=lambda v: (order.get(id(v), len(order)),
+                               type(v).__name__))
+    others = tuple(others)
+
+    if len(types) == 1 and not required and not others:
+        kind = types[0]
+
+        def validate(value):
+            if value is not None and not isinstance(value, kind) and \
+                    not _state.trusted:
+                raise TypeError(
+                    "value must be {}, got {}".format(kind, type(value)))
+
+        return validate
+
+    def validate(value):
+        if _state.trusted:
+            return
+        if value is None:
+            if required:
+                raise ValueError("missing required value")
+        else:
+            for kind in types:
+                if not isinstance(value, kind):
+                    raise TypeError(
+                        "value must be {}, got {}".format(kind, type(value)))
+        for item in others:
+            item(value)
+
+    return validate
 
 
 class TypeValidator(object):
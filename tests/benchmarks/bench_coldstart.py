@@ -0,0 +1,79 @@
+# Copyright (c) 2018 Red Hat, Inc.
+# All Rights Reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License"); you may
+# not use this file except in compliance with the License. You may obtain
+# a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+# WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+# License for the specific language governing permissions and limitations
+# under the License.
+#
+# Cold start of a new process: importing network_runner.api and
+# running the first operation.  Every round starts a new interpreter,
+# so the timings include interpreter startup; the import time of
+# network_runner.api alone, as reported by python -X importtime, is
+# saved as ``import_us`` and the time from the start of the process
+# to the first result as ``first_play``.
+import subprocess
+import sys
+
+import pytest
+
+FIRST_PLAY = '''
+import sys
+import time
+started = time.time()
+from network_runner.api import NetworkRunner
+from network_runner.models.inventory import Inventory
+from network_runner.models.inventory import Host
+executor = None
+if sys.argv[1] == 'dry-run':
+    from network_runner.executors.dryrun import DryRunExecutor
+    executor = DryRunExecutor()
+inventory = Inventory()
+inventory.hosts.add(Host(name='switch0', ansible_network_os='openvswitch',
+                         ansible_connection='local',
+                         ansible_python_interpreter=sys.executable))
+NetworkRunner(inventory, executor=executor).create_vlan('switch0', 37)
+print(time.time() - started)
+'''
+
+
+def _import_us():
+    command = [sys.executable, '-X', 'importtime', '-c',
+               'import network_runner.api']
+    out = subprocess.run(command, stderr=subprocess.PIPE,
+                         universal_newlines=True, check=True).stderr
+    for line in out.splitlines():
+        if line.rstrip().endswith('| network_runner.api'):
+            return int(line.split('|')[1])
+
+
+def test_import_time(benchmark):
+    benchmark.group = 'cold-start'
+    imports = []
+    benchmark.pedantic(lambda: imports.append(_import_us()),
+                       rounds=5, iterations=1)
+    benchmark.extra_info['import_us'] = min(imports)
+
+
+@pytest.mark.parametrize('executor', ['dry-run', 'ansible-runner'])
+def test_first_play(benchmark, executor):
+    benchmark.group = 'cold-start'
+    if executor == 'ansible-runner':
+        pytest.importorskip('ansible_runner')
+    times = []
+
+    def first_play():
+        out = subprocess.run([sys.executable, '-c', FIRST_PLAY, executor],
+                             stdout=subprocess.PIPE, universal_newlines=True,
+                             check=True).stdout
+        times.append(float(out.split()[-1]))
+
+    benchmark.pedantic(first_play, rounds=3, iterations=1)
+    benchmark.extra_info['first_play'] = min(times)
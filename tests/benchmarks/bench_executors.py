@@ -0,0 +1,57 @@
+# Copyright (c) 2018 Red Hat, Inc.
+# All Rights Reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License"); you may
+# not use this file except in compliance with the License. You may obtain
+# a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+# WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+# License for the specific language governing permissions and limitations
+# under the License.
+#
+# Compares the ansible-runner and in-process executors end to end.  The
+# openvswitch provider implements create_vlan as a noop, so the numbers
+# are the fixed cost of a run: process startup, plugin loading and role
+# resolution.
+import sys
+
+import pytest
+
+from network_runner.api import NetworkRunner
+from network_runner.models.inventory import Inventory
+from network_runner.models.inventory import Host
+
+pytest.importorskip('ansible')
+pytest.importorskip('ansible_runner')
+
+from network_runner.executors.inprocess import InProcessExecutor  # noqa
+
+HOSTS = ['switch{}'.format(i) for i in range(3)]
+
+
+def _runner(executor=None):
+    inventory = Inventory()
+    for name in HOSTS:
+        inventory.hosts.add(Host(name=name,
+                                 ansible_network_os='openvswitch',
+                                 ansible_connection='local',
+                                 ansible_python_interpreter=sys.executable))
+    return NetworkRunner(inventory, executor=executor)
+
+
+def test_ansible_runner(benchmark):
+    runner = _runner()
+    benchmark.pedantic(runner.create_vlan, args=(HOSTS, 37),
+                       rounds=5, iterations=1)
+
+
+def test_in_process(benchmark):
+    runner = _runner(InProcessExecutor())
+    # the first run loads plugins and parses the role
+    runner.create_vlan(HOSTS, 37)
+    benchmark.pedantic(runner.create_vlan, args=(HOSTS, 37),
+                       rounds=5, iterations=1)
@@ -0,0 +1,265 @@
+# Copyright (c) 2018 Red Hat, Inc.
+# All Rights Reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License"); you may
+# not use this file except in compliance with the License. You may obtain
+# a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+# WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+# License for the specific language governing permissions and limitations
+# under the License.
+#
+# Hot paths of the model and type layers: building and serializing
+# large inventories, copying them, building playbooks, looking up hosts
+# and parsing port configuration.  Every benchmark also records the
+# peak memory of one call.
+import copy
+import json
+import tracemalloc
+
+import pytest
+
+from network_runner import helpers
+from network_runner.api import NetworkRunner
+from network_runner.models.inventory import Inventory
+from network_runner.models.inventory import Host
+
+SIZES = [1000, 10000, 50000]
+
+
+def _inventory(count):
+    inventory = Inventory()
+    for i in range(count):
+        inventory.hosts.add(Host(name='switch{}'.format(i),
+                                 ansible_host='10.{}.{}.{}'.format(
+                                     i // 65536, i // 256 % 256, i % 256),
+                                 ansible_user='admin',
+                                 ansible_ssh_pass='secret',
+                                 ansible_network_os='eos'))
+    return inventory
+
+
+def _rounds(count):
+    # keep the largest inventories affordable
+    return 1 if count > 10000 else 3
+
+
+def _port_config_output(lines):
+    # stdout of a fos get_port_conf run with a long running config
+    config = ['interface ethernet 0/1', 'switchport mode trunk',
+              'switchport trunk allowed vlan 1-12,15,17-20']
+    config.extend('description line {}'.format(i) for i in range(lines))
+    result = {'changed': False, 'stdout': ['\n'.join(config)],
+              'stdout_lines': [config]}
+    return ''.join([
+        'PLAY [all] ' + '*' * 60 + '\n\n',
+        'TASK [network-runner : fos: get port conf] ' + '*' * 30 + '\n',
+        'ok: [switch0] => ', json.dumps(result, indent=4), '\n\n',
+        'PLAY RECAP ' + '*' * 60 + '\n',
+        'switch0 : ok=3 changed=0 unreachable=0 failed=0\n',
+    ])
+
+
+def _verbose_output(size):
+    # verbose runner output of many tasks followed by a get_port_conf run
+    task = ''.join([
+        'TASK [network-runner : gather facts] ' + '*' * 40 + '\n',
+        'ok: [switch0] => ', json.dumps({'changed': False,
+                                         'ansible_facts': {'net_version': 1}},
+                                        indent=4), '\n\n',
+    ])
+    tail = _port_config_output(100)
+    return task * ((size - len(tail)) // len(task)) + tail
+
+
+class _BuildOnly(NetworkRunner):
+    """Runner that returns the playbook of an operation unrun"""
+
+    def run(self, playbook):
+        return playbook
+
+
+@pytest.mark.parametrize('count', SIZES)
+def test_inventory_build(benchmark, peak_memory, count):
+    benchmark.group = 'inventory-build'
+    peak_memory(_inventory, count)
+    benchmark.pedantic(_inventory, args=(count,),
+                       rounds=_rounds(count), iterations=1)
+
+
+@pytest.mark.parametrize('count', SIZES[:2])
+def test_inventory_memory(benchmark, count):
+    benchmark.group = 'inventory-memory'
+    tracemalloc.start()
+    try:
+        inventory = _inventory(count)
+        size, _ = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    # memory held by the inventory once built, per host
+    benchmark.extra_info['bytes_per_host'] = size // count
+    host = inventory.hosts['switch0'].serialize()
+    benchmark(Host, **host)
+
+
+@pytest.mark.parametrize('count', SIZES)
+def test_inventory_serialize(benchmark, peak_memory, count):
+    benchmark.group = 'inventory-serialize'
+    inventory = _inventory(count)
+    peak_memory(inventory.serialize)
+    obj = benchmark.pedantic(inventory.serialize,
+                             rounds=_rounds(count), iterations=1)
+    assert len(obj['all']['hosts']) == count
+
+
+@pytest.mark.parametrize('count', SIZES)
+def test_inventory_serialize_cold(benchmark, peak_memory, count):
+    # serialized without the cache of any host, as after a new load
+    benchmark.group = 'inventory-serialize-cold'
+    inventory = _inventory(count)
+    hosts = list(inventory.hosts.values())
+
+    def serialize():
+        for host in hosts:
+            object.__setattr__(host, '_serialized', None)
+        return inventory._serialize()
+
+    peak_memory(serialize)
+    obj = benchmark.pedantic(serialize, rounds=_rounds(count), iterations=1)
+    assert len(obj['all']['hosts']) == count
+
+
+@pytest.mark.parametrize('count', SIZES)
+def test_inventory_deserialize(benchmark, peak_memory, count):
+    benchmark.group = 'inventory-deserialize'
+    obj = _inventory(count).serialize()
+
+    def deserialize():
+        inventory = Inventory()
+        inventory.deserialize(copy.deepcopy(obj))
+        return inventory
+
+    peak_memory(deserialize)
+    benchmark.pedantic(deserialize, rounds=_rounds(count), iterations=1)
+
+
+@pytest.mark.parametrize('count', SIZES)
+@pytest.mark.parametrize('mode', ['eager', 'lazy'])
+def test_inventory_load(benchmark, peak_memory, tmp_path, count, mode):
+    # load an inventory file and use one of its hosts
+    benchmark.group = 'inventory-load-{}'.format(count)
+    path = str(tmp_path / 'hosts.json')
+    with open(path, 'w') as f:
+        json.dump(_inventory(count).serialize(), f)
+
+    def load():
+        if mode == 'lazy':
+            inventory = Inventory.load(path)
+        else:
+            with open(path) as f:
+                inventory = Inventory()
+                inventory.deserialize(json.load(f))
+        return inventory.hosts['switch0']
+
+    peak_memory(load)
+    benchmark.pedantic(load, rounds=_rounds(count), iterations=1)
+
+
+@pytest.mark.parametrize('count', SIZES[:2])
+def test_map_deepcopy(benchmark, peak_memory, count):
+    benchmark.group = 'map-deepcopy'
+    hosts = _inventory(count).hosts
+    peak_memory(copy.deepcopy, hosts)
+    clone = benchmark.pedantic(copy.deepcopy, args=(hosts,),
+                               rounds=_rounds(count), iterations=1)
+    assert len(clone) == count
+
+
+@pytest.mark.parametrize('count', SIZES[:2])
+def test_map_deepcopy_changed(benchmark, peak_memory, count):
+    # copy, change one host of the copy and serialize it
+    benchmark.group = 'map-deepcopy-changed'
+    hosts = _inventory(count).hosts
+    hosts.serialize()
+
+    def change():
+        clone = copy.deepcopy(hosts)
+        clone['switch0'].ansible_user = 'operator'
+        return clone.serialize()
+
+    peak_memory(change)
+    obj = benchmark.pedantic(change, rounds=_rounds(count), iterations=1)
+    assert obj['switch0']['ansible_user'] == 'operator'
+
+
+@pytest.mark.parametrize('count', [1, 100, 1000])
+def test_playbook_build(benchmark, peak_memory, count):
+    benchmark.group = 'playbook-build'
+    runner = _BuildOnly()
+    hosts = ['switch{}'.format(i) for i in range(count)]
+    peak_memory(runner.create_vlan, hosts, 37)
+    benchmark(runner.create_vlan, hosts, 37)
+
+
+def test_playbook_serialize(benchmark, peak_memory):
+    benchmark.group = 'playbook-build'
+    playbook = _BuildOnly().conf_trunk_port('switch0', 'Ethernet1', 37,
+                                            list(range(2, 100)))
+    peak_memory(playbook.serialize)
+    benchmark(playbook.serialize)
+
+
+@pytest.mark.parametrize('count', SIZES[:2])
+@pytest.mark.parametrize('lookup', ['first', 'last', 'ansible_host',
+                                    'missing'])
+def test_has_host(benchmark, peak_memory, count, lookup):
+    benchmark.group = 'has-host-{}'.format(count)
+    runner = NetworkRunner(_inventory(count))
+    host = {'first': 'switch0',
+            'last': 'switch{}'.format(count - 1),
+            'ansible_host': runner.inventory.hosts['switch{}'.format(
+                count - 1)].ansible_host,
+            'missing': 'unknown'}[lookup]
+    peak_memory(runner.has_host, host)
+    assert benchmark(runner.has_host, host) is (lookup != 'missing')
+
+
+@pytest.mark.parametrize('lines', [1000, 10000, 100000])
+def test_format_port_config(benchmark, peak_memory, lines):
+    benchmark.group = 'format-port-config'
+    data = _port_config_output(lines)
+    benchmark.extra_info['size'] = len(data)
+    peak_memory(helpers.format_port_config, data, 'fos')
+    result = benchmark.pedantic(helpers.format_port_config,
+                                args=(data, 'fos'), rounds=3, iterations=1)
+    assert '"mode": "trunk"' in result
+
+
+def test_format_port_config_10mb(benchmark, peak_memory):
+    benchmark.group = 'format-port-config'
+    data = _verbose_output(10 * 1024 * 1024)
+    benchmark.extra_info['size'] = len(data)
+    peak_memory(helpers.format_port_config, data, 'fos')
+    result = benchmark.pedantic(helpers.format_port_config,
+                                args=(data, 'fos'), rounds=3, iterations=1)
+    assert '"mode": "trunk"' in result
+
+
+def test_fake_text_io_10mb(benchmark, peak_memory):
+    benchmark.group = 'fake-text-io'
+    chunk = 'ok: [switch0] => {"changed": false}\n'
+    count = 10 * 1024 * 1024 // len(chunk)
+
+    def capture():
+        out = helpers.FakeTextIO()
+        for _ in range(count):
+            out.write(chunk)
+        return out.buff()
+
+    peak_memory(capture)
+    assert len(benchmark.pedantic(capture, rounds=3, iterations=1)) == \
+        count * len(chunk)
@@ -0,0 +1,48 @@
+# Copyright (c) 2018 Red Hat, Inc.
+# All Rights Reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License"); you may
+# not use this file except in compliance with the License. You may obtain
+# a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+# WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+# License for the specific language governing permissions and limitations
+#
+# Measures the orchestration overhead of NetworkRunner, playbook
+# building, inventory serialization and result handling, with the
+# in-memory executors so no device or Ansible process is involved.
+import pytest
+
+from network_runner.api import NetworkRunner
+from network_runner.executors.dryrun import DryRunExecutor
+from network_runner.executors.fake import FakeExecutor
+from network_runner.models.inventory import Inventory
+from network_runner.models.inventory import Host
+
+
+def _inventory(count):
+    inventory = Inventory()
+    for i in range(count):
+        inventory.hosts.add(Host(name='switch{}'.format(i),
+                                 ansible_host='10.0.{}.{}'.format(i // 256,
+                                                                  i % 256),
+                                 ansible_user='admin',
+                                 ansible_network_os='eos'))
+    return inventory
+
+
+@pytest.mark.parametrize('count', [100, 1000])
+def test_dry_run(benchmark, count):
+    runner = NetworkRunner(_inventory(count), executor=DryRunExecutor())
+    benchmark(runner.create_vlan, 'switch0', 37)
+
+
+@pytest.mark.parametrize('count', [100, 1000])
+def test_fake_fan_out(benchmark, count):
+    inventory = _inventory(count)
+    runner = NetworkRunner(inventory, executor=FakeExecutor())
+    benchmark(runner.create_vlan, list(inventory.hosts), 37)
@@ -0,0 +1,98 @@
+# Copyright (c) 2018 Red Hat, Inc.
+# All Rights Reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License"); you may
+# not use this file except in compliance with the License. You may obtain
+# a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+# WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+# License for the specific language governing permissions and limitations
+# under the License.
+#
+# Runs the providers end to end against the switches of tests/simulator.py:
+# every operation opens a network_cli connection, gathers the device
+# facts and sends its commands over SSH.  DEVICE_LATENCY is added to
+# every command the switches receive.
+import os
+import sys
+
+import pytest
+
+from ansible.release import __version__ as ansible_version
+
+from network_runner.api import NetworkRunner
+from network_runner.models.inventory import Inventory
+
+pytest.importorskip('paramiko')
+pytest.importorskip('ansible_runner')
+pytest.importorskip('ansible_collections.ansible.netcommon')
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(__file__)))
+
+import simulator  # noqa
+
+DEVICE_LATENCY = 0.01
+VLAN = 37
+
+# the access port providers that fail against the simulator: the eos
+# templates do not indent interface sub-commands, so cli_config sends
+# them at the global configuration level, and ansible-core 2.19 rejects
+# the null stp_edge of the nxos `when: stp_edge`
+ACCESS_PORT_FAILURES = {
+    'eos': 'eos templates do not indent interface sub-commands',
+}
+if tuple(int(v) for v in ansible_version.split('.')[:2]) >= (2, 19):
+    ACCESS_PORT_FAILURES['nxos'] = 'nxos `when: stp_edge` is not a boolean'
+
+
+@pytest.fixture
+def sim():
+    with simulator.Simulator() as sim:
+        yield sim
+
+
+def _runner(sim, forks=None):
+    inventory = Inventory()
+    inventory.deserialize(sim.inventory())
+    return NetworkRunner(inventory, forks=forks)
+
+
+@pytest.mark.parametrize('network_os', sorted(simulator.DEVICES))
+def test_create_vlan(benchmark, sim, network_os):
+    sim.add('switch', network_os, latency=DEVICE_LATENCY)
+    runner = _runner(sim)
+    benchmark.pedantic(runner.create_vlan, args=('switch', VLAN),
+                       rounds=3, iterations=1)
+    assert VLAN in sim.devices['switch'].vlans
+
+
+@pytest.mark.parametrize('network_os', [
+    pytest.param(network_os, marks=pytest.mark.xfail(
+        reason=ACCESS_PORT_FAILURES[network_os], strict=True))
+    if network_os in ACCESS_PORT_FAILURES else network_os
+    for network_os in sorted(simulator.DEVICES)])
+def test_conf_access_port(benchmark, sim, network_os):
+    device = sim.add('switch', network_os, latency=DEVICE_LATENCY)
+    port = device.ports[0]
+    runner = _runner(sim)
+    benchmark.pedantic(runner.conf_access_port, args=('switch', port, VLAN),
+                       rounds=3, iterations=1)
+    assert device.access_vlan(port) == VLAN
+
+
+@pytest.mark.parametrize('devices', [1, 8, 16])
+def test_throughput(benchmark, sim, devices):
+    hosts = ['switch{}'.format(i) for i in range(devices)]
+    for name in hosts:
+        sim.add(name, 'eos', latency=DEVICE_LATENCY)
+    # one fork per device so all switches are configured at once
+    runner = _runner(sim, forks=devices)
+    benchmark.extra_info['devices'] = devices
+    benchmark.pedantic(runner.create_vlan, args=(hosts, VLAN),
+                       rounds=3, iterations=1)
+    benchmark.extra_info['operations_per_second'] = \
+        devices / benchmark.stats.stats.mean
@@ -1,5 +1,4 @@
 import argparse
-import json
 import os
 
 from network_runner import api
@@ -32,27 +31,6 @@ def get_parser_args():
     return parser.parse_args()
 
 
-def get_inv_yaml(args):
-    f = open(args.hosts)
-
-    # ## Parses Ansible hosts file format
-    # https://ansible-tips-and-tricks.readthedocs.io/en/latest/ansible/inventory
-    # lines = f.readlines()
-    # hosts = {}
-    # for l in lines:
-    #     print(l)
-    #     line = l.split(' ')
-    #     if l[0] != '#' and ' ' in l:
-    #         hosts[line[0]] = {
-    #             k: val for (k, val) in [x.split('=') for x in line[1:]]
-    #         }
-    # return {'all': {'hosts': hosts}}
-
-    json_hosts = f.read()
-    hosts = json.loads(json_hosts)
-    return hosts
-
-
 def run_tests(inventory, hostname, port, trunk=False, edge=False):
     # TODO(radez) Use a testing framework to verify
 
@@ -84,15 +62,12 @@ def run_tests(inventory, hostname, port, trunk=False, edge=False):
 def main():
     # collect information for the run.
     args = get_parser_args()
-    inv_yaml = get_inv_yaml(args)
-    hosts = inv_yaml['all']['hosts']
-    hostname = inv_yaml['all']['children'][HOSTNAME]['hosts'].popitem()[0]
-    net_os = hosts[hostname]['ansible_network_os']
-    port = PORTS[net_os]
 
-    # build the inventory object
-    inventory = Inventory()
-    inventory.deserialize(inv_yaml)
+    # load the inventory, only the hosts used are built
+    inventory = Inventory.load(args.hosts)
+    hostname = list(inventory.children[HOSTNAME].hosts)[-1]
+    net_os = inventory.hosts[hostname].ansible_network_os
+    port = PORTS[net_os]
 
     # execute the tests
     run_tests(inventory, hostname, port,
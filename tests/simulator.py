@@ -0,0 +1,814 @@
+# Copyright (c) 2018 Red Hat, Inc.
+# All Rights Reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License"); you may
+# not use this file except in compliance with the License. You may obtain
+# a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+# WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+# License for the specific language governing permissions and limitations
+# under the License.
+#
+# Simulated switches for running the providers end to end on one box.
+#
+# Every device is an SSH server on 127.0.0.1 that answers the commands
+# sent by Ansible's network_cli connection for its platform: the terminal
+# setup, the device facts gathered by the cliconf plugins and the show
+# and configuration commands of the eos, nxos and junos providers.  The
+# switch state (vlans and ports) lives in memory and every command can
+# be delayed to model a slow control plane.
+#
+# The network_cli plugins come from the ansible.netcommon, arista.eos,
+# cisco.nxos and junipernetworks.junos collections.  A simulated device
+# is only written against the cliconf and terminal plugins that talk to
+# it, so the other providers are not simulated until their collections
+# are part of the test environment:
+#
+# - dellos10: dellos10_config and the os10 network_cli plugins come from
+#   dellemc.os10.
+# - dellemc.os9.os9: os9_config and the os9 plugins come from
+#   dellemc.os9.
+# - enos and nos: enos_command, nos_config and their plugins come from
+#   community.network.
+# - fos: fos_command, fos_config and fos_vlan are not in any published
+#   collection, the provider cannot run against any device.
+# - cumulus: nclu (community.network) runs the `net` command on the
+#   switch through the ssh connection rather than a CLI session.  It
+#   needs a connection plugin that runs modules against a simulated
+#   `net`, not an SSH server.
+# - openvswitch: openvswitch_db and openvswitch_port
+#   (openvswitch.openvswitch) run ovs-vsctl on the host the same way,
+#   they need the same connection plugin with a simulated ovs-vsctl.
+#
+# Start a switch and run tests/functional.py against it:
+#
+#     python tests/simulator.py --eos 1 --latency 0.05 \
+#         --hosts /tmp/hosts.json &
+#     python tests/functional.py --hosts /tmp/hosts.json
+import argparse
+import json
+import logging
+import re
+import socket
+import threading
+import time
+
+import paramiko
+
+LOG = logging.getLogger(__name__)
+
+USERNAME = 'admin'
+PASSWORD = 'admin'
+
+DEFAULT_VLAN = 1
+
+
+def _port(**kwargs):
+    port = {
+        'description': '',
+        'switchport': True,
+        'mode': 'access',
+        'access_vlan': DEFAULT_VLAN,
+        'native_vlan': DEFAULT_VLAN,
+        # None allows every vlan on the trunk
+        'trunk_vlans': None,
+        'shutdown': False,
+    }
+    port.update(kwargs)
+    return port
+
+
+def _vlans(text):
+    # expand '3,7,10-12' and '[3 7 10]' into a sorted list of ids
+    vlans = set()
+    for item in re.split(r'[,\s\[\]]+', text.strip()):
+        if not item:
+            continue
+        if '-' in item:
+            first, last = item.split('-', 1)
+            vlans.update(range(int(first), int(last) + 1))
+        else:
+            vlans.add(int(item))
+    return sorted(vlans)
+
+
+def _ranges(vlans):
+    # collapse a list of vlan ids as printed by nxos, '1-5,7'
+    if vlans is None:
+        return '1-4094'
+    ranges = []
+    for vlan in vlans:
+        if ranges and ranges[-1][1] == vlan - 1:
+            ranges[-1][1] = vlan
+        else:
+            ranges.append([vlan, vlan])
+    return ','.join(str(a) if a == b else '{}-{}'.format(a, b)
+                    for a, b in ranges) or 'none'
+
+
+class Error(Exception):
+    """Error text printed by the device in reply to a command"""
+
+
+class Device(object):
+    """State of a simulated switch
+
+    Subclasses implement the command line of a platform in
+    ``execute``, which is called with the session state of the SSH
+    connection that sent the command.
+
+    :param name: host name of the device
+    :type name: str
+
+    :param ports: names of the ports of the device
+    :type ports: list
+
+    :param latency: seconds every command takes
+    :type latency: float
+    """
+
+    network_os = None
+    ports = ()
+
+    def __init__(self, name, ports=None, latency=0.0):
+        self.name = name
+        self.latency = latency
+        self.vlans = {DEFAULT_VLAN: 'default'}
+        self.interfaces = dict((p, _port()) for p in (ports or self.ports))
+        self.commands = []
+        self.lock = threading.RLock()
+        self.address = None
+        self._socket = None
+
+    def session(self):
+        """State of a new CLI session
+
+        :returns: dict, the ``mode`` key selects the prompt
+        """
+        return {'mode': 'exec', 'context': None}
+
+    def prompt(self, session):
+        raise NotImplementedError
+
+    def banner(self):
+        return ''
+
+    def execute(self, session, command):
+        """Run a command
+
+        :returns: the output of the command
+        :rtype: str
+
+        :raises: Error if the device rejects the command
+        """
+        raise NotImplementedError
+
+    def run(self, session, command):
+        with self.lock:
+            self.commands.append(command)
+        if self.latency:
+            time.sleep(self.latency)
+        try:
+            with self.lock:
+                return self.execute(session, command)
+        except ValueError:
+            return self.invalid_input
+        except Error as exc:
+            return str(exc)
+
+    def interface(self, name):
+        try:
+            return self.interfaces[self.canonical(name)]
+        except KeyError:
+            raise Error(self.invalid_input)
+
+    def canonical(self, name):
+        return name
+
+    def access_vlan(self, name):
+        """Vlan of an access port
+
+        :param name: name of the port
+        :type name: str
+
+        :returns: the vlan id, None if the port is not an access port
+        """
+        port = self.interface(name)
+        if not port['switchport'] or port['mode'] != 'access':
+            return None
+        return port['access_vlan']
+
+    def running_config(self):
+        raise NotImplementedError
+
+    invalid_input = '% Invalid input'
+
+
+class EosDevice(Device):
+
+    network_os = 'eos'
+    ports = tuple('Ethernet{}'.format(i) for i in range(1, 9))
+
+    def prompt(self, session):
+        mode, context = session['mode'], session['context']
+        if mode == 'exec':
+            return '{}>'.format(self.name)
+        if mode == 'enable':
+            return '{}#'.format(self.name)
+        if context is None:
+            return '{}(config)#'.format(self.name)
+        if context[0] == 'interface':
+            return '{}(config-if-{})#'.format(
+                self.name, context[1].replace('Ethernet', 'Et'))
+        return '{}(config-vlan-{})#'.format(self.name, context[1])
+
+    def canonical(self, name):
+        return re.sub(r'^(?i:et(hernet)?)', 'Ethernet', name)
+
+    def execute(self, session, command):
+        if session['mode'] == 'config':
+            return self._configure(session, command)
+
+        if command.startswith('terminal '):
+            return ''
+        if command == 'enable':
+            session['mode'] = 'enable'
+            return ''
+        if command == 'disable':
+            session['mode'] = 'exec'
+            return ''
+        if session['mode'] == 'enable' and \
+                command in ('configure', 'configure terminal'):
+            session['mode'] = 'config'
+            return ''
+        if command.startswith('show'):
+            return self._show(command)
+        raise Error(self.invalid_input)
+
+    def _show(self, command):
+        if command == 'show version | json':
+            return json.dumps({'modelName': 'vEOS',
+                               'version': '4.20.10M',
+                               'serialNumber': '',
+                               'systemMacAddress': '52:54:00:00:00:01',
+                               'internalVersion': '4.20.10M'})
+        if command == 'show version':
+            return ('Arista vEOS\nHardware version:\n'
+                    'Software image version: 4.20.10M\n')
+        if command == 'show hostname | json':
+            return json.dumps({'hostname': self.name, 'fqdn': self.name})
+        if command == 'show interfaces | json':
+            interfaces = {}
+            for name, port in self.interfaces.items():
+                status = 'disabled' if port['shutdown'] else 'connected'
+                interfaces[name] = {'name': name,
+                                    'description': port['description'],
+                                    'interfaceStatus': status,
+                                    'lineProtocolStatus': 'up'}
+            return json.dumps({'interfaces': interfaces})
+        if command.startswith('show running-config'):
+            return self.running_config()
+        raise Error(self.invalid_input)
+
+    def _configure(self, session, command):
+        if command == 'end':
+            session.update(mode='enable', context=None)
+            return ''
+        if command == 'exit':
+            if session['context'] is None:
+                session['mode'] = 'enable'
+            session['context'] = None
+            return ''
+
+        match = re.match(r'^(no )?vlan (\d+)$', command)
+        if match:
+            vlan = int(match.group(2))
+            if match.group(1):
+                self.vlans.pop(vlan, None)
+                session['context'] = None
+            else:
+                self.vlans.setdefault(vlan, 'VLAN{:04d}'.format(vlan))
+                session['context'] = ('vlan', vlan)
+            return ''
+
+        match = re.match(r'^interface (\S+)$', command)
+        if match:
+            name = self.canonical(match.group(1))
+            self.interface(name)
+            session['context'] = ('interface', name)
+            return ''
+
+        context = session['context']
+        if context is None:
+            raise Error(self.invalid_input)
+        if context[0] == 'vlan':
+            match = re.match(r'^name (\S+)$', command)
+            if not match:
+                raise Error(self.invalid_input)
+            self.vlans[context[1]] = match.group(1)
+            return ''
+        return self._configure_port(self.interface(context[1]), command)
+
+    def _configure_port(self, port, command):
+        no = command.startswith('no ')
+        if no:
+            command = command[3:]
+
+        if command == 'switchport':
+            port['switchport'] = not no
+        elif command == 'shutdown':
+            port['shutdown'] = not no
+        elif command.startswith('description'):
+            port['description'] = '' if no else command[12:]
+        elif command.startswith('switchport mode'):
+            port['mode'] = 'access' if no else command.split()[-1]
+        elif command.startswith('switchport access vlan'):
+            port['access_vlan'] = DEFAULT_VLAN if no else \
+                int(command.split()[-1])
+        elif command.startswith('switchport trunk native vlan'):
+            port['native_vlan'] = DEFAULT_VLAN if no else \
+                int(command.split()[-1])
+        elif command.startswith('switchport trunk allowed vlan'):
+            port['trunk_vlans'] = self._allowed(port['trunk_vlans'],
+                                                command.split()[4:], no)
+        else:
+            raise Error(self.invalid_input)
+        return ''
+
+    def _allowed(self, current, words, no):
+        if no:
+            return None
+        if words == ['none']:
+            return []
+        if len(words) == 2 and words[0] in ('add', 'remove'):
+            vlans = set(range(1, 4095) if current is None else current)
+            if words[0] == 'add':
+                return sorted(vlans.union(_vlans(words[1])))
+            return sorted(vlans.difference(_vlans(words[1])))
+        if len(words) == 1:
+            return _vlans(words[0])
+        raise Error(self.invalid_input)
+
+    def running_config(self):
+        lines = ['! device: {} (vEOS, EOS-4.20.10M)'.format(self.name), '!',
+                 'hostname {}'.format(self.name), '!']
+        for vlan, name in sorted(self.vlans.items()):
+            if vlan == DEFAULT_VLAN:
+                continue
+            lines.extend(['vlan {}'.format(vlan),
+                          '   name {}'.format(name), '!'])
+        for name, port in sorted(self.interfaces.items()):
+            lines.append('interface {}'.format(name))
+            if port['description']:
+                lines.append('   description {}'.format(port['description']))
+            if not port['switchport']:
+                lines.append('   no switchport')
+            if port['access_vlan'] != DEFAULT_VLAN:
+                lines.append('   switchport access vlan {}'.format(
+                    port['access_vlan']))
+            if port['native_vlan'] != DEFAULT_VLAN:
+                lines.append('   switchport trunk native vlan {}'.format(
+                    port['native_vlan']))
+            if port['trunk_vlans'] is not None:
+                allowed = ','.join(str(v) for v in port['trunk_vlans'])
+                lines.append('   switchport trunk allowed vlan {}'.format(
+                    allowed or 'none'))
+            if port['mode'] != 'access':
+                lines.append('   switchport mode {}'.format(port['mode']))
+            if port['shutdown']:
+                lines.append('   shutdown')
+            lines.append('!')
+        lines.append('end')
+        return '\n'.join(lines)
+
+
+class NxosDevice(EosDevice):
+
+    network_os = 'nxos'
+    ports = tuple('Ethernet1/{}'.format(i) for i in range(1, 9))
+
+    def session(self):
+        return {'mode': 'enable', 'context': None}
+
+    def prompt(self, session):
+        if session['mode'] != 'config':
+            return '{}#'.format(self.name)
+        if session['context'] is None:
+            return '{}(config)#'.format(self.name)
+        return '{}(config-{})#'.format(
+            self.name, 'if' if session['context'][0] == 'interface'
+            else 'vlan')
+
+    def canonical(self, name):
+        return re.sub(r'^(?i:eth(ernet)?)', 'Ethernet', name)
+
+    def execute(self, session, command):
+        if session['mode'] == 'config' and \
+                command.startswith('default interface '):
+            return self._default(command)
+        return super(NxosDevice, self).execute(session, command)
+
+    def _default(self, command):
+        self.interface(command.split()[-1]).update(
+            _port(switchport=False))
+        return ''
+
+    def _show(self, command):
+        if command == 'show version':
+            return ('Software\n'
+                    '  NXOS: version 9.2(2)\n'
+                    '  NXOS image file is: bootflash:///nxos.9.2.2.bin\n'
+                    'Hardware\n'
+                    '  cisco Nexus9000 9000v Chassis\n'
+                    '  Device name: {}\n'.format(self.name))
+        if command == 'show inventory':
+            return ('NAME: "Chassis",  DESCR: "Nexus9000 9000v Chassis"\n'
+                    'PID: N9K-9000v           ,  VID:     ,  SN: 9Q5VBQ1ZJ2A')
+
+        match = re.match(r'^show interface (\S+)( switchport)? \| json$',
+                         command)
+        if match:
+            name = self.canonical(match.group(1))
+            port = self.interface(name)
+            if match.group(2):
+                row = {'interface': name,
+                       'switchport': 'Enabled' if port['switchport']
+                       else 'Disabled',
+                       'oper_mode': port['mode'],
+                       'access_vlan': str(port['access_vlan']),
+                       'native_vlan': str(port['native_vlan']),
+                       'trunk_vlans': _ranges(port['trunk_vlans'])}
+            else:
+                row = {'interface': name,
+                       'desc': port['description'],
+                       'admin_state': 'down' if port['shutdown'] else 'up',
+                       'state': 'down' if port['shutdown'] else 'up'}
+            return json.dumps({'TABLE_interface': {'ROW_interface': row}})
+        return super(NxosDevice, self)._show(command)
+
+    def _configure_port(self, port, command):
+        if re.match(r'^(no )?spanning-tree port type edge( trunk)?$',
+                    command):
+            return ''
+        return super(NxosDevice, self)._configure_port(port, command)
+
+    def running_config(self):
+        config = super(NxosDevice, self).running_config()
+        # nxos indents with two spaces and has no end marker
+        lines = [line.replace('   ', '  ', 1) for line in config.split('\n')
+                 if line not in ('!', 'end')]
+        lines[0] = '!Command: show running-config'
+        return '\n'.join(lines)
+
+
+class JunosDevice(Device):
+    """Junos in network_cli mode
+
+    Configuration commands change a candidate copy of the state which
+    becomes the device state on commit.
+    """
+
+    network_os = 'junos'
+    ports = tuple('xe-0/0/{}'.format(i) for i in range(8))
+
+    invalid_input = 'syntax error.'
+
+    def session(self):
+        return {'mode': 'exec', 'context': None, 'candidate': None}
+
+    def prompt(self, session):
+        if session['mode'] == 'config':
+            return '\n[edit]\n{}@{}#'.format(USERNAME, self.name)
+        return '{}@{}>'.format(USERNAME, self.name)
+
+    def banner(self):
+        return '--- JUNOS 18.4R1.8 built 2018-12-17 03:30:15 UTC\n'
+
+    def execute(self, session, command):
+        if command.startswith('set cli '):
+            return ''
+        if session['mode'] == 'exec':
+            if command in ('config', 'configure', 'edit'):
+                session['mode'] = 'config'
+                session['candidate'] = json.loads(json.dumps(
+                    [self.vlans, self.interfaces]))
+                return 'Entering configuration mode'
+            if command.startswith('show version'):
+                return ('Hostname: {}\nModel: vqfx-10000\n'
+                        'Junos: 18.4R1.8\n'.format(self.name))
+            if command.startswith('show configuration'):
+                return self.running_config()
+            raise Error(self._unknown(command))
+
+        vlans, interfaces = session['candidate']
+        if command == 'commit':
+            self.vlans = dict((int(k), v) for k, v in vlans.items())
+            self.interfaces = interfaces
+            session['candidate'] = json.loads(json.dumps(
+                [self.vlans, self.interfaces]))
+            return 'commit complete'
+        if command in ('exit', 'quit', 'exit configuration-mode'):
+            session.update(mode='exec', candidate=None)
+            return 'Exiting configuration mode'
+        if command in ('rollback', 'rollback 0'):
+            session['candidate'] = json.loads(json.dumps(
+                [self.vlans, self.interfaces]))
+            return 'load complete'
+
+        match = re.match(r'^set vlans (\S+) vlan-id (\d+)$', command)
+        if match:
+            vlans[match.group(2)] = match.group(1)
+            return ''
+        match = re.match(r'^delete vlans (\S+)$', command)
+        if match:
+            for vlan, name in list(vlans.items()):
+                if name == match.group(1):
+                    del vlans[vlan]
+            return ''
+
+        match = re.match(r'^(set|delete) interfaces (\S+)( .*)?$', command)
+        if not match:
+            raise Error(self._unknown(command))
+        action, name, rest = match.group(1), match.group(2), \
+            (match.group(3) or '').strip()
+        if name not in interfaces:
+            raise Error(self._unknown(command))
+        port = interfaces[name]
+
+        members = 'unit 0 family ethernet-switching vlan members '
+        if action == 'delete' and not rest:
+            interfaces[name] = _port()
+        elif rest.startswith(members):
+            vlans = _vlans(rest[len(members):])
+            if action == 'set':
+                port['trunk_vlans'] = sorted(set(port['trunk_vlans'] or ())
+                                             .union(vlans))
+                port['access_vlan'] = port['trunk_vlans'][0]
+            else:
+                port['trunk_vlans'] = [v for v in port['trunk_vlans'] or ()
+                                       if v not in vlans]
+        elif rest.startswith('unit 0 family ethernet-switching '
+                             'interface-mode ') and action == 'set':
+            port['mode'] = rest.split()[-1]
+        elif rest.startswith('native-vlan ') and action == 'set':
+            port['native_vlan'] = int(rest.split()[-1])
+        elif rest == 'disable':
+            port['shutdown'] = action == 'set'
+        else:
+            raise Error(self._unknown(command))
+        return ''
+
+    def access_vlan(self, name):
+        # an access port is a member of exactly one vlan
+        port = self.interface(name)
+        if port['mode'] != 'access' or len(port['trunk_vlans'] or ()) != 1:
+            return None
+        return port['trunk_vlans'][0]
+
+    def _unknown(self, command):
+        return '{}\n        ^\n{}'.format(command, self.invalid_input)
+
+    def running_config(self):
+        lines = ['interfaces {']
+        for name, port in sorted(self.interfaces.items()):
+            lines.append('    {} {{'.format(name))
+            if port['shutdown']:
+                lines.append('        disable;')
+            members = port['trunk_vlans'] or [port['access_vlan']]
+            lines.extend([
+                '        unit 0 {',
+                '            family ethernet-switching {',
+                '                interface-mode {};'.format(port['mode']),
+                '                vlan {',
+                '                    members [ {} ];'.format(
+                    ' '.join(str(v) for v in members)),
+                '                }', '            }', '        }', '    }'])
+        lines.extend(['}', 'vlans {'])
+        for vlan, name in sorted(self.vlans.items()):
+            lines.extend(['    {} {{'.format(name),
+                          '        vlan-id {};'.format(vlan), '    }'])
+        lines.append('}')
+        return '\n'.join(lines)
+
+
+DEVICES = dict((cls.network_os, cls)
+               for cls in (EosDevice, NxosDevice, JunosDevice))
+
+
+class _Server(paramiko.ServerInterface):
+
+    def __init__(self, username, password):
+        self.username = username
+        self.password = password
+        self.shell = threading.Event()
+
+    def get_allowed_auths(self, username):
+        return 'password'
+
+    def check_auth_password(self, username, password):
+        if (username, password) == (self.username, self.password):
+            return paramiko.AUTH_SUCCESSFUL
+        return paramiko.AUTH_FAILED
+
+    def check_channel_request(self, kind, chanid):
+        if kind == 'session':
+            return paramiko.OPEN_SUCCEEDED
+        return paramiko.OPEN_FAILED_ADMINISTRATIVELY_PROHIBITED
+
+    def check_channel_pty_request(self, *args):
+        return True
+
+    def check_channel_shell_request(self, channel):
+        self.shell.set()
+        return True
+
+
+class Simulator(object):
+    """Run simulated switches as SSH servers on the loopback
+
+    Usable as a context manager, the servers are stopped on exit::
+
+        with Simulator() as sim:
+            sim.add('leaf1', 'eos', latency=0.01)
+            inventory = Inventory()
+            inventory.deserialize(sim.inventory())
+
+    :param username: user accepted by every device
+    :type username: str
+
+    :param password: password accepted by every device
+    :type password: str
+    """
+
+    def __init__(self, username=USERNAME, password=PASSWORD):
+        self.username = username
+        self.password = password
+        self.devices = {}
+        self._host_key = paramiko.ECDSAKey.generate()
+        self._stopped = threading.Event()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.stop()
+
+    def add(self, name, network_os, **kwargs):
+        """Start a new device
+
+        :param name: inventory name of the device
+        :type name: str
+
+        :param network_os: one of the keys of ``DEVICES``
+        :type network_os: str
+
+        :returns: the new device, accepting connections
+        :rtype: Device
+        """
+        device = DEVICES[network_os](name, **kwargs)
+
+        sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+        sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+        sock.bind(('127.0.0.1', 0))
+        sock.listen(128)
+        device.address = sock.getsockname()
+        device._socket = sock
+
+        self.devices[name] = device
+        self._start(self._accept, device)
+        return device
+
+    def inventory(self, group=None):
+        """Inventory of the running devices
+
+        :param group: also add the devices to a group with this name
+        :type group: str
+
+        :returns: dict in the format read by
+                  network_runner.models.inventory.Inventory
+        """
+        hosts = {}
+        for name, device in self.devices.items():
+            hosts[name] = {
+                'ansible_host': device.address[0],
+                'ansible_port': device.address[1],
+                'ansible_user': self.username,
+                'ansible_ssh_pass': self.password,
+                'ansible_network_os': device.network_os,
+                'ansible_network_cli_ssh_type': 'paramiko',
+                'ansible_host_key_checking': False,
+            }
+        inventory = {'hosts': hosts}
+        if group is not None:
+            inventory['children'] = {group: {'hosts': dict(hosts)}}
+        return {'all': inventory}
+
+    def stop(self):
+        """Stop all devices
+
+        :returns: None
+        """
+        self._stopped.set()
+        for device in self.devices.values():
+            device._socket.close()
+
+    def _start(self, target, *args):
+        thread = threading.Thread(target=target, args=args)
+        thread.daemon = True
+        thread.start()
+
+    def _accept(self, device):
+        while not self._stopped.is_set():
+            try:
+                conn, _ = device._socket.accept()
+            except OSError:
+                return
+            self._start(self._serve, device, conn)
+
+    def _serve(self, device, conn):
+        transport = paramiko.Transport(conn)
+        transport.add_server_key(self._host_key)
+        server = _Server(self.username, self.password)
+        try:
+            transport.start_server(server=server)
+            channel = transport.accept(30)
+            if channel is None or not server.shell.wait(30):
+                return
+            _Shell(device, channel).run()
+        except (EOFError, OSError, paramiko.SSHException) as exc:
+            LOG.debug('%s: connection closed: %s', device.name, exc)
+        finally:
+            transport.close()
+
+
+class _Shell(object):
+
+    def __init__(self, device, channel):
+        self.device = device
+        self.channel = channel
+        self.session = device.session()
+
+    def send(self, text):
+        self.channel.sendall(text.replace('\n', '\r\n').encode('utf-8'))
+
+    def run(self):
+        banner = '\n' + self.device.banner()
+        self.send(banner + self.device.prompt(self.session))
+        buf = b''
+        while True:
+            data = self.channel.recv(4096)
+            if not data:
+                return
+            buf += data
+            while True:
+                match = re.search(b'\r\n|\r|\n', buf)
+                if match is None:
+                    break
+                line = buf[:match.start()].decode('utf-8').strip()
+                buf = buf[match.end():]
+                # echo the command as a terminal would
+                output = line + '\n'
+                if line:
+                    result = self.device.run(self.session, line)
+                    if result:
+                        output += result + '\n'
+                self.send(output + self.device.prompt(self.session))
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description='Run simulated switches until interrupted')
+    for network_os in sorted(DEVICES):
+        parser.add_argument('--{}'.format(network_os), type=int, default=0,
+                            help='number of {} devices'.format(network_os))
+    parser.add_argument('--latency', type=float, default=0.0,
+                        help='seconds each command takes')
+    parser.add_argument('--hosts', help='write the inventory to this file')
+    args = parser.parse_args()
+
+    with Simulator() as sim:
+        for network_os in sorted(DEVICES):
+            for i in range(getattr(args, network_os)):
+                sim.add('{}{}'.format(network_os, i + 1), network_os,
+                        latency=args.latency)
+
+        # tests/functional.py runs against a host of the appliance group
+        inventory = json.dumps(sim.inventory('appliance'), indent=2)
+        if args.hosts:
+            with open(args.hosts, 'w') as f:
+                f.write(inventory)
+        print(inventory)
+
+        try:
+            while True:
+                time.sleep(3600)
+        except KeyboardInterrupt:
+            pass
+
+
+if __name__ == '__main__':
+    main()
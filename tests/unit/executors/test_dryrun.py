@@ -0,0 +1,31 @@
+# Copyright (c) 2018 Red Hat, Inc.
+# All Rights Reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License"); you may
+# not use this file except in compliance with the License. You may obtain
+# a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+# WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+# License for the specific language governing permissions and limitations
+from network_runner.api import NetworkRunner
+from network_runner.executors.dryrun import DryRunExecutor
+from network_runner.models.inventory import Host
+
+
+def test_dry_run():
+    executor = DryRunExecutor()
+    runner = NetworkRunner(executor=executor, forks=10)
+    runner.add_host(Host(name='leaf1'))
+
+    result = runner.create_vlan('leaf1', 37)
+
+    assert result is not None
+    assert result.status == 'successful'
+    assert executor.last.playbook[0]['hosts'] == 'leaf1'
+    assert executor.last.playbook[0]['tasks'][0]['vars']['vlan_id'] == 37
+    assert 'leaf1' in executor.last.inventory['all']['hosts']
+    assert executor.last.kwargs['forks'] == 10
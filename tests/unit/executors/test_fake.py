@@ -0,0 +1,96 @@
+# Copyright (c) 2018 Red Hat, Inc.
+# All Rights Reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License"); you may
+# not use this file except in compliance with the License. You may obtain
+# a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+# WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+# License for the specific language governing permissions and limitations
+from network_runner.api import NetworkRunner
+from network_runner.exceptions import NetworkRunnerException
+from network_runner.executors.fake import FakeExecutor
+from network_runner.models.inventory import Inventory
+
+
+INVENTORY = {'all': {'hosts': {'h1': {}, 'h2': {}, 'h3': {}},
+                     'children': {'leafs': {'hosts': {'h2': {}, 'h3': {}}}}}}
+
+
+def _playbook(*hosts):
+    return [{'name': 'play{}'.format(i), 'hosts': h,
+             'tasks': [{'action': 'import_role',
+                        'args': {'tasks_from': 'create_vlan'}}]}
+            for i, h in enumerate(hosts)]
+
+
+def test_run():
+    executor = FakeExecutor()
+    result = executor.run(_playbook('all'), INVENTORY)
+    assert result.status == 'successful'
+    assert result.rc == 0
+    assert sorted(result.stats['ok']) == ['h1', 'h2', 'h3']
+    assert executor.runs == 1
+
+
+def test_run_groups():
+    result = FakeExecutor().run(_playbook('h1,leafs'), INVENTORY)
+    assert sorted(result.stats['ok']) == ['h1', 'h2', 'h3']
+
+    result = FakeExecutor().run(_playbook('leafs'), INVENTORY)
+    assert sorted(result.stats['ok']) == ['h2', 'h3']
+
+
+def test_run_failures():
+    executor = FakeExecutor(fail_hosts=['h1'], unreachable_hosts=['h2'])
+    result = executor.run(_playbook('all', 'all'), INVENTORY)
+    assert result.status == 'failed'
+    assert result.rc == 6
+    assert result.stats['failures'] == {'h1': 1}
+    assert result.stats['dark'] == {'h2': 1}
+    assert result.stats['ok'] == {'h3': 2}
+
+
+def test_run_failure_rate():
+    result = FakeExecutor(failure_rate=1.0).run(_playbook('h1'), INVENTORY)
+    assert result.stats['failures'] == {'h1': 1}
+
+    result = FakeExecutor(failure_rate=0.5, seed=1).run(
+        _playbook(*(['all'] * 10)), INVENTORY)
+    assert result.stats['failures']
+
+
+def test_run_results():
+    executor = FakeExecutor(results={'create_vlan': {'changed': True}})
+    result = executor.run(_playbook('h1'), INVENTORY)
+    events = [e for e in result.events if e['event'] == 'runner_on_ok']
+    assert events[0]['event_data']['res'] == {'changed': True}
+    assert result.stats['changed'] == {'h1': 1}
+
+
+def test_network_runner():
+    inventory = Inventory()
+    inventory.deserialize(INVENTORY)
+    runner = NetworkRunner(inventory, executor=FakeExecutor(
+        fail_hosts=['h2']))
+
+    try:
+        runner.create_vlan(['h1', 'h2'], 37)
+    except NetworkRunnerException as exc:
+        assert exc.result.hosts == {'h1': 'ok', 'h2': 'failed'}
+    else:
+        assert False, 'expected NetworkRunnerException'
+
+
+def test_run_event_handler():
+    events = []
+    result = FakeExecutor(fail_hosts=['h1']).run(
+        _playbook('all'), INVENTORY, event_handler=events.append,
+        settings={'suppress_output_file': True})
+    assert events == result.events
+    assert events[-1]['event'] == 'playbook_on_stats'
+    assert result.stdout == []
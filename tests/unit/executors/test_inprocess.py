@@ -0,0 +1,152 @@
+# Copyright (c) 2018 Red Hat, Inc.
+# All Rights Reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License"); you may
+# not use this file except in compliance with the License. You may obtain
+# a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+# WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+# License for the specific language governing permissions and limitations
+# under the License.
+import os
+import sys
+import threading
+import time
+
+import mock
+import pytest
+
+pytest.importorskip('ansible')
+
+from ansible import context  # noqa
+from ansible.plugins.strategy import StrategyBase  # noqa
+
+from network_runner.executors.inprocess import InProcessExecutor  # noqa
+from network_runner.results import summarize  # noqa
+
+
+HOSTVARS = {'ansible_connection': 'local',
+            'ansible_python_interpreter': sys.executable}
+INVENTORY = {'all': {'hosts': {'h1': HOSTVARS, 'h2': HOSTVARS}}}
+
+
+def test_run():
+    playbook = [
+        {'name': 'first', 'hosts': 'all', 'gather_facts': False,
+         'tasks': [{'action': 'debug', 'args': {'msg': 'hello'}},
+                   {'action': 'fail', 'args': {'msg': 'boom'},
+                    'when': 'inventory_hostname == "h2"'}]},
+        {'name': 'second', 'hosts': 'all', 'gather_facts': False,
+         'tasks': [{'action': 'debug', 'args': {'msg': 'again'}}]},
+    ]
+
+    executor = InProcessExecutor()
+    for _ in range(2):
+        result = executor.run(playbook, INVENTORY, forks=2)
+
+        assert result.status == 'failed'
+        assert result.stats['failures'] == {'h2': 1}
+        assert summarize(result.events, 'first') == \
+            {'h1': 'ok', 'h2': 'failed'}
+        # failed hosts are dropped from the remaining plays
+        assert summarize(result.events, 'second') == {'h1': 'ok'}
+        assert any('boom' in line for line in result.stdout)
+
+
+def test_run_envvars():
+    playbook = [
+        {'hosts': 'h1', 'gather_facts': False,
+         'tasks': [{'action': 'debug',
+                    'args': {'msg': "{{ lookup('env', 'NR_TEST') }}"}}]},
+    ]
+
+    # the envvars are only set in the workers of the run
+    seen = []
+    result = InProcessExecutor().run(
+        playbook, INVENTORY, envvars={'NR_TEST': 'value'},
+        event_handler=lambda e: seen.append(os.environ.get('NR_TEST')))
+
+    assert result.status == 'successful'
+    assert seen and not any(seen)
+    assert 'NR_TEST' not in os.environ
+    events = [e for e in result.events if e['event'] == 'runner_on_ok']
+    assert events[0]['event_data']['res']['msg'] == 'value'
+
+
+def test_run_event_handler():
+    playbook = [
+        {'hosts': 'h1', 'gather_facts': False,
+         'tasks': [{'action': 'debug', 'args': {'msg': 'hello'}}]},
+    ]
+    events = []
+
+    result = InProcessExecutor().run(playbook, INVENTORY,
+                                     event_handler=events.append,
+                                     settings={'suppress_output_file': True})
+
+    assert [e['event'] for e in events] == [e['event']
+                                            for e in result.events]
+    assert 'runner_on_ok' in [e['event'] for e in events]
+    assert result.stdout == []
+
+
+def test_run_keep_connections():
+    playbook = [
+        {'hosts': 'h1', 'gather_facts': False,
+         'tasks': [{'action': 'debug', 'args': {'msg': 'hello'}}]},
+    ]
+    update = StrategyBase.update_active_connections
+    recorded = []
+
+    # no connection is recorded to be closed at the end of the plays
+    result = InProcessExecutor().run(
+        playbook, INVENTORY, keep_connections=True,
+        event_handler=lambda e: recorded.append(
+            StrategyBase.update_active_connections is update))
+
+    assert result.status == 'successful'
+    assert recorded and not any(recorded)
+    assert StrategyBase.update_active_connections is update
+
+
+def test_run_serialized():
+    # runs of different executors share the global state of Ansible
+    active = []
+    overlaps = []
+
+    def run(self, *args):
+        active.append(self)
+        overlaps.append(len(active))
+        time.sleep(0.05)
+        active.remove(self)
+
+    with mock.patch.object(InProcessExecutor, '_run', run):
+        threads = [threading.Thread(target=InProcessExecutor().run,
+                                    args=([], INVENTORY))
+                   for _ in range(3)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+    assert overlaps == [1, 1, 1]
+
+
+def test_run_defaults():
+    # options not set by the playbook take the defaults of
+    # ansible-playbook, hosts without ansible_connection use the
+    # default transport
+    playbook = [
+        {'hosts': 'h3', 'gather_facts': False,
+         'tasks': [{'action': 'debug', 'args': {'msg': 'hello'}}]},
+    ]
+    inventory = {'all': {'hosts': {'h3': {'ansible_host': '127.0.0.1'}}}}
+
+    result = InProcessExecutor().run(playbook, inventory)
+
+    assert result.status == 'successful'
+    assert context.CLIARGS['become'] is False
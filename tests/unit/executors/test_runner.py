@@ -0,0 +1,107 @@
+# Copyright (c) 2018 Red Hat, Inc.
+# All Rights Reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License"); you may
+# not use this file except in compliance with the License. You may obtain
+# a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+# WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+# License for the specific language governing permissions and limitations
+import json
+import os
+
+import mock
+
+from network_runner.executors import runner
+from network_runner.executors.runner import AnsibleRunnerExecutor
+
+
+@mock.patch('network_runner.executors.runner.ansible_runner')
+def test_run(m_ans_runner):
+    result = AnsibleRunnerExecutor().run([], {}, forks=5)
+    m_ans_runner.run.assert_called_once_with(playbook=[], inventory={},
+                                             forks=5)
+    assert result is m_ans_runner.run.return_value
+
+
+@mock.patch('network_runner.executors.runner.ansible_runner')
+def test_run_async(m_ans_runner):
+    AnsibleRunnerExecutor().run_async([], {}, forks=5)
+    m_ans_runner.run_async.assert_called_once_with(playbook=[], inventory={},
+                                                   forks=5)
+
+
+@mock.patch('network_runner.executors.runner.ansible_runner')
+def test_run_inventory_file(m_ans_runner):
+    executor = AnsibleRunnerExecutor()
+    inventory = {'all': {'hosts': {'leaf1': {'ansible_host': '10.0.0.1'}}}}
+
+    executor.run([], inventory)
+    path = m_ans_runner.run.call_args[1]['inventory']
+    with open(path) as f:
+        assert json.load(f) == inventory
+    mtime = os.stat(path).st_mtime_ns
+
+    # the same inventory reuses the file, an equal one does not rewrite it
+    executor.run([], inventory)
+    assert m_ans_runner.run.call_args[1]['inventory'] == path
+    executor.run([], json.loads(json.dumps(inventory)))
+    assert m_ans_runner.run.call_args[1]['inventory'] == path
+    assert os.stat(path).st_mtime_ns == mtime
+
+    inventory = {'all': {'hosts': {'leaf2': {}}}}
+    executor.run([], inventory)
+    changed = m_ans_runner.run.call_args[1]['inventory']
+    assert changed != path
+    with open(changed) as f:
+        assert json.load(f) == inventory
+
+    for i in range(runner.KEEP_INVENTORIES):
+        executor.run([], {'all': {'hosts': {str(i): {}}}})
+    assert not os.path.exists(path)
+
+
+@mock.patch('network_runner.executors.runner.ansible_runner')
+def test_run_async_inventory_in_use(m_ans_runner):
+    executor = AnsibleRunnerExecutor()
+    finished = mock.Mock()
+    runs = []
+    for i in range(runner.KEEP_INVENTORIES + 2):
+        executor.run_async([], {'all': {'hosts': {str(i): {}}}},
+                           finished_callback=finished)
+        kwargs = m_ans_runner.run_async.call_args[1]
+        runs.append((kwargs['inventory'], kwargs['finished_callback']))
+
+    # runs in flight may not have read their inventory yet
+    for path, _ in runs:
+        assert os.path.exists(path)
+
+    for path, callback in runs:
+        callback(mock.sentinel.runner)
+    finished.assert_called_with(mock.sentinel.runner)
+    assert finished.call_count == len(runs)
+    assert [os.path.exists(p) for p, _ in runs] == \
+        [False] * 2 + [True] * runner.KEEP_INVENTORIES
+
+
+@mock.patch('network_runner.executors.runner.ansible_runner')
+def test_run_inventory_in_use(m_ans_runner):
+    executor = AnsibleRunnerExecutor()
+    paths = []
+
+    def run(playbook, inventory, **kwargs):
+        # a run started by another thread while this one is running
+        paths.append(inventory)
+        if len(paths) <= runner.KEEP_INVENTORIES + 1:
+            executor.run([], {'all': {'hosts': {str(len(paths)): {}}}})
+        assert os.path.exists(inventory)
+
+    m_ans_runner.run.side_effect = run
+    executor.run([], {'all': {'hosts': {'0': {}}}})
+    assert len(paths) == runner.KEEP_INVENTORIES + 2
+    assert len(os.listdir(os.path.dirname(paths[0]))) == \
+        runner.KEEP_INVENTORIES
@@ -0,0 +1,123 @@
+# Copyright (c) 2018 Red Hat, Inc.
+# All Rights Reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License"); you may
+# not use this file except in compliance with the License. You may obtain
+# a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+# WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+# License for the specific language governing permissions and limitations
+# under the License.
+
+import copy
+import json
+
+import pytest
+import yaml
+
+from network_runner.models.inventory import Inventory
+
+
+def _inventory():
+    inventory = Inventory()
+    inventory.deserialize({'all': {
+        'hosts': {'leaf1': {'ansible_host': '10.0.0.1'},
+                  'leaf2': {'ansible_host': '10.0.0.2'},
+                  'spine1': {'ansible_host': '10.0.1.1'}},
+        'children': {
+            'leafs': {'hosts': {'leaf1': {}, 'leaf2': {}},
+                      'vars': {'ansible_user': 'admin'}},
+            'spines': {'hosts': {'spine1': {}}},
+        },
+        'vars': {'ansible_connection': 'network_cli'},
+    }})
+    return inventory
+
+
+def test_select_host():
+    obj = _inventory().select('leaf1')['all']
+    assert list(obj['hosts']) == ['leaf1']
+    assert obj['hosts']['leaf1']['ansible_host'] == '10.0.0.1'
+    assert obj['children'] == {
+        'leafs': {'hosts': {'leaf1': {'name': 'leaf1'}},
+                  'vars': {'ansible_user': 'admin'}},
+    }
+    assert obj['vars'] == {'ansible_connection': 'network_cli'}
+
+
+def test_select_group():
+    obj = _inventory().select('spines,leaf2')['all']
+    assert sorted(obj['hosts']) == ['leaf2', 'spine1']
+    assert sorted(obj['children']) == ['leafs', 'spines']
+    assert list(obj['children']['leafs']['hosts']) == ['leaf2']
+
+
+def test_select_all():
+    inventory = _inventory()
+    for pattern in ('all', 'leaf*', 'leafs:!leaf1', 'leafs:&spines',
+                    '~leaf.*', 'leafs[0]', 'ungrouped', 'leaf1,leaf9'):
+        assert inventory.select(pattern) is inventory.serialize()
+
+
+def test_targets():
+    inventory = _inventory()
+    assert inventory.targets('spines,leaf2') == {'leaf2', 'spine1'}
+    assert inventory.targets('leafs:!leaf1') is None
+    # names only Ansible resolves
+    assert inventory.targets('ungrouped') is None
+    assert inventory.targets('spines,leaf9') is None
+
+
+def test_deserialize_without_validation():
+    obj = {'all': {'hosts': {'leaf1': {'ansible_network_os': 'unknown'}}}}
+
+    with pytest.raises(AttributeError):
+        Inventory().deserialize(obj)
+
+    inventory = Inventory()
+    inventory.deserialize(obj, validate=False)
+    assert inventory.hosts['leaf1'].ansible_network_os == 'unknown'
+
+
+@pytest.mark.parametrize('filename,dump', [('hosts.json', json.dumps),
+                                           ('hosts.yml', yaml.safe_dump)])
+def test_load(tmp_path, filename, dump):
+    obj = _inventory().serialize()
+    path = tmp_path / filename
+    path.write_text(dump(obj))
+
+    inventory = Inventory.load(str(path))
+    assert sorted(inventory.hosts) == ['leaf1', 'leaf2', 'spine1']
+    assert type(inventory.hosts.objects['leaf1']) is dict
+
+    assert inventory.hosts['leaf2'].ansible_host == '10.0.0.2'
+    assert inventory.select('leaf1') == _inventory().select('leaf1')
+    assert inventory.serialize() == obj
+
+
+def test_deepcopy():
+    inventory = _inventory()
+    clone = copy.deepcopy(inventory)
+    assert clone.serialize() == inventory.serialize()
+
+    clone.hosts['leaf1'].ansible_host = '10.0.0.9'
+    assert inventory.hosts['leaf1'].ansible_host == '10.0.0.1'
+    assert clone.hosts.find('ansible_host', '10.0.0.9') == \
+        [clone.hosts['leaf1']]
+
+
+def test_deepcopy_host_vars():
+    inventory = _inventory()
+    inventory.hosts['leaf1'].vars['trunks'] = [1, 2]
+    inventory.serialize()
+
+    clone = copy.deepcopy(inventory)
+    inventory.hosts['leaf1'].vars['trunks'].append(3)
+    assert clone.hosts['leaf1'].vars == {'trunks': [1, 2]}
+    assert clone.serialize()['all']['hosts']['leaf1']['trunks'] == [1, 2]
+    assert inventory.serialize()['all']['hosts']['leaf1']['trunks'] == \
+        [1, 2, 3]
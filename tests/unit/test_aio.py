@@ -0,0 +1,113 @@
+# Copyright (c) 2018 Red Hat, Inc.
+# All Rights Reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License"); you may
+# not use this file except in compliance with the License. You may obtain
+# a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+# WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+# License for the specific language governing permissions and limitations
+# under the License.
+import asyncio
+
+import mock
+
+from network_runner import exceptions
+from network_runner.aio import AsyncNetworkRunner
+
+from . import base
+
+
+class Thread(object):
+
+    def __init__(self, polls=0):
+        self.polls = polls
+
+    def is_alive(self):
+        self.polls -= 1
+        return self.polls >= 0
+
+
+@mock.patch('network_runner.executors.runner.ansible_runner')
+class TestAsyncNetworkRunner(base.NetworkRunnerTestCase):
+
+    def setUp(self):
+        super(TestAsyncNetworkRunner, self).setUp()
+        self.net_runr = AsyncNetworkRunner(inventory=self.inventory,
+                                           poll_interval=0.01)
+
+    def _run_async(self, m_ans_runner, thread=None, status='successful'):
+        m_result = mock.Mock(status=status, stats={'failures': []},
+                             stdout=[], events=[])
+        m_ans_runner.run_async.return_value = (thread or Thread(), m_result)
+        return m_result
+
+    def test_create_vlan(self, m_ans_runner):
+        self._run_async(m_ans_runner, Thread(polls=2))
+
+        coro = self.net_runr.create_vlan(self.testhost, self.testvlan)
+        result = asyncio.run(coro)
+
+        m_ans_runner.run_async.assert_called_once()
+        self.assertEqual(result.status, 'successful')
+
+    def test_run_failure(self, m_ans_runner):
+        self._run_async(m_ans_runner, status='failed')
+
+        with self.assertRaises(exceptions.NetworkRunnerException):
+            asyncio.run(self.net_runr.delete_vlan(self.testhost,
+                                                  self.testvlan))
+
+    def test_run_timeout(self, m_ans_runner):
+        self._run_async(m_ans_runner, Thread(polls=1000))
+        self.net_runr.timeout = 0.05
+
+        with self.assertRaises(exceptions.NetworkRunnerException):
+            asyncio.run(self.net_runr.create_vlan(self.testhost,
+                                                  self.testvlan))
+
+        cancel_callback = m_ans_runner.run_async.call_args[1][
+            'cancel_callback']
+        self.assertTrue(cancel_callback())
+
+    def test_run_cancelled(self, m_ans_runner):
+        self._run_async(m_ans_runner, Thread(polls=1000))
+
+        async def cancel():
+            task = asyncio.ensure_future(
+                self.net_runr.create_vlan(self.testhost, self.testvlan))
+            await asyncio.sleep(0.02)
+            task.cancel()
+            with self.assertRaises(asyncio.CancelledError):
+                await task
+
+        asyncio.run(cancel())
+
+        cancel_callback = m_ans_runner.run_async.call_args[1][
+            'cancel_callback']
+        self.assertTrue(cancel_callback())
+
+    def test_get_port_conf_hosts(self, m_ans_runner):
+        coro = self.net_runr.get_port_conf('leafs', 'Ethernet1')
+        self.assertRaises(exceptions.NetworkRunnerException, asyncio.run,
+                          coro)
+        m_ans_runner.run_async.assert_not_called()
+
+    def test_batch(self, m_ans_runner):
+        self._run_async(m_ans_runner)
+
+        async def batch():
+            async with self.net_runr.batch() as b:
+                b.create_vlan(self.testhost, self.testvlan)
+                b.delete_vlan(self.testhost, self.testvlan)
+
+        asyncio.run(batch())
+
+        m_ans_runner.run_async.assert_called_once()
+        pb = m_ans_runner.run_async.call_args[1]['playbook']
+        self.assertEqual(len(pb), 1)
+        self.assertEqual(len(pb[0]['tasks']), 2)
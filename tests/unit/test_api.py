@@ -13,13 +13,27 @@
 #    License for the specific language governing permissions and limitations
 #    under the License.
 
+import json
+import os
+import shutil
+import tempfile
+import threading
+
 import mock
 
+from ansible_runner.interface import init_runner
+
 from network_runner import api
 from network_runner import exceptions
 from network_runner.models import playbook
 from network_runner.models.inventory import Host
 from network_runner.api import NetworkRunner
+from network_runner.connections import ConnectionPool
+from network_runner.executors import Executor
+from network_runner.executors import RunResult
+from network_runner.executors import make_event
+from network_runner.executors.runner import AnsibleRunnerExecutor
+from network_runner.providers import PROVIDERS
 
 from . import base
 
@@ -52,6 +66,30 @@ class TestGetHost(base.BaseTestCase):
         self.assertTrue(ret)
 
 
+class TestGetHostByAddress(base.BaseTestCase):
+
+    def test_get_host(self):
+        api = NetworkRunner()
+        api.add_host(Host(name='leaf1', ansible_host='10.0.0.1'))
+        api.add_host(Host(name='leaf2', ansible_host='10.0.0.2'))
+
+        self.assertEqual(api.get_host('leaf1').name, 'leaf1')
+        self.assertEqual(api.get_host('10.0.0.2').name, 'leaf2')
+        self.assertIsNone(api.get_host('10.0.0.3'))
+
+    def test_get_host_follows_changes(self):
+        api = NetworkRunner()
+        host = Host(name='leaf1', ansible_host='10.0.0.1')
+        api.add_host(host)
+
+        host.ansible_host = '10.0.0.3'
+        self.assertFalse(api.has_host('10.0.0.1'))
+        self.assertTrue(api.has_host('10.0.0.3'))
+
+        del api.inventory.hosts['leaf1']
+        self.assertFalse(api.has_host('10.0.0.3'))
+
+
 class TestAddHost(base.BaseTestCase):
 
     def test_add_host(self):
@@ -81,7 +119,7 @@ class TestCreateDeleteVlan(base.NetworkRunnerTestCase):
         m_run_task.assert_called_once()
 
 
-@mock.patch('network_runner.api.ansible_runner')
+@mock.patch('network_runner.executors.runner.ansible_runner')
 class TestRun(base.NetworkRunnerTestCase):
 
     def test_run(self, m_ans_runner):
@@ -92,6 +130,36 @@ class TestRun(base.NetworkRunnerTestCase):
 
         m_ans_runner.run.assert_called_once()
 
+    def test_run_inventory_file(self, m_ans_runner):
+        m_result = m_ans_runner.run.return_value
+        m_result.stats = {'failures': []}
+        host = Host(name='leaf1', ansible_host='10.0.0.1')
+        self.net_runr.add_host(host)
+        pb = playbook.Playbook()
+        pb.new(hosts='leaf1')
+
+        self.net_runr.run(pb)
+        path = m_ans_runner.run.call_args[1]['inventory']
+        self.net_runr.run(pb)
+        self.assertEqual(m_ans_runner.run.call_args[1]['inventory'], path)
+
+        host.vars['ansible_port'] = 2222
+        self.net_runr.run(pb)
+        path = m_ans_runner.run.call_args[1]['inventory']
+        with open(path) as f:
+            self.assertEqual(
+                json.load(f)['all']['hosts']['leaf1']['ansible_port'], 2222)
+
+    def test_run_selects_hosts(self, m_ans_runner):
+        m_result = m_ans_runner.run.return_value
+        m_result.stats = {'failures': []}
+        self.net_runr.add_host(Host(name='leaf1'))
+        self.net_runr.add_host(Host(name='leaf2'))
+
+        self.net_runr.create_vlan('leaf1', self.testvlan)
+        with open(m_ans_runner.run.call_args[1]['inventory']) as f:
+            self.assertEqual(list(json.load(f)['all']['hosts']), ['leaf1'])
+
     def test_run_task_failures(self, m_ans_runner):
         m_result = m_ans_runner.run.return_value
         m_result.status = 'failed'
@@ -105,8 +173,162 @@ class TestRun(base.NetworkRunnerTestCase):
                           self.net_runr.run,
                           playbook.Playbook())
 
+    def test_run_failure_carries_result(self, m_ans_runner):
+        m_result = m_ans_runner.run.return_value
+        m_result.status = 'failed'
+        m_result.stdout = []
+        m_result.stats = {'ok': {'h1': 1}, 'failures': {'h2': 1}}
+
+        with self.assertRaises(exceptions.NetworkRunnerException) as ctx:
+            self.net_runr.run(playbook.Playbook())
+
+        self.assertEqual(ctx.exception.result.failed(), ['h2'])
+
+    def test_run_executor(self, m_ans_runner):
+        executor = mock.Mock(spec=Executor)
+        executor.run.return_value.status = 'successful'
+        executor.run.return_value.stats = {'failures': {}}
 
-@mock.patch('network_runner.api.ansible_runner')
+        net_runr = NetworkRunner(executor=executor)
+        net_runr.run(playbook.Playbook())
+
+        executor.run.assert_called_once()
+        m_ans_runner.run.assert_not_called()
+
+    def test_run_forks(self, m_ans_runner):
+        m_result = m_ans_runner.run.return_value
+        m_result.stats = {'failures': []}
+
+        net_runr = NetworkRunner(forks=25)
+        net_runr.run(playbook.Playbook())
+
+        self.assertEqual(m_ans_runner.run.call_args[1]['forks'], 25)
+
+    def test_run_timing(self, m_ans_runner):
+        m_result = m_ans_runner.run.return_value
+        m_result.status = 'failed'
+        m_result.stdout = []
+        m_result.events = [
+            {'event': 'playbook_on_start', 'created': 100.0},
+            {'event': 'runner_on_ok', 'event_data': {
+                'task': 't1', 'task_action': 'eos_command',
+                'host': 'h1', 'start': 101.0, 'end': 103.0,
+                'duration': 2.0}},
+        ]
+        callback = mock.Mock()
+
+        net_runr = NetworkRunner(timing_callback=callback)
+        with self.assertRaises(exceptions.NetworkRunnerException) as ctx:
+            net_runr.run(playbook.Playbook())
+
+        timing = ctx.exception.result.timing
+        callback.assert_called_once_with(timing)
+        self.assertEqual(timing.device, 2.0)
+        self.assertEqual(len(timing.tasks), 1)
+        self.assertGreaterEqual(timing.total, timing.serialize)
+
+    def test_run_event_handler(self, m_ans_runner):
+        m_ans_runner.run.return_value.stats = {'failures': []}
+        handler = mock.Mock()
+
+        net_runr = NetworkRunner(event_handler=handler)
+        net_runr.run(playbook.Playbook())
+
+        kwargs = m_ans_runner.run.call_args[1]
+        self.assertTrue(kwargs['event_handler']({'event': 'runner_on_ok'}))
+        handler.assert_called_once_with({'event': 'runner_on_ok'})
+        self.assertNotIn('quiet', kwargs)
+
+    def test_run_without_stdout(self, m_ans_runner):
+        m_result = m_ans_runner.run.return_value
+        m_result.status = 'failed'
+        m_result.stats = {'failures': {'h1': 1}}
+        m_result.events = [
+            {'event': 'runner_on_failed', 'stdout': 'fatal: [h1]: boom',
+             'event_data': {'host': 'h1'}},
+            {'event': 'runner_on_failed',
+             'event_data': {'host': 'h2', 'ignore_errors': True}},
+            {'event': 'runner_on_unreachable',
+             'event_data': {'host': 'h3', 'res': {'msg': 'no route'}}},
+        ]
+
+        net_runr = NetworkRunner(retain_stdout=False)
+        with self.assertRaises(exceptions.NetworkRunnerException) as ctx:
+            net_runr.run(playbook.Playbook())
+
+        kwargs = m_ans_runner.run.call_args[1]
+        self.assertTrue(kwargs['quiet'])
+        self.assertTrue(kwargs['settings']['suppress_output_file'])
+        self.assertNotIn('suppress_output_file', kwargs)
+        self.assertEqual(str(ctx.exception),
+                         'fatal: [h1]: boom '
+                         'fatal: [h3]: UNREACHABLE! => no route')
+
+    def test_run_without_stdout_runner_config(self, m_ans_runner):
+        # the configuration ansible-runner builds from the arguments
+        net_runr = NetworkRunner(retain_stdout=False)
+        net_runr.add_host(Host(name='leaf1', ansible_host='127.0.0.1'))
+        pb = playbook.Playbook()
+        pb.new(hosts='leaf1')
+
+        tmpdir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, tmpdir)
+        runner = init_runner(private_data_dir=tmpdir,
+                             **net_runr._runner_kwargs(pb))
+        self.assertTrue(runner.config.suppress_output_file)
+        self.assertTrue(runner.config.quiet)
+
+
+class _PersistentExecutor(AnsibleRunnerExecutor):
+    """Executor reusing connections between runs"""
+
+    persistent_connections = True
+
+
+@mock.patch('network_runner.executors.runner.ansible_runner')
+class TestConnections(base.NetworkRunnerTestCase):
+
+    def test_warm(self, m_ans_runner):
+        m_result = m_ans_runner.run.return_value
+        m_result.stats = {'ok': {'leaf1': 1}, 'dark': {'leaf2': 1}}
+
+        pool = ConnectionPool(control_path_dir='/tmp/cp')
+        net_runr = NetworkRunner(self.inventory, connections=pool,
+                                 executor=_PersistentExecutor())
+        net_runr.warm(['leaf1', 'leaf2'])
+
+        kwargs = m_ans_runner.run.call_args[1]
+        self.assertEqual(kwargs['playbook'][0]['tasks'][0]['args'],
+                         {'name': api.NETWORK_RUNNER,
+                          'tasks_from': api.CONNECT})
+        self.assertEqual(
+            kwargs['envvars']['ANSIBLE_PERSISTENT_CONTROL_PATH_DIR'],
+            '/tmp/cp')
+        self.assertTrue(kwargs['keep_connections'])
+        self.assertEqual(pool.active(), ['leaf1'])
+
+    def test_warm_without_pool(self, m_ans_runner):
+        self.assertRaises(exceptions.NetworkRunnerException,
+                          self.net_runr.warm)
+        m_ans_runner.run.assert_not_called()
+
+    def test_warm_new_process(self, m_ans_runner):
+        # every run of the default executor opens its own connections
+        net_runr = NetworkRunner(self.inventory,
+                                 connections=ConnectionPool())
+        self.assertRaises(exceptions.NetworkRunnerException,
+                          net_runr.warm)
+        m_ans_runner.run.assert_not_called()
+
+        # runs still use the settings of the pool
+        m_ans_runner.run.return_value.stats = {'failures': []}
+        net_runr.create_vlan('leaf1', self.testvlan)
+        kwargs = m_ans_runner.run.call_args[1]
+        self.assertIn('envvars', kwargs)
+        self.assertNotIn('keep_connections', kwargs)
+
+
+@mock.patch('network_runner.executors.runner.ansible_runner')
 class TestPlay(base.NetworkRunnerTestCase):
 
     def test_play(self, m_ans_runner):
@@ -116,8 +338,67 @@ class TestPlay(base.NetworkRunnerTestCase):
         self.net_runr.play('create_vlan')
         m_ans_runner.run.assert_called_once()
 
+    def test_play_many_hosts(self, m_ans_runner):
+        m_result = m_ans_runner.run.return_value
+        m_result.stats = {'ok': {'leaf1': 1, 'leaf2': 1}, 'failures': {}}
+
+        result = self.net_runr.create_vlan(['leaf1', 'leaf2'], self.testvlan)
 
-@mock.patch('network_runner.api.ansible_runner')
+        m_ans_runner.run.assert_called_once()
+        pb = m_ans_runner.run.call_args[1]['playbook']
+        self.assertEqual(len(pb), 1)
+        self.assertEqual(pb[0]['hosts'], 'leaf1,leaf2')
+        self.assertEqual(result.hosts, {'leaf1': 'ok', 'leaf2': 'ok'})
+
+    def test_play_provider_files(self, m_ans_runner):
+        m_ans_runner.run.return_value.stats = {'failures': []}
+        self.inventory.hosts.add(Host(name='leaf1', ansible_network_os='eos'))
+
+        self.net_runr.delete_port('leaf1', self.testport)
+
+        task = m_ans_runner.run.call_args[1]['playbook'][0]['tasks'][0]
+        self.assertEqual(task['args']['tasks_from'], api.PROVIDER_TASKS)
+        self.assertEqual(task['vars']['network_action'], api.DELETE_PORT)
+        directory = PROVIDERS.path('eos')
+        self.assertEqual(task['vars']['network_runner_providers'], {'eos': {
+            'vars': os.path.join(directory, 'defaults.yaml'),
+            'tasks': os.path.join(directory, 'delete_port.yaml')}})
+        self.assertTrue(os.path.isabs(directory))
+
+    def test_play_role_files(self, m_ans_runner):
+        m_ans_runner.run.return_value.stats = {'failures': []}
+        self.inventory.hosts.add(Host(name='leaf1', ansible_network_os='eos'))
+        self.inventory.hosts.add(Host(name='leaf2'))
+
+        # a host without a network os, the whole inventory, a missing
+        # required fact and a task file that is not an operation
+        self.net_runr.create_vlan(['leaf1', 'leaf2'], self.testvlan)
+        self.net_runr.create_vlan(None, self.testvlan)
+        self.net_runr.delete_port('leaf1', '')
+        self.net_runr.play('custom', 'leaf1')
+
+        tasks = [c[1]['playbook'][0]['tasks'][0]
+                 for c in m_ans_runner.run.call_args_list]
+        self.assertEqual([t['args']['tasks_from'] for t in tasks],
+                         [api.CREATE_VLAN, api.CREATE_VLAN, api.DELETE_PORT,
+                          'custom'])
+        for task in tasks:
+            self.assertNotIn('network_action', task.get('vars', {}))
+
+    def test_play_without_providers(self, m_ans_runner):
+        m_ans_runner.run.return_value.stats = {'failures': []}
+        self.inventory.hosts.add(Host(name='leaf1', ansible_network_os='eos'))
+
+        # no provider files, or only some of them
+        for files in ({}, {'defaults.yaml': '/site/eos/defaults.yaml'}):
+            with mock.patch.object(PROVIDERS, 'files', return_value=files):
+                self.net_runr.create_vlan('leaf1', self.testvlan)
+
+            task = m_ans_runner.run.call_args[1]['playbook'][0]['tasks'][0]
+            self.assertEqual(task['args']['tasks_from'], api.CREATE_VLAN)
+
+
+@mock.patch('network_runner.executors.runner.ansible_runner')
 class TestConfAccessPort(base.NetworkRunnerTestCase):
 
     def test_assign_access_port(self, m_ans_runner):
@@ -156,7 +437,7 @@ class TestConfAccessPort(base.NetworkRunnerTestCase):
                           self.testhost, self.testport)
 
 
-@mock.patch('network_runner.api.ansible_runner')
+@mock.patch('network_runner.executors.runner.ansible_runner')
 class TestConfTrunkPort(base.NetworkRunnerTestCase):
 
     def test_assign_trunk_port(self, m_ans_runner):
@@ -207,7 +488,7 @@ class TestConfTrunkPort(base.NetworkRunnerTestCase):
                           self.testhost, self.testport)
 
 
-@mock.patch('network_runner.api.ansible_runner')
+@mock.patch('network_runner.executors.runner.ansible_runner')
 class TestListVlans(base.NetworkRunnerTestCase):
     def test_list_vlans(self, m_ans_runner):
         m_result = m_ans_runner.run.return_value
@@ -218,7 +499,7 @@ class TestListVlans(base.NetworkRunnerTestCase):
         m_ans_runner.run.assert_called_once()
 
 
-@mock.patch('network_runner.api.ansible_runner')
+@mock.patch('network_runner.executors.runner.ansible_runner')
 class TestAddDeleteTrunkVlan(base.NetworkRunnerTestCase):
     def test_add_trunk_vlan(self, m_ans_runner):
         m_result = m_ans_runner.run.return_value
@@ -239,3 +520,226 @@ class TestAddDeleteTrunkVlan(base.NetworkRunnerTestCase):
                                         self.testvlan)
 
         m_ans_runner.run.assert_called_once()
+
+
+PORT_CONF_EVENTS = [
+    {'event': 'playbook_on_task_start',
+     'event_data': {'task': 'get_port_conf[0]'}},
+    {'event': 'runner_on_ok',
+     'event_data': {'task': 'get_port_conf[0]', 'host': 'testhost',
+                    'res': {'changed': False,
+                            'stdout_lines': [['switchport mode access',
+                                              'switchport access vlan 37']]}}},
+]
+
+
+@mock.patch('network_runner.executors.runner.ansible_runner')
+class TestGetPortConf(base.NetworkRunnerTestCase):
+    def setUp(self):
+        super(TestGetPortConf, self).setUp()
+        self.net_runr.add_host(Host(name=self.testhost,
+                                    ansible_network_os='fos'))
+
+    def test_get_port_conf(self, m_ans_runner):
+        m_result = m_ans_runner.run.return_value
+        m_result.stats = {'failures': []}
+        m_result.events = PORT_CONF_EVENTS
+
+        config = self.net_runr.get_port_conf(self.testhost, self.testport)
+
+        self.assertEqual(config, {'mode': 'access', 'vlan': 37,
+                                  'trunked_vlans': ''})
+
+    def test_get_port_conf_no_output(self, m_ans_runner):
+        m_result = m_ans_runner.run.return_value
+        m_result.stats = {'failures': []}
+        m_result.events = []
+
+        self.assertRaises(exceptions.NetworkRunnerException,
+                          self.net_runr.get_port_conf,
+                          self.testhost, self.testport)
+
+    def test_get_port_conf_unparsed(self, m_ans_runner):
+        m_result = m_ans_runner.run.return_value
+        m_result.stats = {'failures': []}
+        self.net_runr.add_host(Host(name='leaf1', ansible_network_os='eos'))
+
+        m_result.events = []
+        self.assertIsNone(self.net_runr.get_port_conf('leaf1',
+                                                      self.testport))
+
+        m_result.events = [dict(e, event_data=dict(e['event_data'],
+                                                   host='leaf1'))
+                           for e in PORT_CONF_EVENTS]
+        self.assertEqual(self.net_runr.get_port_conf('leaf1', self.testport),
+                         [['switchport mode access',
+                           'switchport access vlan 37']])
+
+    def test_get_port_conf_hosts(self, m_ans_runner):
+        m_result = m_ans_runner.run.return_value
+        m_result.stats = {'failures': []}
+        self.net_runr.add_host(Host(name='leaf1', ansible_host='10.0.0.1',
+                                    ansible_network_os='fos'))
+
+        for hosts in (['leaf1', self.testhost], 'leaf1,testhost', 'leafs',
+                      'unknown'):
+            self.assertRaises(exceptions.NetworkRunnerException,
+                              self.net_runr.get_port_conf, hosts,
+                              self.testport)
+        m_ans_runner.run.assert_not_called()
+
+        # a host is found by its ansible_host and run by its name
+        m_result.events = [dict(e, event_data=dict(e['event_data'],
+                                                   host='leaf1'))
+                           for e in PORT_CONF_EVENTS]
+        config = self.net_runr.get_port_conf('10.0.0.1', self.testport)
+        self.assertEqual(config['vlan'], 37)
+        pb = m_ans_runner.run.call_args[1]['playbook']
+        self.assertEqual(pb[0]['hosts'], 'leaf1')
+
+    def test_batch_get_port_conf(self, m_ans_runner):
+        m_result = m_ans_runner.run.return_value
+        m_result.stats = {'failures': []}
+        m_result.events = PORT_CONF_EVENTS
+
+        with self.net_runr.batch() as b:
+            op = b.get_port_conf(self.testhost, self.testport)
+
+        self.assertEqual(op.port_config['vlan'], 37)
+
+    def test_batch_get_port_conf_hosts(self, m_ans_runner):
+        self.net_runr.add_host(Host(name='leaf1', ansible_network_os='fos'))
+
+        with self.net_runr.batch() as b:
+            for hosts in (['leaf1', self.testhost], 'leaf1,testhost',
+                          'unknown'):
+                self.assertRaises(exceptions.NetworkRunnerException,
+                                  b.get_port_conf, hosts, self.testport)
+            self.assertEqual(b.operations, [])
+
+        m_ans_runner.run.assert_not_called()
+
+
+class _PortConfExecutor(Executor):
+    """Report the port asked for as an access port of a vlan"""
+
+    def __init__(self, count):
+        self.barrier = threading.Barrier(count)
+
+    def run(self, playbook, inventory, **kwargs):
+        # hold every run until all of them are in flight
+        self.barrier.wait(timeout=5)
+        port = playbook[0]['tasks'][0]['vars']['port_name']
+        lines = ['switchport mode access',
+                 'switchport access vlan {}'.format(port)]
+        res = {'changed': False, 'stdout_lines': [lines]}
+        return RunResult('successful', 0, {'failures': {}}, [
+            make_event('runner_on_ok', 1, host=playbook[0]['hosts'],
+                       res=res)])
+
+
+class TestConcurrentGetPortConf(base.NetworkRunnerTestCase):
+    def test_get_port_conf_threads(self):
+        count = 8
+        runner = NetworkRunner(executor=_PortConfExecutor(count))
+        runner.add_host(Host(name=self.testhost, ansible_network_os='fos'))
+
+        results = {}
+
+        def get(port):
+            results[port] = runner.get_port_conf(self.testhost, port)
+
+        threads = [threading.Thread(target=get, args=(port,))
+                   for port in range(count)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual(dict((p, c['vlan']) for p, c in results.items()),
+                         dict((p, p) for p in range(count)))
+
+
+@mock.patch('network_runner.executors.runner.ansible_runner')
+class TestBatch(base.NetworkRunnerTestCase):
+
+    def test_batch(self, m_ans_runner):
+        m_result = m_ans_runner.run.return_value
+        m_result.stats = {'failures': []}
+        m_result.events = [
+            {'event': 'playbook_on_task_start',
+             'event_data': {'task': 'create_vlan[0]'}},
+            {'event': 'runner_on_ok',
+             'event_data': {'task': 'eos: create vlan', 'host': 'leaf1',
+                            'res': {'changed': True}}},
+            {'event': 'playbook_on_task_start',
+             'event_data': {'task': 'add_trunk_vlan[1]'}},
+            {'event': 'runner_on_ok',
+             'event_data': {'task': 'eos: add trunk vlan', 'host': 'leaf1',
+                            'res': {'changed': False}}},
+        ]
+
+        with self.net_runr.batch() as b:
+            create = b.create_vlan('leaf1', self.testvlan)
+            add = b.add_trunk_vlan('leaf1', self.testport, self.testvlan)
+            m_ans_runner.run.assert_not_called()
+
+        m_ans_runner.run.assert_called_once()
+        pb = m_ans_runner.run.call_args[1]['playbook']
+        self.assertEqual(len(pb), 1)
+        self.assertEqual([t['name'] for t in pb[0]['tasks']],
+                         ['create_vlan[0]', 'add_trunk_vlan[1]'])
+        self.assertEqual(pb[0]['tasks'][1]['action'], api.INCLUDE_ROLE)
+        self.assertEqual(pb[0]['tasks'][1]['args']['tasks_from'],
+                         api.ADD_TRUNK_VLAN)
+        self.assertEqual(create.status, {'leaf1': 'changed'})
+        self.assertEqual(add.status, {'leaf1': 'ok'})
+        self.assertFalse(create.failed())
+
+    def test_batch_plays(self, m_ans_runner):
+        m_ans_runner.run.return_value.stats = {'failures': []}
+
+        with self.net_runr.batch() as b:
+            b.create_vlan('leaf1', self.testvlan)
+            b.create_vlan(['leaf1', 'leaf2'], self.testvlan)
+            b.add_trunk_vlan('leaf1,leaf2', self.testport, self.testvlan)
+            b.delete_vlan('leaf1', self.testvlan)
+
+        # consecutive operations on the same hosts share a play
+        pb = m_ans_runner.run.call_args[1]['playbook']
+        self.assertEqual([(p['hosts'], len(p['tasks'])) for p in pb],
+                         [('leaf1', 1), ('leaf1,leaf2', 2), ('leaf1', 1)])
+
+    def test_batch_runner_methods(self, m_ans_runner):
+        b = self.net_runr.batch()
+        for name in ('run', 'warm', 'batch', 'close'):
+            self.assertFalse(hasattr(b, name))
+        self.assertIsNotNone(b.create_vlan('leaf1', self.testvlan))
+        m_ans_runner.run.assert_not_called()
+
+    def test_batch_failure(self, m_ans_runner):
+        m_result = m_ans_runner.run.return_value
+        m_result.status = 'failed'
+        m_result.stdout = []
+        m_result.events = [
+            {'event': 'playbook_on_task_start',
+             'event_data': {'task': 'create_vlan[0]'}},
+            {'event': 'runner_on_failed',
+             'event_data': {'task': 'eos: create vlan', 'host': 'leaf1'}},
+        ]
+
+        with self.assertRaises(exceptions.NetworkRunnerException):
+            with self.net_runr.batch() as b:
+                create = b.create_vlan('leaf1', self.testvlan)
+                delete = b.delete_vlan('leaf1', self.testvlan)
+
+        self.assertTrue(create.failed())
+        self.assertEqual(delete.status, {})
+
+    def test_batch_not_run_on_error(self, m_ans_runner):
+        with self.assertRaises(ValueError):
+            with self.net_runr.batch() as b:
+                b.create_vlan('leaf1', self.testvlan)
+                raise ValueError()
+
+        m_ans_runner.run.assert_not_called()
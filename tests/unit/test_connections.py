@@ -0,0 +1,70 @@
+# Copyright (c) 2018 Red Hat, Inc.
+# All Rights Reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License"); you may
+# not use this file except in compliance with the License. You may obtain
+# a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+# WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+# License for the specific language governing permissions and limitations
+# under the License.
+import os
+import threading
+
+import mock
+
+from network_runner.connections import ConnectionPool
+
+
+def test_envvars():
+    pool = ConnectionPool(idle_timeout=120, command_timeout=10)
+    envvars = pool.envvars
+    path = envvars['ANSIBLE_PERSISTENT_CONTROL_PATH_DIR']
+    assert os.path.isdir(path)
+    assert envvars['ANSIBLE_PERSISTENT_CONNECT_TIMEOUT'] == '120'
+    assert envvars['ANSIBLE_PERSISTENT_COMMAND_TIMEOUT'] == '10'
+    assert 'ControlPersist=120s' in envvars['ANSIBLE_SSH_ARGS']
+
+    pool.close()
+    assert not os.path.exists(path)
+    assert pool.control_path_dir is None
+
+
+def test_close_keeps_given_dir(tmpdir):
+    pool = ConnectionPool(control_path_dir=str(tmpdir))
+    tmpdir.join('socket').write('')
+    with mock.patch('network_runner.connections._close_socket') as m_close:
+        pool.close()
+    m_close.assert_called_once_with(str(tmpdir.join('socket')))
+    assert tmpdir.check(dir=True)
+
+
+def test_active():
+    pool = ConnectionPool(idle_timeout=30)
+    pool.touch(['h1', 'h2'])
+    assert pool.active() == ['h1', 'h2']
+
+    with mock.patch('time.time', return_value=pool._last_used['h1'] + 31):
+        pool.touch(['h2'])
+        assert pool.active() == ['h2']
+
+
+def test_envvars_threads():
+    pool = ConnectionPool()
+    paths = set()
+
+    def envvars():
+        paths.add(pool.envvars['ANSIBLE_PERSISTENT_CONTROL_PATH_DIR'])
+
+    threads = [threading.Thread(target=envvars) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert len(paths) == 1
+    pool.close()
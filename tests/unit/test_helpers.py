@@ -12,8 +12,11 @@
 # WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
 # License for the specific language governing permissions and limitations
 # under the License.
+import json
+
 import pytest
 
+from network_runner import exceptions
 from network_runner import helpers
 
 
@@ -25,3 +28,47 @@ def test_isvalidattrname():
         helpers.isvalidattrname('0test')
 
     helpers.isvalidattrname('test')
+
+
+def test_parse_port_config():
+    lines = [['interface ethernet 0/1',
+              'switchport mode trunk',
+              'switchport access vlan 5',
+              'switchport trunk allowed vlan 1-12,15']]
+    assert helpers.parse_port_config(lines, 'fos') == {
+        'mode': 'trunk',
+        'vlan': 5,
+        'trunked_vlans': '1-12,15',
+    }
+
+    with pytest.raises(exceptions.NetworkRunnerException):
+        helpers.parse_port_config(lines, 'eos')
+
+
+def test_format_port_config():
+    result = {'changed': False,
+              'stdout_lines': [['switchport mode access',
+                                'switchport access vlan 37']]}
+    data = ''.join([
+        'TASK [gather facts {{ os }}] ***\n',
+        'ok: [switch0] => {"changed": false}\n',
+        'ok: [switch0] => ', json.dumps(result, indent=4), '\n',
+        'PLAY RECAP ***\n',
+    ])
+    output = helpers.format_port_config(data, 'fos')
+    assert output.startswith('TASK [gather facts {{ os }}] ***\n')
+    assert output.endswith('\nPLAY RECAP ***\n')
+    assert json.dumps({'mode': 'access', 'vlan': 37,
+                       'trunked_vlans': ''}) in output
+
+    with pytest.raises(exceptions.NetworkRunnerException):
+        helpers.format_port_config('PLAY RECAP ***\n', 'fos')
+
+
+def test_lazy_module():
+    module = helpers.LazyModule('json')
+    assert module.__name__ == 'json'
+    assert module.dumps is json.dumps
+
+    with pytest.raises(ImportError):
+        helpers.LazyModule('network_runner.missing').attr
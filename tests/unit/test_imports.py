@@ -0,0 +1,47 @@
+# Copyright (c) 2018 Red Hat, Inc.
+# All Rights Reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License"); you may
+# not use this file except in compliance with the License. You may obtain
+# a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+# WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+# License for the specific language governing permissions and limitations
+# under the License.
+import subprocess
+import sys
+
+# seconds network_runner.api may take to import, as reported by
+# python -X importtime, the best of a few runs is compared
+IMPORT_BUDGET = 0.15
+
+HEAVY_MODULES = ('ansible', 'ansible_runner', 'yaml')
+
+
+def _import(code):
+    return subprocess.run([sys.executable, '-X', 'importtime', '-c', code],
+                          stdout=subprocess.PIPE, stderr=subprocess.PIPE,
+                          universal_newlines=True, check=True)
+
+
+def test_import_defers_dependencies():
+    out = _import('\n'.join([
+        'import sys',
+        'import network_runner.api',
+        'print(" ".join(sorted(sys.modules)))',
+    ])).stdout.split()
+    for name in HEAVY_MODULES:
+        assert name not in out
+
+
+def test_import_time():
+    times = []
+    for _ in range(3):
+        for line in _import('import network_runner.api').stderr.splitlines():
+            if line.rstrip().endswith('| network_runner.api'):
+                times.append(int(line.split('|')[1]) / 1e6)
+    assert min(times) < IMPORT_BUDGET
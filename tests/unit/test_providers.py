@@ -0,0 +1,144 @@
+# Copyright (c) 2018 Red Hat, Inc.
+# All Rights Reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License"); you may
+# not use this file except in compliance with the License. You may obtain
+# a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+# WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+# License for the specific language governing permissions and limitations
+# under the License.
+import json
+import os
+import subprocess
+import sys
+
+import pytest
+
+from network_runner import providers
+from network_runner.providers import ProviderRegistry
+from network_runner.providers import ProviderValidator
+
+
+@pytest.fixture
+def roles(tmp_path, monkeypatch):
+    monkeypatch.setattr(providers, 'SITE_PROVIDERS',
+                        str(tmp_path / 'site'))
+
+    def make(path, *names):
+        for name in names:
+            directory = tmp_path / path / 'network-runner' / 'providers'
+            (directory / name).mkdir(parents=True)
+        return str(tmp_path / path)
+    return make
+
+
+def test_registry(roles):
+    first = roles('first', 'eos', 'nxos')
+    second = roles('second', 'junos')
+    registry = ProviderRegistry([roles('missing'), first, second],
+                                interval=0)
+
+    # only the first role found provides
+    assert sorted(registry) == ['eos', 'nxos']
+    assert 'junos' not in registry
+    assert registry.path('eos') == os.path.join(
+        first, 'network-runner', 'providers', 'eos')
+    assert registry.path('junos') is None
+
+
+def test_registry_site(roles, tmp_path):
+    role = roles('role', 'eos', 'nxos')
+    os.makedirs(os.path.join(providers.SITE_PROVIDERS, 'eos'))
+    registry = ProviderRegistry([role], interval=0)
+
+    assert sorted(registry) == ['eos', 'nxos']
+    assert registry.path('eos') == os.path.join(providers.SITE_PROVIDERS,
+                                                'eos')
+
+
+def test_registry_site_files(roles, tmp_path):
+    role = roles('role', 'eos')
+    directory = os.path.join(role, 'network-runner', 'providers', 'eos')
+    for name in ('defaults.yaml', 'create_vlan.yaml'):
+        open(os.path.join(directory, name), 'w').close()
+    site = os.path.join(providers.SITE_PROVIDERS, 'eos')
+    os.makedirs(site)
+    registry = ProviderRegistry([role], interval=0)
+
+    # each file comes from the first directory that has it
+    assert registry.files('eos') == {
+        'defaults.yaml': os.path.join(directory, 'defaults.yaml'),
+        'create_vlan.yaml': os.path.join(directory, 'create_vlan.yaml')}
+    assert registry.files('nxos') == {}
+
+    open(os.path.join(site, 'create_vlan.yaml'), 'w').close()
+    os.utime(site, (0, 0))
+    assert registry.files('eos')['create_vlan.yaml'] == \
+        os.path.join(site, 'create_vlan.yaml')
+    assert registry.files('eos')['defaults.yaml'] == \
+        os.path.join(directory, 'defaults.yaml')
+
+
+def test_registry_changes(roles):
+    role = roles('role', 'eos')
+    registry = ProviderRegistry([role])
+    assert list(registry) == ['eos']
+
+    # changes are only looked for once the interval has passed
+    roles('role', 'nxos')
+    # filesystems with coarse timestamps may not see the change
+    directory = os.path.join(role, 'network-runner', 'providers')
+    os.utime(directory, (0, 0))
+    assert list(registry) == ['eos']
+
+    registry.interval = 0
+    assert sorted(registry) == ['eos', 'nxos']
+
+    cached = registry.providers()
+    assert registry.providers() is cached
+
+
+def test_registry_manifest(tmp_path, monkeypatch):
+    manifest = tmp_path / 'providers.json'
+    manifest.write_text(json.dumps({'eos': '/providers/eos'}))
+
+    registry = ProviderRegistry(manifest=str(manifest))
+    assert list(registry) == ['eos']
+
+    monkeypatch.setenv(providers.MANIFEST_ENV, str(manifest))
+    registry = ProviderRegistry(['/nonexistent'])
+    assert registry.path('eos') == '/providers/eos'
+    assert registry.files('eos') == {}
+
+
+def test_provider_validator(roles):
+    registry = ProviderRegistry([roles('role', 'eos')], interval=0)
+    validator = ProviderValidator(registry)
+
+    validator('eos')
+    validator(None)
+    with pytest.raises(AttributeError):
+        validator('nxos')
+
+    registry.clear()
+    roles('role', 'nxos')
+    validator('nxos')
+
+
+def test_import_without_scan():
+    # importing the models must not look for the providers
+    code = '\n'.join([
+        'import os',
+        'calls = []',
+        'listdir = os.listdir',
+        'os.listdir = lambda *a: calls.append(a) or listdir(*a)',
+        'from network_runner.models import inventory',
+        'assert not calls, calls',
+        'assert inventory.PROVIDERS._providers is None',
+    ])
+    subprocess.check_call([sys.executable, '-c', code])
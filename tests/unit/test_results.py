@@ -0,0 +1,164 @@
+# Copyright (c) 2018 Red Hat, Inc.
+# All Rights Reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License"); you may
+# not use this file except in compliance with the License. You may obtain
+# a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+# WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+# License for the specific language governing permissions and limitations
+# under the License.
+import mock
+
+from network_runner import results
+
+
+def test_result_proxies_runner():
+    runner = mock.Mock(status='successful', rc=0)
+    result = results.Result(runner)
+    assert result.status == 'successful'
+    assert result.rc == 0
+
+
+def test_result_stdout():
+    runner = mock.Mock(stdout=['line'])
+    runner.config.suppress_output_file = False
+    assert results.Result(runner).stdout == ['line']
+
+    # ansible-runner raises for the stdout of these runs
+    type(runner).stdout = mock.PropertyMock(side_effect=Exception)
+    runner.config.suppress_output_file = True
+    assert results.Result(runner).stdout == []
+
+
+def test_result_hosts():
+    runner = mock.Mock()
+    runner.stats = {
+        'ok': {'h1': 1, 'h2': 2, 'h3': 1},
+        'changed': {'h2': 1},
+        'failures': {'h3': 1},
+        'dark': {'h4': 1},
+        'skipped': {'h5': 1},
+    }
+    result = results.Result(runner)
+    assert result.hosts == {
+        'h1': results.HOST_OK,
+        'h2': results.HOST_CHANGED,
+        'h3': results.HOST_FAILED,
+        'h4': results.HOST_UNREACHABLE,
+        'h5': results.HOST_SKIPPED,
+    }
+    assert result.failed() == ['h3', 'h4']
+
+
+def test_result_hosts_without_stats():
+    runner = mock.Mock(stats=None)
+    assert results.Result(runner).hosts == {}
+
+
+def test_summarize():
+    events = [
+        {'event': 'playbook_on_start'},
+        {'event': 'runner_on_ok',
+         'event_data': {'play': 'p1', 'host': 'h1', 'res': {}}},
+        {'event': 'runner_on_ok',
+         'event_data': {'play': 'p1', 'host': 'h1',
+                        'res': {'changed': True}}},
+        {'event': 'runner_on_failed',
+         'event_data': {'play': 'p1', 'host': 'h2',
+                        'ignore_errors': True}},
+        {'event': 'runner_on_failed',
+         'event_data': {'play': 'p2', 'host': 'h2'}},
+    ]
+    assert results.summarize(events, 'p1') == {
+        'h1': results.HOST_CHANGED,
+        'h2': results.HOST_OK,
+    }
+    assert results.summarize(events)['h2'] == results.HOST_FAILED
+
+
+def test_timing_from_events():
+    events = [
+        {'event': 'playbook_on_start',
+         'created': '1970-01-01T00:00:12.000000+00:00'},
+        {'event': 'playbook_on_task_start',
+         'created': '1970-01-01T00:00:12.500000+00:00',
+         'event_data': {'task': 'include', 'task_action': 'include_tasks'}},
+        {'event': 'runner_on_ok',
+         'event_data': {'task_uuid': 'u1', 'task': 'include',
+                        'task_action': 'include_tasks', 'host': 'h1',
+                        'start': '1970-01-01T00:00:12.500000+00:00',
+                        'end': '1970-01-01T00:00:13.000000+00:00',
+                        'duration': 0.5}},
+        {'event': 'runner_on_ok',
+         'event_data': {'task_uuid': 'u2', 'task': 'config',
+                        'task_action': 'cli_config', 'host': 'h1',
+                        'start': 13.0, 'end': 16.0, 'duration': 3.0}},
+        {'event': 'runner_on_failed',
+         'event_data': {'task_uuid': 'u2', 'task': 'config',
+                        'task_action': 'cli_config', 'host': 'h2',
+                        'start': 13.5, 'end': 17.0, 'duration': 3.5}},
+    ]
+    timing = results.Timing.from_events(events, 9.0, 10.0, 18.0)
+
+    assert timing.serialize == 1.0
+    assert timing.startup == 2.0
+    assert timing.resolve == 0.5
+    # hosts running the same task in parallel are counted once
+    assert timing.device == 4.0
+    assert timing.total == 9.0
+    assert timing.other == 1.5
+    assert [t['host'] for t in timing.tasks] == ['h1', 'h1', 'h2']
+    assert timing.tasks[2]['event'] == 'runner_on_failed'
+    assert timing.phases['other'] == 1.5
+
+
+def test_timing_without_events():
+    timing = results.Timing.from_events(mock.Mock(), 1.0, 1.5, 2.0)
+    assert timing.startup == 0.0
+    assert timing.device == 0.0
+    assert timing.other == 0.5
+    assert timing.tasks == []
+
+
+def test_task_results():
+    events = [
+        {'event': 'runner_on_ok',
+         'event_data': {'play': 'p1', 'host': 'h1', 'res': {'a': 1}}},
+        {'event': 'runner_on_failed',
+         'event_data': {'play': 'p1', 'host': 'h1', 'res': {'b': 2}}},
+        {'event': 'runner_on_ok',
+         'event_data': {'play': 'p2', 'host': 'h2', 'res': {'c': 3}}},
+    ]
+    assert results.task_results(events) == [{'a': 1}, {'c': 3}]
+    assert results.task_results(events, host='h2') == [{'c': 3}]
+    assert results.task_results(events, play='p1') == [{'a': 1}]
+    assert results.task_results(events, host='h1', play='p2') == []
+
+
+def test_group_by_task():
+    def start(task):
+        return {'event': 'playbook_on_task_start',
+                'event_data': {'task': task}}
+
+    def ok(task, host):
+        return {'event': 'runner_on_ok',
+                'event_data': {'task': task, 'host': host}}
+
+    events = [
+        {'event': 'playbook_on_play_start'},
+        start('a[0]'), ok('a[0]', 'h1'),
+        # tasks included by a[0]
+        start('inner'), ok('inner', 'h1'),
+        start('b[1]'), ok('b[1]', 'h1'),
+        {'event': 'playbook_on_stats'},
+    ]
+    groups = results.group_by_task(events, ['a[0]', 'b[1]', 'c[2]'])
+    assert groups['a[0]'] == events[1:5]
+    assert groups['b[1]'] == events[5:]
+    assert groups['c[2]'] == []
+    assert results.group_by_task(None, ['a[0]']) == {'a[0]': []}
@@ -96,6 +96,29 @@ def test_call_dict_with_default_value():
     assert z == default_value
 
 
+def test_call_copies_value():
+    """Ensure values are copied unless they cannot change
+    """
+    value = {'one': {'two': 2}}
+    z = Dict()(value)
+    assert z == value
+    assert z is not value
+    assert z['one'] is not value['one']
+
+    value = 'string'
+    assert String()(value) is value
+
+
+def test_typeddict_container_copies_map():
+    c = TypedDict(Item, 'name')
+    m = Map(Item, 'name')
+    m.new(name='test')
+    r = c(m)
+    assert r is not m
+    assert r == m
+    assert c(None) is not c(None)
+
+
 def test_typeddict_container():
     c = TypedDict(Item, 'name')
     assert isinstance(c, TypedDict)
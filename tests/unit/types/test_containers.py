@@ -12,11 +12,16 @@
 # WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
 # License for the specific language governing permissions and limitations
 # under the License.
+import copy
+import threading
+import time
+
 import pytest
 
 from network_runner.types.objects import Object
-from network_runner.types.attrs import String
+from network_runner.types.attrs import Dict, String
 from network_runner.types.containers import Index, Map
+from network_runner.types.containers import deferred
 
 
 class ListItem(Object):
@@ -28,6 +33,23 @@ class DictItem(Object):
     value = String()
 
 
+class VarsItem(Object):
+    name = String()
+    vars = Dict()
+
+
+class SlowItem(DictItem):
+
+    built = 0
+
+    def __init__(self, **kwargs):
+        # widen the window between the check for a record and the
+        # object replacing it
+        time.sleep(0.05)
+        type(self).built += 1
+        super(SlowItem, self).__init__(**kwargs)
+
+
 def test_index():
     o = Index(cls=ListItem)
 
@@ -117,3 +139,191 @@ def test_map_comparisons():
     b.new(name='test')
 
     assert a.__neq__(b)
+
+
+def test_map_indexes():
+    o = Map(cls=DictItem, key='name', indexes=('value',))
+    a = o.new(name='a', value='x')
+    b = o.new(name='b', value='x')
+    o.new(name='c')
+
+    assert o.find('value', 'x') == [a, b]
+    assert o.find('value', 'y') == []
+
+    # changes to the objects are followed by the index
+    a.value = 'y'
+    assert o.find('value', 'x') == [b]
+    assert o.find('value', 'y') == [a]
+
+    del o['b']
+    assert o.find('value', 'x') == []
+    b.value = 'y'
+    assert o.find('value', 'y') == [a]
+
+    o['a'] = DictItem(name='a', value='z')
+    assert o.find('value', 'y') == []
+    assert o.find('value', 'z') == [o['a']]
+    a.value = 'x'
+    assert o.find('value', 'x') == []
+
+    clone = copy.deepcopy(o)
+    assert clone.find('value', 'z') == [clone['a']]
+
+    o.add_index('name')
+    assert o.find('name', 'c') == [o['c']]
+
+    with pytest.raises(KeyError):
+        o.find('missing', 'x')
+
+
+def test_map_deferred():
+    o = Map(cls=DictItem, key='name', indexes=('value',))
+    with deferred():
+        o.deserialize({'a': {'value': 'x'}, 'b': None, 'c': {'value': 1}})
+
+    # records are kept until their object is accessed
+    assert 'a' in o and len(o) == 3
+    assert all(type(v) is dict for v in o.objects.values())
+
+    assert o.find('value', 'x') == [o['a']]
+    assert isinstance(o.objects['a'], DictItem)
+    assert type(o.objects['b']) is dict
+
+    # the index follows the objects once they are built
+    o['a'].value = 'y'
+    assert o.find('value', 'y') == [o['a']]
+    assert o.find('value', 'x') == []
+
+    # records are validated when they are built
+    with pytest.raises(TypeError):
+        o['c']
+    del o['c']
+
+    assert o.serialize() == {'a': {'name': 'a', 'value': 'y'},
+                             'b': {'name': 'b'}}
+    assert isinstance(o.objects['b'], DictItem)
+
+    with pytest.raises(ValueError):
+        with deferred():
+            o.deserialize({'a': {}})
+
+
+def test_map_deferred_threads():
+    o = Map(cls=SlowItem, key='name', indexes=('value',))
+    with deferred():
+        o.deserialize({'a': {'value': 'x'}})
+
+    count = 8
+    barrier = threading.Barrier(count)
+    objs = []
+
+    def get():
+        barrier.wait(timeout=5)
+        objs.append(o['a'])
+
+    threads = [threading.Thread(target=get) for _ in range(count)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert SlowItem.built == 1
+    assert all(obj is o.objects['a'] for obj in objs)
+    o['a'].value = 'y'
+    assert o.find('value', 'y') == [o['a']]
+    assert o.find('value', 'x') == []
+
+
+def test_map_serialize_cache():
+    o = Map(cls=DictItem, key='name')
+    a = o.new(name='a', value='x')
+    o.new(name='b', value='y')
+
+    obj = o.serialize()
+    assert o.serialize() is obj
+
+    # only the changed object is serialized again
+    a.value = 'z'
+    changed = o.serialize()
+    assert changed is not obj
+    assert changed['a'] == {'name': 'a', 'value': 'z'}
+    assert changed['b'] is obj['b']
+
+    del o['b']
+    assert o.serialize() == {'a': {'name': 'a', 'value': 'z'}}
+
+    o.new(name='c')
+    assert sorted(o.serialize()) == ['a', 'c']
+
+
+def test_index_serialize_cache():
+    o = Index(cls=ListItem)
+    item = o.new(name='a')
+
+    obj = o.serialize()
+    assert o.serialize() is obj
+
+    item.name = 'b'
+    assert o.serialize() == [{'name': 'b'}]
+
+    o.new(name='c')
+    assert o.serialize() == [{'name': 'b'}, {'name': 'c'}]
+
+
+def test_map_deepcopy_shares():
+    o = Map(cls=DictItem, key='name', indexes=('value',))
+    a = o.new(name='a', value='x')
+    o.new(name='b', value='y')
+
+    # the copy holds the serialization of the map until accessed
+    clone = copy.deepcopy(o)
+    assert clone.serialize() is o.serialize()
+    assert all(type(v) is dict for v in clone.objects.values())
+    assert clone.find('value', 'x') == [clone['a']]
+    assert clone['a'] is not a
+
+    # changes on either side are not seen by the other
+    a.value = 'z'
+    clone['b'].value = 'w'
+    assert o.serialize() == {'a': {'name': 'a', 'value': 'z'},
+                             'b': {'name': 'b', 'value': 'y'}}
+    assert clone.serialize() == {'a': {'name': 'a', 'value': 'x'},
+                                 'b': {'name': 'b', 'value': 'w'}}
+    assert clone.find('value', 'w') == [clone['b']]
+
+
+def test_index_deepcopy_shares():
+    o = Index(cls=ListItem)
+    item = o.new(name='a')
+    o.new(name='b')
+
+    clone = copy.deepcopy(o)
+    assert clone.serialize() is o.serialize()
+    assert clone[0] is not item and clone[0] == item
+    assert clone[:] == [clone[0], clone[1]]
+
+    item.name = 'c'
+    clone[1].name = 'd'
+    assert o.serialize() == [{'name': 'c'}, {'name': 'b'}]
+    assert clone.serialize() == [{'name': 'a'}, {'name': 'd'}]
+
+
+@pytest.mark.parametrize('container', ['map', 'index'])
+def test_deepcopy_nested_values(container):
+    if container == 'map':
+        o = Map(cls=VarsItem, key='name')
+    else:
+        o = Index(cls=VarsItem)
+    item = o.new(name='a', vars={'trunks': [1, 2]})
+    o.serialize()
+
+    # values changed in place on either side are not seen by the other
+    clone = copy.deepcopy(o)
+    item.vars['trunks'].append(3)
+    assert o.serialize() != clone.serialize()
+    key = 'a' if container == 'map' else 0
+    assert clone[key].vars == {'trunks': [1, 2]}
+
+    clone[key].vars['trunks'].append(4)
+    assert item.vars == {'trunks': [1, 2, 3]}
+    assert clone.serialize() != o.serialize()
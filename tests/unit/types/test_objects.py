@@ -16,6 +16,9 @@ import pytest
 
 from network_runner.types.objects import Object
 from network_runner.types.attrs import String, Integer, Boolean, List, Dict
+from network_runner.types.attrs import TypedDict
+from network_runner.types.attrs import SERIALIZE_WHEN_PRESENT
+from network_runner.types.attrs import SERIALIZE_WHEN_NEVER
 
 
 class Instance(Object):
@@ -249,3 +252,81 @@ def test_attr1_alias():
     assert o.attr1 == 'test'
     assert o.attr2 is None
     assert o.attr3 == 'test'
+
+
+def test_serialize_cache():
+    o = Instance(name='test', dictattr={'one': {'two': 2}})
+    obj = o.serialize()
+    assert o.serialize() is obj
+
+    o.strattr = 'string'
+    obj = o.serialize()
+    assert obj['strattr'] == 'string'
+    assert o.serialize() is obj
+
+    # dicts and lists changed in place are noticed
+    o.dictattr['one']['two'] = 3
+    assert o.serialize() is not obj
+    assert o.serialize()['dictattr'] == {'one': {'two': 3}}
+
+    obj = o.serialize()
+    o.listattr.append(1)
+    assert o.serialize() is not obj
+    assert o.serialize()['listattr'] == [1]
+
+
+def test_slots():
+    o = Aliases(attr1='test')
+
+    # attributes live in slots and aliases read the slot of their
+    # attribute, nothing is kept in the instance dict
+    assert 'attr1' in Aliases.__slots__
+    assert 'attr3' not in Aliases.__slots__
+    assert o.__dict__ == {}
+    assert o.attr3 == 'test'
+
+    with pytest.raises(AttributeError):
+        o.unknown = 'test'
+
+    o._private = 'test'
+    assert o.__dict__ == {'_private': 'test'}
+
+
+class Serialized(Object):
+    name = String()
+    present = String(serialize_when=SERIALIZE_WHEN_PRESENT)
+    never = String(serialize_when=SERIALIZE_WHEN_NEVER)
+    always = List()
+    empty = Dict(serialize_when=SERIALIZE_WHEN_PRESENT)
+    items = TypedDict(item_class=Instance, item_key='name')
+    alias = String(aliases=('other',))
+
+
+def test_generated_serializer():
+    o = Serialized(name='test', never='test', other='test')
+    assert o.__getstate__() == {'name': 'test', 'always': [], 'items': {},
+                                'alias': 'test', 'other': 'test'}
+
+    o.present = 'test'
+    o.empty = {'one': 1}
+    o.items.new(name='item', intattr=1)
+    assert o.__getstate__() == {'name': 'test', 'present': 'test',
+                                'always': [], 'empty': {'one': 1},
+                                'items': {'item': {'name': 'item',
+                                                   'intattr': 1,
+                                                   'listattr': [],
+                                                   'dictattr': {}}},
+                                'alias': 'test', 'other': 'test'}
+
+
+def test_generated_init():
+    o = Serialized(other='test', items={'item': {'strattr': 'string'}})
+    assert o.alias == 'test'
+    assert o.items['item'].strattr == 'string'
+    assert o.always == []
+
+    with pytest.raises(ValueError):
+        Serialized(unknown='test')
+
+    with pytest.raises(TypeError):
+        Instance(intattr='string')
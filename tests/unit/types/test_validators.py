@@ -17,6 +17,10 @@ import pytest
 from network_runner.types.validators import ChoiceValidator
 from network_runner.types.validators import RangeValidator
 from network_runner.types.validators import PortValidator
+from network_runner.types.validators import RequiredValueValidator
+from network_runner.types.validators import TypeValidator
+from network_runner.types.validators import compile_validators
+from network_runner.types.validators import trusted
 
 
 def test_choice_validator_pass():
@@ -59,3 +63,50 @@ def test_port_validator_fail():
         v(0)
     with pytest.raises(AttributeError):
         v(65536)
+
+
+def test_compile_validators_order():
+    calls = []
+
+    class Recorder(object):
+        def __init__(self, name):
+            self.name = name
+
+        def __call__(self, value):
+            calls.append(self.name)
+
+    declared = (Recorder('first'), Recorder('second'))
+    validate = compile_validators(
+        set(declared) | set([TypeValidator(str), RequiredValueValidator()]),
+        declared)
+
+    validate('test')
+    assert calls == ['first', 'second']
+
+    with pytest.raises(TypeError):
+        validate(1)
+    with pytest.raises(ValueError):
+        validate(None)
+    assert calls == ['first', 'second']
+
+
+def test_compile_validators_type():
+    validate = compile_validators(set([TypeValidator(str)]))
+    validate('test')
+    validate(None)
+    with pytest.raises(TypeError):
+        validate(1)
+
+
+def test_trusted():
+    validate = compile_validators(
+        set([TypeValidator(str), ChoiceValidator(['one'])]))
+    with pytest.raises(AttributeError):
+        validate('two')
+
+    with trusted():
+        validate('two')
+        validate(2)
+
+    with pytest.raises(TypeError):
+        validate(2)